@@ -0,0 +1,61 @@
+from logging.config import fileConfig
+from alembic import context
+from app.core.database import Base, engine
+import app.models  # noqa: F401  (registers the tables on Base.metadata)
+import app.models.employment  # noqa: F401  (not re-exported by app.models)
+from app.models.search import EMPLOYEE_SEARCH_TABLE
+from app.services.audit_partitions import DEFAULT_PARTITION, PARTITION_PATTERN
+
+config = context.config
+
+# init_db runs migrations in-process on its own connection; only the alembic CLI
+# should reconfigure logging.
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names):
+    # The search index (and FTS5's shadow tables) is raw DDL, not part of the metadata,
+    # and audit log partitions are created at runtime.
+    if type_ != "table":
+        return True
+    return not (
+        name.startswith(EMPLOYEE_SEARCH_TABLE)
+        or name == DEFAULT_PARTITION
+        or PARTITION_PATTERN.match(name)
+    )
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        # SQLite cannot ALTER constraints in place; batch mode rebuilds the table.
+        render_as_batch=connection.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=engine.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations(connection)
+else:
+    with engine.connect() as connection:
+        run_migrations(connection)
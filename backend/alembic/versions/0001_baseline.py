@@ -0,0 +1,22 @@
+"""Baseline: the schema as created by init_db's create_all before migrations
+
+Databases that predate migrations have no alembic_version table; init_db stamps
+them at this revision and upgrades from here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-06-01 00:00:00
+"""
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,61 @@
+"""Composite indexes for hot query predicates; unique keys for attendance and payroll
+
+attendances(employee_id, date) and payroll_records(employee_id, year, month) were
+kept unique only by the services checking before inserting. They become unique
+indexes, which SQLite can add without rebuilding the table. Indexes that already
+exist (databases created by create_all after this change) are skipped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-06-01 00:00:01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("uq_attendances_employee_id_date", "attendances", ["employee_id", "date"], True),
+    ("ix_payroll_records_year_month_status", "payroll_records", ["year", "month", "status"], False),
+    ("uq_payroll_records_employee_id_year_month", "payroll_records", ["employee_id", "year", "month"], True),
+    ("ix_salary_components_employee_id_is_active", "salary_components", ["employee_id", "is_active"], False),
+    ("ix_leave_requests_employee_id_status", "leave_requests", ["employee_id", "status"], False),
+    ("ix_leave_balances_employee_id_year_leave_type", "leave_balances", ["employee_id", "year", "leave_type"], False),
+    ("ix_audit_logs_entity_type_created_at", "audit_logs", ["entity_type", "created_at"], False),
+    ("ix_employees_department_id_is_active", "employees", ["department_id", "is_active"], False),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _check_no_duplicates(table: str, columns: list):
+    bind = op.get_bind()
+    keys = ", ".join(columns)
+    duplicates = bind.execute(sa.text(
+        f"SELECT {keys}, COUNT(*) FROM {table} GROUP BY {keys} HAVING COUNT(*) > 1 LIMIT 10"
+    )).fetchall()
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot add a unique index on {table}({keys}): duplicate rows exist, e.g. "
+            f"{[tuple(row) for row in duplicates]}. Remove the duplicates and rerun the migration."
+        )
+
+
+def upgrade():
+    for name, table, columns, unique in INDEXES:
+        if name in _existing_indexes(table):
+            continue
+        if unique:
+            _check_no_duplicates(table, columns)
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,27 @@
+"""Employee search index (FTS5 on SQLite, pg_trgm on PostgreSQL)
+
+Creates the index objects from app.models.search and fills them from the
+existing employees; triggers keep them current from here on. Databases created
+by create_all after this change already have them, and every statement is
+idempotent. On PostgreSQL the triggers need version 14 or later
+(CREATE OR REPLACE TRIGGER) and the role must be allowed to create pg_trgm.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-06-01 00:00:02
+"""
+from alembic import op
+from app.models.search import create_employee_search, drop_employee_search
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_employee_search(op.get_bind())
+
+
+def downgrade():
+    drop_employee_search(op.get_bind())
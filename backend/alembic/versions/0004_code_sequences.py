@@ -0,0 +1,31 @@
+"""Counter table for generated codes (employee codes)
+
+Employee codes were random four-digit suffixes probed until unused; they now
+come from a counter row per year. Existing codes are left as they are and each
+counter starts above the highest code already issued for its year.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-06-01 00:00:03
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("code_sequences"):
+        return
+    op.create_table(
+        "code_sequences",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("next_value", sa.Integer, nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_table("code_sequences")
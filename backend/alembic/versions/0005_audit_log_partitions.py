@@ -0,0 +1,122 @@
+"""Audit log partitions by month; indexes for entity and date filters
+
+On PostgreSQL audit_logs becomes a table partitioned by RANGE (created_at), with
+a partition per month from the oldest event to the current month and a default
+partition for anything else; the primary key widens to (id, created_at) because
+a partitioned table's keys must include the partition column. Events without a
+created_at take the migration time. On SQLite the table stays as it is and the
+application moves finished months into audit_logs_YYYYMM tables itself
+(app/services/audit_partitions.py). Both get indexes on (entity_type,
+entity_id) and on created_at.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-06-01 00:00:04
+"""
+from alembic import op
+from datetime import date
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_audit_logs_entity_type_entity_id", ["entity_type", "entity_id"]),
+    ("ix_audit_logs_created_at", ["created_at"]),
+]
+LEGACY_INDEXES = [
+    ("ix_audit_logs_id", ["id"]),
+    ("ix_audit_logs_entity_type_created_at", ["entity_type", "created_at"]),
+]
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('{sequence}'),
+    user_id INTEGER REFERENCES users (id),
+    action VARCHAR(100) NOT NULL,
+    entity_type VARCHAR(100),
+    entity_id INTEGER,
+    old_value TEXT,
+    new_value TEXT,
+    ip_address VARCHAR(50),
+    user_agent VARCHAR(500),
+    created_at TIMESTAMP WITHOUT TIME ZONE {created_at} DEFAULT now()
+"""
+COPY_COLUMNS = "id, user_id, action, entity_type, entity_id, old_value, new_value, ip_address, user_agent"
+
+
+def _existing_indexes() -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("audit_logs")}
+
+
+def _create_indexes(indexes: list):
+    existing = _existing_indexes()
+    for name, columns in indexes:
+        if name not in existing:
+            op.create_index(name, "audit_logs", columns)
+
+
+def _is_partitioned() -> bool:
+    return op.get_bind().scalar(sa.text("SELECT relkind FROM pg_class WHERE relname = 'audit_logs'")) == "p"
+
+
+def _months(first: date, last: date):
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        following = (year + month // 12, month % 12 + 1)
+        yield date(year, month, 1), date(*following, 1)
+        year, month = following
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or _is_partitioned():
+        _create_indexes(INDEXES)
+        return
+
+    sequence = bind.scalar(sa.text("SELECT pg_get_serial_sequence('audit_logs', 'id')"))
+    op.execute(
+        f"CREATE TABLE audit_logs_partitioned ({COLUMNS.format(sequence=sequence, created_at='NOT NULL')}) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs_partitioned DEFAULT")
+    today = date.today()
+    oldest = bind.scalar(sa.text("SELECT min(created_at) FROM audit_logs")) or today
+    for start, end in _months(oldest, today):
+        op.execute(
+            f"CREATE TABLE audit_logs_{start:%Y%m} PARTITION OF audit_logs_partitioned "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    op.execute(
+        f"INSERT INTO audit_logs_partitioned ({COPY_COLUMNS}, created_at) "
+        f"SELECT {COPY_COLUMNS}, COALESCE(created_at, now()) FROM audit_logs"
+    )
+    # The id sequence would otherwise be dropped with the old table.
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY audit_logs_partitioned.id")
+    op.execute("DROP TABLE audit_logs")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME TO audit_logs")
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at)")
+    _create_indexes(LEGACY_INDEXES + INDEXES)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _is_partitioned():
+        existing = _existing_indexes()
+        for name, _ in reversed(INDEXES):
+            if name in existing:
+                op.drop_index(name, table_name="audit_logs")
+        return
+
+    sequence = bind.scalar(sa.text("SELECT pg_get_serial_sequence('audit_logs', 'id')"))
+    op.execute(f"CREATE TABLE audit_logs_plain ({COLUMNS.format(sequence=sequence, created_at='')})")
+    op.execute(
+        f"INSERT INTO audit_logs_plain ({COPY_COLUMNS}, created_at) "
+        f"SELECT {COPY_COLUMNS}, created_at FROM audit_logs"
+    )
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY audit_logs_plain.id")
+    op.execute("DROP TABLE audit_logs CASCADE")  # with its partitions
+    op.execute("ALTER TABLE audit_logs_plain RENAME TO audit_logs")
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id)")
+    _create_indexes(LEGACY_INDEXES)
@@ -0,0 +1,37 @@
+"""Entity state snapshots for rebuilding history from audit events
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-06-01 00:00:05
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("audit_snapshots"):
+        return
+    op.create_table(
+        "audit_snapshots",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("entity_type", sa.String(100), nullable=False),
+        sa.Column("entity_id", sa.Integer, nullable=False),
+        sa.Column("audit_log_id", sa.Integer, nullable=False),
+        sa.Column("taken_at", sa.DateTime, nullable=False),
+        sa.Column("state", sa.Text),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now())
+    )
+    op.create_index("ix_audit_snapshots_id", "audit_snapshots", ["id"])
+    op.create_index(
+        "ix_audit_snapshots_entity_type_entity_id_taken_at", "audit_snapshots",
+        ["entity_type", "entity_id", "taken_at"]
+    )
+
+
+def downgrade():
+    op.drop_table("audit_snapshots")
@@ -0,0 +1,52 @@
+"""Uploaded document files: content columns on documents, resumable uploads
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-06-01 00:00:06
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+DOCUMENT_COLUMNS = [
+    sa.Column("file_name", sa.String(255)),
+    sa.Column("content_type", sa.String(100)),
+    sa.Column("file_size", sa.BigInteger),
+    sa.Column("content_sha256", sa.String(64)),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("documents")}
+    for column in DOCUMENT_COLUMNS:
+        if column.name not in existing:
+            op.add_column("documents", column)
+    if "ix_documents_content_sha256" not in {index["name"] for index in inspector.get_indexes("documents")}:
+        op.create_index("ix_documents_content_sha256", "documents", ["content_sha256"])
+
+    if inspector.has_table("document_uploads"):
+        return
+    op.create_table(
+        "document_uploads",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("document_id", sa.Integer, sa.ForeignKey("documents.id"), nullable=False),
+        sa.Column("file_name", sa.String(255), nullable=False),
+        sa.Column("content_type", sa.String(100)),
+        sa.Column("total_size", sa.BigInteger, nullable=False),
+        sa.Column("created_by", sa.Integer, sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("completed_at", sa.DateTime, nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_table("document_uploads")
+    op.drop_index("ix_documents_content_sha256", table_name="documents")
+    with op.batch_alter_table("documents") as batch:
+        for column in reversed(DOCUMENT_COLUMNS):
+            batch.drop_column(column.name)
@@ -0,0 +1,28 @@
+"""Preview status of document files
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2024-06-01 00:00:07
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+PREVIEW_STATUS = sa.Enum("PENDING", "READY", "FAILED", "UNSUPPORTED", name="documentpreviewstatus")
+
+
+def upgrade():
+    if "preview_status" in {column["name"] for column in sa.inspect(op.get_bind()).get_columns("documents")}:
+        return
+    PREVIEW_STATUS.create(op.get_bind(), checkfirst=True)
+    op.add_column("documents", sa.Column("preview_status", PREVIEW_STATUS, nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("preview_status")
+    PREVIEW_STATUS.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,39 @@
+"""Document expiry index and per-department expiry summaries
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2024-06-01 00:00:08
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "ix_documents_expiry_date_employee_id_status" not in {index["name"] for index in inspector.get_indexes("documents")}:
+        op.create_index(
+            "ix_documents_expiry_date_employee_id_status", "documents", ["expiry_date", "employee_id", "status"]
+        )
+    if inspector.has_table("document_expiry_summaries"):
+        return
+    op.create_table(
+        "document_expiry_summaries",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("department_id", sa.Integer, sa.ForeignKey("departments.id"), nullable=True),
+        sa.Column("within_days", sa.Integer, nullable=False),
+        sa.Column("expired_count", sa.Integer, nullable=False),
+        sa.Column("expiring_count", sa.Integer, nullable=False),
+        sa.Column("expired_items", sa.Text),
+        sa.Column("expiring_items", sa.Text),
+        sa.Column("scanned_at", sa.DateTime, nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_table("document_expiry_summaries")
+    op.drop_index("ix_documents_expiry_date_employee_id_status", table_name="documents")
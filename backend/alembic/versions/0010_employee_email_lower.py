@@ -0,0 +1,22 @@
+"""Case-insensitive employee email index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2024-06-01 00:00:09
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+# SQLite does not reflect expression indexes, so existence is left to IF [NOT] EXISTS.
+def upgrade():
+    op.create_index("ix_employees_email_lower", "employees", [sa.text("lower(email)")], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_employees_email_lower", table_name="employees", if_exists=True)
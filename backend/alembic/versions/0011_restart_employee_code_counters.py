@@ -0,0 +1,25 @@
+"""Restart employee code counters at 1
+
+Counters were started above the highest random legacy code of their year, so
+codes soon needed five digits. Code reservation now skips codes already
+issued; dropping the counters lets each restart from 1 on its next use.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2024-06-01 00:00:10
+"""
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("DELETE FROM code_sequences WHERE name LIKE 'employee_code:%'")
+
+
+def downgrade():
+    # Counters are recreated on use; there is nothing to restore.
+    pass
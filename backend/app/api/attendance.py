@@ -1,28 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.replicas import get_async_read_db
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole
 from app.schemas.attendance import (
     ShiftCreate, ShiftUpdate, ShiftResponse,
     AttendanceCreate, AttendanceUpdate, AttendanceResponse, BulkAttendanceCreate
 )
-from app.schemas.common import PaginatedResponse
-from app.services.attendance_service import AttendanceService
-from typing import Optional
+from app.schemas.common import PaginatedResponse, CursorPage
+from app.services.attendance_service import AttendanceService, AsyncAttendanceService
+from app.services.pagination import COUNT_MODE_PATTERN
+from typing import Optional, Union
 from datetime import datetime
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.post("/shifts", response_model=ShiftResponse, status_code=status.HTTP_201_CREATED)
 def create_shift(
     shift_data: ShiftCreate,
@@ -82,24 +77,44 @@ def bulk_create_attendance(
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
 ):
     service = AttendanceService(db)
-    attendances = service.bulk_create_attendance(bulk_data.attendances)
+    try:
+        attendances = service.bulk_create_attendance(bulk_data.attendances)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return attendances
 
 
-@router.get("/", response_model=PaginatedResponse[AttendanceResponse])
-def list_attendances(
+@router.get("/", response_model=Union[PaginatedResponse[AttendanceResponse], CursorPage[AttendanceResponse]])
+async def list_attendances(
     employee_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     status: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass empty for the first page, then next_cursor"),
+    count: str = Query("estimate", pattern=COUNT_MODE_PATTERN),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = AttendanceService(db)
+    service = AsyncAttendanceService(db)
+    if cursor is not None:
+        try:
+            result = await service.get_attendances_page(
+                employee_id=employee_id,
+                start_date=start_date,
+                end_date=end_date,
+                status=status,
+                cursor=cursor,
+                limit=page_size,
+                count=count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {**result._asdict(), "page_size": page_size}
+    
     skip = (page - 1) * page_size
-    attendances, total = service.get_attendances(
+    attendances, total = await service.get_attendances(
         employee_id=employee_id,
         start_date=start_date,
         end_date=end_date,
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.security import get_current_active_user
 from app.schemas.auth import Token, LoginRequest, RegisterRequest, EmployeeLoginRequest
 from app.schemas.user import UserResponse, ChangePassword
 from app.services.auth_service import AuthService
-from app.services.employee_service import EmployeeService
+from app.services.employee_service import AsyncEmployeeService
 from app.models.user import User
 import logging
 
@@ -15,10 +16,10 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(user_data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     service = AuthService(db)
     try:
-        user = service.register(user_data)
+        user = await service.register(user_data)
         return user
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -28,11 +29,11 @@ def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Login attempt for username: {login_data.username}")
     service = AuthService(db)
     try:
-        result = service.login(login_data)
+        result = await service.login(login_data)
         logger.info(f"Login result: {result}")
     except Exception as e:
         logger.error(f"Login error: {str(e)}", exc_info=True)
@@ -54,30 +55,36 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
-    return current_user
+def get_current_user_info(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
 
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     password_data: ChangePassword,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     service = AuthService(db)
     try:
-        service.change_password(current_user.id, password_data.old_password, password_data.new_password)
+        await service.change_password(current_user.id, password_data.old_password, password_data.new_password)
         return {"message": "Password changed successfully"}
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.post("/employee-login")
-def employee_login(login_data: EmployeeLoginRequest, db: Session = Depends(get_db)):
+async def employee_login(login_data: EmployeeLoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login using employee code and password"""
-    service = EmployeeService(db)
+    service = AsyncEmployeeService(db)
     try:
-        result = service.employee_login(login_data.employee_code, login_data.password)
+        result = await service.employee_login(login_data.employee_code, login_data.password)
         if not result:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
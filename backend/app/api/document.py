@@ -1,28 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Path, Query, Header, Request, UploadFile, File
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import get_current_active_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
+from app.core.replicas import get_read_db, get_async_read_db
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole
 from app.schemas.document import (
     DocumentCreate, DocumentUpdate, DocumentResponse, DocumentVerification,
     OnboardingChecklistCreate, OnboardingChecklistUpdate, OnboardingChecklistResponse,
-    HolidayCreate, HolidayUpdate, HolidayResponse
+    HolidayCreate, HolidayUpdate, HolidayResponse, AuditLogResponse,
+    DocumentUploadCreate, DocumentUploadResponse, DocumentExpirySummaryResponse
 )
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import PaginatedResponse, CursorPage
 from app.services.document_service import DocumentService, OnboardingService, HolidayService, AuditService
-from typing import Optional
+from app.services.history_service import HistoryService
+from app.services.document_store import DocumentFileService, IO_CHUNK_BYTES, parse_range
+from app.services.document_expiry import DocumentExpiryService, EXPIRY_KIND_PATTERN
+from app.services.document_previews import (
+    PREVIEW_VARIANT_PATTERN, PREVIEW_VERSION_LENGTH, generate_previews, queue_missing_previews
+)
+from app.services.pagination import COUNT_MODE_PATTERN
+from typing import AsyncIterator, Optional, Union
+from datetime import datetime
+from urllib.parse import quote
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.post("/", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 def create_document(
     document_data: DocumentCreate,
@@ -45,6 +50,46 @@ def get_employee_documents(
     return documents
 
 
+@router.post("/expiry/scan", response_model=DocumentExpirySummaryResponse)
+def scan_document_expiry(
+    within_days: Optional[int] = Query(None, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    """Recount expired and expiring documents per department for the dashboard now, ahead of the scheduled scan."""
+    return DocumentExpiryService(db).scan(within_days)
+
+
+@router.get("/expiry/summary", response_model=DocumentExpirySummaryResponse)
+def get_document_expiry_summary(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    """Counts and first few documents per department from the last scan (dashboard widget)."""
+    return DocumentExpiryService(db).get_summary()
+
+
+@router.get("/expiry/{kind}", response_model=CursorPage[DocumentResponse])
+def list_expiring_documents(
+    kind: str = Path(..., pattern=EXPIRY_KIND_PATTERN),
+    within_days: Optional[int] = Query(None, ge=1, le=366),
+    department_id: Optional[int] = None,
+    page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Pass next_cursor from the previous page"),
+    count: str = Query("estimate", pattern=COUNT_MODE_PATTERN),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    """Full list behind the widget: expired (most recent first) or expiring within `within_days` (soonest first)."""
+    try:
+        result = DocumentExpiryService(db).get_documents_page(
+            kind, within_days, department_id, cursor=cursor, limit=page_size, count=count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result._asdict(), "page_size": page_size}
+
+
 @router.get("/{document_id}", response_model=DocumentResponse)
 def get_document(
     document_id: int,
@@ -60,6 +105,200 @@ def get_document(
     return document
 
 
+async def _file_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(IO_CHUNK_BYTES):
+        yield chunk
+
+
+def _upload_status(upload, offset: int) -> dict:
+    return {
+        "id": upload.id,
+        "document_id": upload.document_id,
+        "file_name": upload.file_name,
+        "content_type": upload.content_type,
+        "total_size": upload.total_size,
+        "offset": offset,
+        "completed": upload.completed_at is not None
+    }
+
+
+@router.post("/{document_id}/file", response_model=DocumentResponse)
+async def upload_document_file(
+    document_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload a document's file in one request; large scans can use /uploads to resume after a drop."""
+    service = DocumentFileService(db)
+    document = await service.get_document(document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        document = await service.upload_file(
+            document, file.filename or document.document_name, file.content_type, _file_chunks(file), current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    background_tasks.add_task(generate_previews, [document.id])
+    return document
+
+
+@router.post("/{document_id}/uploads", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
+async def start_document_upload(
+    document_id: int,
+    upload_data: DocumentUploadCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a resumable upload; send the bytes with PATCH /documents/uploads/{id} and an Upload-Offset header."""
+    service = DocumentFileService(db)
+    document = await service.get_document(document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        upload = await service.start_upload(
+            document, upload_data.file_name, upload_data.content_type, upload_data.total_size, current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _upload_status(upload, 0)
+
+
+@router.get("/uploads/{upload_id}", response_model=DocumentUploadResponse)
+async def get_document_upload(
+    upload_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Bytes received so far; a client resumes by sending the rest from `offset`."""
+    service = DocumentFileService(db)
+    upload = await service.get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    offset = await service.upload_offset(upload)
+    response.headers["Upload-Offset"] = str(offset)
+    return _upload_status(upload, offset)
+
+
+@router.patch("/uploads/{upload_id}", response_model=DocumentUploadResponse)
+async def upload_document_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    upload_offset: int = Header(..., description="Byte position of this chunk in the file"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Write the request body at Upload-Offset, streamed to disk; the last chunk attaches the file."""
+    service = DocumentFileService(db)
+    upload = await service.get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    received = await service.upload_offset(upload)
+    if upload_offset > received or upload.completed_at:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is at byte {received}; resume from there",
+            headers={"Upload-Offset": str(received)}
+        )
+    try:
+        offset = await service.write_chunk(upload, upload_offset, request.stream(), current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if upload.completed_at:
+        background_tasks.add_task(generate_previews, [upload.document_id])
+    response.headers["Upload-Offset"] = str(offset)
+    return _upload_status(upload, offset)
+
+
+@router.get("/{document_id}/file")
+async def download_document_file(
+    document_id: int,
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """The document's file; honours a single-range Range header for resumed and partial downloads."""
+    service = DocumentFileService(db)
+    document = await service.get_document(document_id)
+    if not document or not document.content_sha256:
+        raise HTTPException(status_code=404, detail="Document file not found")
+    
+    etag = f'"{document.content_sha256}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    try:
+        byte_range = parse_range(range, document.file_size)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{document.file_size}"}
+        )
+    first, last = byte_range or (0, document.file_size - 1)
+    headers["Content-Length"] = str(last - first + 1)
+    headers["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(document.file_name or '')}"
+    if byte_range:
+        headers["Content-Range"] = f"bytes {first}-{last}/{document.file_size}"
+    return StreamingResponse(
+        service.store.read(document.content_sha256, first, last),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=document.content_type,
+        headers=headers
+    )
+
+
+@router.get("/{document_id}/preview/{variant}")
+async def get_document_preview(
+    document_id: int,
+    variant: str = Path(..., pattern=PREVIEW_VARIANT_PATTERN),
+    v: Optional[str] = Query(None, description="Content hash prefix; a matching one makes the response cacheable for a year"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """JPEG thumbnail (256px) or first-page preview (1024px) of the document's file, once rendered."""
+    service = DocumentFileService(db)
+    document = await service.get_document(document_id)
+    if not document or not document.content_sha256:
+        raise HTTPException(status_code=404, detail="Document file not found")
+    path = service.store.preview_path(document.content_sha256, variant)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Preview not available")
+    
+    etag = f'"{document.content_sha256}-{variant}"'
+    # A URL that names the content cannot go stale: a new file changes its ?v=.
+    # Too short a prefix could survive a file change, so it gets revalidated like no ?v= at all.
+    versioned = bool(v) and len(v) >= PREVIEW_VERSION_LENGTH and document.content_sha256.startswith(v)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=31536000, immutable" if versioned else "private, no-cache"
+    }
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
+
+@router.post("/previews")
+def queue_document_previews(
+    background_tasks: BackgroundTasks,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    """Render previews for documents that have a file but none yet (e.g. uploaded before previews existed)."""
+    document_ids = queue_missing_previews(db, limit)
+    if document_ids:
+        background_tasks.add_task(generate_previews, document_ids)
+    return {"queued": len(document_ids)}
+
+
 @router.put("/{document_id}", response_model=DocumentResponse)
 def update_document(
     document_id: int,
@@ -244,20 +483,47 @@ def delete_holiday(
 audit_router = APIRouter(prefix="/audit", tags=["Audit Logs"])
 
 
-@audit_router.get("/", response_model=PaginatedResponse[dict])
+@audit_router.get("/", response_model=Union[PaginatedResponse[AuditLogResponse], CursorPage[AuditLogResponse]])
 def list_audit_logs(
     user_id: Optional[int] = None,
     entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass empty for the first page, then next_cursor"),
+    count: str = Query("estimate", pattern=COUNT_MODE_PATTERN),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN))
 ):
     service = AuditService(db)
+    if cursor is not None:
+        try:
+            result = service.get_audit_logs_page(
+                user_id=user_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                action=action,
+                start_date=start_date,
+                end_date=end_date,
+                cursor=cursor,
+                limit=page_size,
+                count=count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {**result._asdict(), "page_size": page_size}
+    
     skip = (page - 1) * page_size
     logs, total = service.get_audit_logs(
         user_id=user_id,
         entity_type=entity_type,
+        entity_id=entity_id,
+        action=action,
+        start_date=start_date,
+        end_date=end_date,
         skip=skip,
         limit=page_size
     )
@@ -271,3 +537,51 @@ def list_audit_logs(
         "page_size": page_size,
         "total_pages": total_pages
     }
+
+
+@audit_router.post("/archive")
+def archive_audit_logs(
+    before: Optional[datetime] = Query(None, description="Archive months ending on or before this; default AUDIT_ONLINE_MONTHS ago"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN))
+):
+    # Snapshot first, so history after the cutoff can still be rebuilt without the archived events.
+    snapshots = HistoryService(db).take_snapshots(min_events=1)
+    service = AuditService(db)
+    archived = service.archive_audit_logs(before, current_user.id)
+    return {
+        "archived": archived,
+        "rows": sum(partition["rows"] for partition in archived),
+        "snapshots": snapshots
+    }
+
+
+@audit_router.post("/snapshots")
+def take_audit_snapshots(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN))
+):
+    return {"snapshots": HistoryService(db).take_snapshots()}
+
+
+@audit_router.get("/history/{entity_type}/{entity_id}")
+def get_entity_history(
+    entity_type: str,
+    entity_id: int,
+    at: Optional[datetime] = Query(None, description="Point in time; default now"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN))
+):
+    at = at or datetime.now()
+    try:
+        result = HistoryService(db).state_at(entity_type, entity_id, at)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "at": at,
+        "exists": result.state is not None,
+        "state": result.state,
+        "replayed_events": result.replayed
+    }
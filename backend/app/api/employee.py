@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.replicas import get_read_db, get_async_read_db
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole
 from app.schemas.user import (
     EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeListResponse,
@@ -9,21 +11,15 @@ from app.schemas.user import (
     DesignationCreate, DesignationUpdate, DesignationResponse,
     UserCreate, UserResponse
 )
-from app.schemas.common import PaginatedResponse, SuccessResponse
-from app.services.employee_service import EmployeeService, UserService
-from typing import Optional
+from app.schemas.common import PaginatedResponse, CursorPage, SuccessResponse
+from app.services.employee_service import EmployeeService, AsyncEmployeeService, UserService
+from app.services.pagination import COUNT_MODE_PATTERN
+from app.services.import_service import IMPORT_FORMATS, EmployeeImport, read_employee_rows
+from typing import Optional, Union
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.post("/", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
 def create_employee(
     employee_data: EmployeeCreate,
@@ -35,20 +31,62 @@ def create_employee(
     return employee
 
 
-@router.get("/", response_model=PaginatedResponse[EmployeeListResponse])
-def list_employees(
+@router.post("/import")
+def import_employees(
+    response: Response,
+    file: UploadFile = File(..., description="CSV or XLSX with a header row; department and designation by name or code"),
+    dry_run: bool = Query(False, description="Validate and report without creating anyone"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    """Bulk-create employees from a file; valid rows are imported and invalid ones reported by row.
+
+    Answers 207 when some chunks were committed and others rolled back; the
+    report's committed_ranges and failed_ranges say which rows to retry.
+    """
+    file_format = (file.filename or "").rsplit(".", 1)[-1].lower()
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Upload a {' or '.join(f.upper() for f in IMPORT_FORMATS)} file")
+    try:
+        report = EmployeeImport(db, current_user.id, dry_run).run(read_employee_rows(file.file, file_format))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if report["failed_ranges"]:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return report
+
+
+@router.get("/", response_model=Union[PaginatedResponse[EmployeeListResponse], CursorPage[EmployeeListResponse]])
+async def list_employees(
     search: Optional[str] = None,
     department_id: Optional[int] = None,
     status: Optional[str] = None,
     is_active: Optional[bool] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass empty for the first page, then next_cursor"),
+    count: str = Query("estimate", pattern=COUNT_MODE_PATTERN),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = EmployeeService(db)
+    service = AsyncEmployeeService(db)
+    if cursor is not None:
+        try:
+            result = await service.get_employees_page(
+                search=search,
+                department_id=department_id,
+                status=status,
+                is_active=is_active,
+                cursor=cursor,
+                limit=page_size,
+                count=count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {**result._asdict(), "page_size": page_size}
+    
     skip = (page - 1) * page_size
-    employees, total = service.get_employees(
+    employees, total = await service.get_employees(
         skip=skip,
         limit=page_size,
         search=search,
@@ -309,7 +347,7 @@ def list_users(
     role: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN))
 ):
     service = UserService(db)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole, Employee
 from app.models.employment import EmploymentHistory
 from app.schemas.employment import EmploymentHistoryCreate, EmploymentHistoryResponse
@@ -11,14 +11,6 @@ from datetime import datetime
 router = APIRouter(prefix="/employees", tags=["Employee History"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.get("/{employee_id}/history", response_model=list[EmploymentHistoryResponse])
 def get_employee_history(
     employee_id: int,
@@ -1,29 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.replicas import get_read_db
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole
 from app.schemas.leave import (
     LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestResponse,
     LeaveBalanceCreate, LeaveBalanceUpdate, LeaveBalanceResponse,
     LeaveApproval
 )
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import PaginatedResponse, CursorPage
 from app.services.attendance_service import LeaveService
 from app.schemas.leave import LeaveRequestStatus
-from typing import Optional
+from app.services.pagination import COUNT_MODE_PATTERN
+from typing import Optional, Union
 
 router = APIRouter(prefix="/leave", tags=["Leave"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.post("/requests", response_model=LeaveRequestResponse, status_code=status.HTTP_201_CREATED)
 def create_leave_request(
     leave_data: LeaveRequestCreate,
@@ -35,17 +29,33 @@ def create_leave_request(
     return leave
 
 
-@router.get("/requests", response_model=PaginatedResponse[LeaveRequestResponse])
+@router.get("/requests", response_model=Union[PaginatedResponse[LeaveRequestResponse], CursorPage[LeaveRequestResponse]])
 def list_leave_requests(
     employee_id: Optional[int] = None,
     status: Optional[LeaveRequestStatus] = None,
     leave_type: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass empty for the first page, then next_cursor"),
+    count: str = Query("estimate", pattern=COUNT_MODE_PATTERN),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     service = LeaveService(db)
+    if cursor is not None:
+        try:
+            result = service.get_leave_requests_page(
+                employee_id=employee_id,
+                status=status,
+                leave_type=leave_type,
+                cursor=cursor,
+                limit=page_size,
+                count=count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {**result._asdict(), "page_size": page_size}
+    
     skip = (page - 1) * page_size
     leaves, total = service.get_leave_requests(
         employee_id=employee_id,
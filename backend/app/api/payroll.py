@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.replicas import get_async_read_db
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole
 from app.schemas.payroll import (
     SalaryComponentCreate, SalaryComponentUpdate, SalaryComponentResponse,
@@ -9,22 +11,15 @@ from app.schemas.payroll import (
     PayrollProcessRequest, PayrollApprovalRequest, PayrollSummary,
     PayrollSettingsBase, PayrollSettingsResponse
 )
-from app.schemas.common import PaginatedResponse
-from app.services.payroll_service import PayrollService
+from app.schemas.common import PaginatedResponse, CursorPage
+from app.services.payroll_service import PayrollService, AsyncPayrollService
 from app.schemas.payroll import PayrollStatus
-from typing import Optional, List
+from app.services.pagination import COUNT_MODE_PATTERN
+from typing import Optional, List, Union
 
 router = APIRouter(prefix="/payroll", tags=["Payroll"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.post("/components", response_model=SalaryComponentResponse, status_code=status.HTTP_201_CREATED)
 def create_salary_component(
     component_data: SalaryComponentCreate,
@@ -70,28 +65,48 @@ def process_payroll(
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
 ):
     service = PayrollService(db)
-    records = service.process_payroll(
-        process_request.month,
-        process_request.year,
-        process_request.employee_ids
-    )
+    try:
+        records = service.process_payroll(
+            process_request.month,
+            process_request.year,
+            process_request.employee_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return records
 
 
-@router.get("/records", response_model=PaginatedResponse[PayrollRecordResponse])
-def list_payroll_records(
+@router.get("/records", response_model=Union[PaginatedResponse[PayrollRecordResponse], CursorPage[PayrollRecordResponse]])
+async def list_payroll_records(
     employee_id: Optional[int] = None,
     month: Optional[int] = None,
     year: Optional[int] = None,
     status: Optional[PayrollStatus] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass empty for the first page, then next_cursor"),
+    count: str = Query("estimate", pattern=COUNT_MODE_PATTERN),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = PayrollService(db)
+    service = AsyncPayrollService(db)
+    if cursor is not None:
+        try:
+            result = await service.get_employee_payroll_records_page(
+                employee_id=employee_id,
+                month=month,
+                year=year,
+                status=status,
+                cursor=cursor,
+                limit=page_size,
+                count=count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {**result._asdict(), "page_size": page_size}
+    
     skip = (page - 1) * page_size
-    records, total = service.get_employee_payroll_records(
+    records, total = await service.get_employee_payroll_records(
         employee_id=employee_id,
         month=month,
         year=year,
@@ -1,216 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.replicas import get_read_db
+from app.core.security import get_current_active_user, require_roles
 from app.models.user import User, UserRole
 from app.schemas.common import SuccessResponse
 from app.services.payroll_service import PayrollService
-from app.models.payroll import PayrollRecord
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
-from io import BytesIO
+from app.services.pdf_templates import get_template, PayslipTemplate
+from app.services.export_service import export_response, session_rows, iter_zip, EXPORT_FORMAT_PATTERN
+from app.services.report_service import ReportService
+from app.services.voucher_service import VoucherService, JOURNAL, PAYMENT, VOUCHER_FORMATS
+from app.services.statutory_service import (
+    StatutoryReturnService, ReturnValidation, iter_ecr, ESIC_MC_COLUMNS, RETURN_TYPES
+)
+from app.services.disbursement_service import (
+    DisbursementService, DisbursementWriter, DisbursementContext, BANK_LAYOUTS
+)
+from app.services.payslip_mailer import PayslipMailService, run_payslip_dispatch
+from app.core.config import settings
+from app.services.form16_service import (
+    Form16Service, render_certificate, render_certificates, run_form16_job
+)
+from app.models.payroll import PayrollRecord, PayslipDelivery, Form16JobStatus
+from typing import Optional
 from datetime import datetime
+import zipfile
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
 
-def require_roles(*roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in roles and not current_user.is_superuser:
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-        return current_user
-    return role_checker
-
-
 @router.get("/payslip/{record_id}")
 def generate_payslip(
     record_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    from app.models.user import Employee
-    
-    record = db.query(PayrollRecord).filter(PayrollRecord.id == record_id).first()
+    record = ReportService(db).get_payslip_record(record_id)
     if not record:
         raise HTTPException(status_code=404, detail="Payroll record not found")
     
-    employee = db.query(Employee).filter(Employee.id == record.employee_id).first()
+    employee = record.employee
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=16, spaceAfter=10)
-    heading_style = ParagraphStyle('Heading', parent=styles['Heading2'], fontSize=12, spaceBefore=10, spaceAfter=5)
-    
-    elements = []
-    
-    elements.append(Paragraph("PayrollEdge Platform", title_style))
-    elements.append(Paragraph(f"Payslip for {datetime(record.year, record.month, 1).strftime('%B %Y')}", styles['Normal']))
-    elements.append(Spacer(1, 10))
-    
-    emp_data = [
-        ['Employee Code:', employee.employee_code or '-', 'Name:', f"{employee.first_name} {employee.last_name or ''}"],
-        ['Department:', employee.department.name if employee.department else '-', 'Designation:', employee.designation.name if employee.designation else '-'],
-        ['UAN Number:', employee.uan_number or '-', 'ESI Number:', employee.esic_number or '-'],
-    ]
-    
-    emp_table = Table(emp_data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
-    emp_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-    ]))
-    elements.append(emp_table)
-    elements.append(Spacer(1, 15))
-    
-    earnings_data = [
-        ['Earnings', 'Amount (₹)', 'Deductions', 'Amount (₹)'],
-        ['Basic Salary', f"{record.basic_salary:,.2f}", 'PF (Employee)', f"{record.pf_employee:,.2f}"],
-        ['HRA', f"{record.hra:,.2f}", 'ESIC (Employee)', f"{record.esic_employee:,.2f}"],
-        ['Conveyance', f"{record.conveyance:,.2f}", 'Professional Tax', f"{record.professional_tax:,.2f}"],
-        ['Special Allowance', f"{record.special_allowance:,.2f}", 'TDS', f"{record.tds:,.2f}"],
-        ['Overtime', f"{record.overtime_amount:,.2f}", 'Other Deductions', f"{record.other_deductions:,.2f}"],
-        ['Bonus', f"{record.bonus:,.2f}", '', ''],
-        ['Arrears', f"{record.arrears:,.2f}", '', ''],
-    ]
-    
-    earnings_table = Table(earnings_data, colWidths=[2.5*inch, 1.5*inch, 2.5*inch, 1.5*inch])
-    earnings_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-    ]))
-    elements.append(earnings_table)
-    elements.append(Spacer(1, 15))
-    
-    totals_data = [
-        ['Gross Earnings', f"₹{record.gross_earnings:,.2f}"],
-        ['Total Deductions', f"₹{record.total_deductions:,.2f}"],
-        ['Net Salary', f"₹{record.net_salary:,.2f}"],
-    ]
-    
-    totals_table = Table(totals_data, colWidths=[3*inch, 2*inch])
-    totals_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-    ]))
-    elements.append(totals_table)
-    elements.append(Spacer(1, 20))
-    
-    elements.append(Paragraph("<b>Attendance Details</b>", heading_style))
-    attendance_data = [
-        ['Working Days', str(int(record.working_days))],
-        ['Days Present', str(int(record.days_present))],
-        ['Days Absent', str(int(record.days_absent))],
-        ['Overtime Hours', f"{record.overtime_hours}"],
-    ]
-    
-    att_table = Table(attendance_data, colWidths=[2*inch, 1.5*inch])
-    att_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-    ]))
-    elements.append(att_table)
-    elements.append(Spacer(1, 20))
-    
-    elements.append(Paragraph("<b>Statutory Contributions</b>", heading_style))
-    statutory_data = [
-        ['PF (Employer)', f"₹{record.pf_employer:,.2f}", 'ESIC (Employer)', f"₹{record.esic_employer:,.2f}"],
-    ]
-    
-    stat_table = Table(statutory_data, colWidths=[2.5*inch, 1.5*inch, 2.5*inch, 1.5*inch])
-    stat_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-    ]))
-    elements.append(stat_table)
-    elements.append(Spacer(1, 30))
-    
-    elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", styles['Normal']))
-    
-    doc.build(elements)
-    
-    buffer.seek(0)
-    
-    from fastapi.responses import StreamingResponse
+    pdf = get_template(PayslipTemplate).render_payslip(record, employee)
+    
     return StreamingResponse(
-        iter([buffer.getvalue()]),
+        iter([pdf]),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename=payslip_{employee.employee_code}_{record.month}_{record.year}.pdf"}
     )
 
 
+ATTENDANCE_REPORT_COLUMNS = [
+    ("employee_code", "Employee Code"),
+    ("employee_name", "Employee Name"),
+    ("department", "Department"),
+    ("present", "Present"),
+    ("absent", "Absent"),
+    ("late", "Late"),
+    ("half_day", "Half Day"),
+    ("leaves", "Leaves"),
+    ("total_days", "Total Days"),
+    ("overtime_hours", "Overtime Hours"),
+]
+
+PAYROLL_REGISTER_COLUMNS = [
+    ("employee_code", "Employee Code"),
+    ("employee_name", "Employee Name"),
+    ("department", "Department"),
+    ("basic_salary", "Basic Salary"),
+    ("gross_earnings", "Gross Earnings"),
+    ("pf_employee", "PF (Employee)"),
+    ("pf_employer", "PF (Employer)"),
+    ("esic_employee", "ESIC (Employee)"),
+    ("esic_employer", "ESIC (Employer)"),
+    ("professional_tax", "Professional Tax"),
+    ("tds", "TDS"),
+    ("total_deductions", "Total Deductions"),
+    ("net_salary", "Net Salary"),
+    ("status", "Status"),
+]
+
+PF_REPORT_COLUMNS = [
+    ("uan", "UAN"),
+    ("name", "Name"),
+    ("wages", "Wages"),
+    ("epf", "EPF"),
+    ("eps", "EPS"),
+    ("refund", "Refund"),
+]
+
+ESIC_REPORT_COLUMNS = [
+    ("ip_number", "IP Number"),
+    ("name", "Name"),
+    ("wages", "Wages"),
+    ("employee_contribution", "Employee Contribution"),
+    ("employer_contribution", "Employer Contribution"),
+]
+
 @router.get("/attendance-report")
 def attendance_report(
     month: int,
     year: int,
     department_id: int = None,
-    db: Session = Depends(get_db),
+    format: Optional[str] = Query(None, pattern=EXPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    from app.models.user import Employee
-    from app.models.attendance import Attendance, AttendanceStatus
-    from datetime import datetime
-    
-    start_date = datetime(year, month, 1)
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1)
-    else:
-        end_date = datetime(year, month + 1, 1)
-    
-    query = db.query(Employee).filter(Employee.is_active == True)
-    if department_id:
-        query = query.filter(Employee.department_id == department_id)
-    
-    employees = query.all()
-    
-    report = []
-    for emp in employees:
-        attendances = db.query(Attendance).filter(
-            Attendance.employee_id == emp.id,
-            Attendance.date >= start_date,
-            Attendance.date < end_date
-        ).all()
-        
-        present = sum(1 for a in attendances if a.status == AttendanceStatus.PRESENT)
-        absent = sum(1 for a in attendances if a.status == AttendanceStatus.ABSENT)
-        late = sum(1 for a in attendances if a.status == AttendanceStatus.LATE)
-        half_day = sum(1 for a in attendances if a.status == AttendanceStatus.HALF_DAY)
-        leaves = sum(1 for a in attendances if a.status == AttendanceStatus.LEAVE)
-        overtime = sum((a.overtime_hours or 0) for a in attendances)
-        
-        report.append({
-            "employee_code": emp.employee_code,
-            "employee_name": f"{emp.first_name} {emp.last_name or ''}",
-            "department": emp.department.name if emp.department else '-',
-            "present": present,
-            "absent": absent,
-            "late": late,
-            "half_day": half_day,
-            "leaves": leaves,
-            "total_days": len(attendances),
-            "overtime_hours": overtime
-        })
-    
+    if format:
+        return export_response(
+            format,
+            ATTENDANCE_REPORT_COLUMNS,
+            session_rows(lambda export_db: ReportService(export_db).attendance_report_rows(month, year, department_id)),
+            f"attendance_report_{month}_{year}"
+        )
+    
+    report = list(ReportService(db).attendance_report_rows(month, year, department_id))
     return {"month": month, "year": year, "report": report}
 
 
@@ -218,37 +125,19 @@ def attendance_report(
 def payroll_register(
     month: int,
     year: int,
-    db: Session = Depends(get_db),
+    format: Optional[str] = Query(None, pattern=EXPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year
-    ).all()
-    
-    from app.models.user import Employee
-    
-    register = []
-    for record in records:
-        employee = db.query(Employee).filter(Employee.id == record.employee_id).first()
-        if employee:
-            register.append({
-                "employee_code": employee.employee_code,
-                "employee_name": f"{employee.first_name} {employee.last_name or ''}",
-                "department": employee.department.name if employee.department else '-',
-                "basic_salary": record.basic_salary,
-                "gross_earnings": record.gross_earnings,
-                "pf_employee": record.pf_employee,
-                "pf_employer": record.pf_employer,
-                "esic_employee": record.esic_employee,
-                "esic_employer": record.esic_employer,
-                "professional_tax": record.professional_tax,
-                "tds": record.tds,
-                "total_deductions": record.total_deductions,
-                "net_salary": record.net_salary,
-                "status": record.status
-            })
-    
+    if format:
+        return export_response(
+            format,
+            PAYROLL_REGISTER_COLUMNS,
+            session_rows(lambda export_db: ReportService(export_db).payroll_register_rows(month, year)),
+            f"payroll_register_{month}_{year}"
+        )
+    
+    register = list(ReportService(db).payroll_register_rows(month, year))
     return {"month": month, "year": year, "register": register}
 
 
@@ -256,42 +145,21 @@ def payroll_register(
 def pf_esi_report(
     month: int,
     year: int,
-    db: Session = Depends(get_db),
+    format: Optional[str] = Query(None, pattern=EXPORT_FORMAT_PATTERN),
+    section: str = Query("pf", pattern="^(pf|esic)$"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year
-    ).all()
-    
-    from app.models.user import Employee
-    
-    pf_data = []
-    esic_data = []
+    if format:
+        if section == "pf":
+            columns, rows = PF_REPORT_COLUMNS, lambda export_db: ReportService(export_db).pf_rows(month, year)
+        else:
+            columns, rows = ESIC_REPORT_COLUMNS, lambda export_db: ReportService(export_db).esic_rows(month, year)
+        return export_response(format, columns, session_rows(rows), f"{section}_report_{month}_{year}")
     
-    for record in records:
-        employee = db.query(Employee).filter(Employee.id == record.employee_id).first()
-        if not employee:
-            continue
-        
-        if employee.uan_number:
-            pf_data.append({
-                "uan": employee.uan_number,
-                "name": f"{employee.first_name} {employee.last_name or ''}",
-                "wages": record.basic_salary,
-                "epf": record.pf_employee,
-                "eps": record.pf_employer,
-                "refund": 0
-            })
-        
-        if employee.esic_number:
-            esic_data.append({
-                "ip_number": employee.esic_number,
-                "name": f"{employee.first_name} {employee.last_name or ''}",
-                "wages": record.gross_earnings,
-                "employee_contribution": record.esic_employee,
-                "employer_contribution": record.esic_employer
-            })
+    service = ReportService(db)
+    pf_data = list(service.pf_rows(month, year))
+    esic_data = list(service.esic_rows(month, year))
     
     return {
         "month": month,
@@ -303,11 +171,155 @@ def pf_esi_report(
     }
 
 
+def _require_complete_return(db: Session, return_type: str, month: int, year: int):
+    """422 listing the members a return would leave out; a return is never filed short."""
+    summary = StatutoryReturnService(db).validate(return_type, month, year)
+    if summary["invalid_rows"]:
+        raise HTTPException(status_code=422, detail={
+            "message": f"{summary['invalid_rows']} members fail validation and would be missing from the return",
+            **summary
+        })
+
+
+@router.get("/epf-ecr")
+def epf_ecr_file(
+    month: int,
+    year: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    _require_complete_return(db, "ecr", month, year)
+    rows = session_rows(lambda export_db: StatutoryReturnService(export_db).ecr_rows(month, year))
+    return StreamingResponse(
+        iter_ecr(rows),
+        media_type="text/plain",
+        headers={"Content-Disposition": f"attachment; filename=ECR_{year}{month:02d}.txt"}
+    )
+
+
+@router.get("/esic-mc")
+def esic_mc_file(
+    month: int,
+    year: int,
+    format: str = Query("xlsx", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    _require_complete_return(db, "esic", month, year)
+    rows = session_rows(lambda export_db: StatutoryReturnService(export_db).esic_mc_rows(month, year))
+    return export_response(format, ESIC_MC_COLUMNS, rows, f"ESIC_MC_{year}{month:02d}")
+
+
+@router.get("/statutory-returns/validate")
+def validate_statutory_return(
+    month: int,
+    year: int,
+    return_type: str = Query("ecr", pattern=f"^({'|'.join(RETURN_TYPES)})$"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    return StatutoryReturnService(db).validate(return_type, month, year)
+
+
+def _form16_job_status(job) -> dict:
+    return {
+        "id": job.id,
+        "financial_year": job.financial_year,
+        "status": job.status,
+        "total_employees": job.total_employees,
+        "processed_employees": job.processed_employees,
+        "parts": job.parts,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "completed_at": job.completed_at
+    }
+
+
+@router.get("/form16/batch")
+def generate_form16_batch(
+    year: int,
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    certificates = session_rows(lambda db: Form16Service(db).iter_certificates(year))
+    return StreamingResponse(
+        iter_zip(render_certificates(certificates)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=Form16_{year}-{year + 1}.zip"}
+    )
+
+
+@router.post("/form16/jobs")
+def create_form16_job(
+    year: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    job = Form16Service(db).create_job(year, created_by=current_user.id)
+    background_tasks.add_task(run_form16_job, job.id)
+    return _form16_job_status(job)
+
+
+@router.get("/form16/jobs/{job_id}")
+def get_form16_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    job = Form16Service(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Form 16 job not found")
+    return _form16_job_status(job)
+
+
+@router.post("/form16/jobs/{job_id}/resume")
+def resume_form16_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    service = Form16Service(db)
+    job = service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Form 16 job not found")
+    if job.status == Form16JobStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail="Form 16 job already completed")
+    if job.status == Form16JobStatus.RUNNING and not service.is_job_stale(job):
+        raise HTTPException(status_code=409, detail="Form 16 job is already running")
+    
+    # The runner claims the job before writing, so a racing second resume does nothing.
+    background_tasks.add_task(run_form16_job, job.id)
+    return _form16_job_status(job)
+
+
+@router.get("/form16/jobs/{job_id}/download")
+def download_form16_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    service = Form16Service(db)
+    job = service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Form 16 job not found")
+    if job.status != Form16JobStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail="Form 16 job is not completed yet")
+    
+    year = job.financial_year
+    return StreamingResponse(
+        service.iter_job_archive(job),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=Form16_{year}-{year + 1}.zip"}
+    )
+
+
 @router.get("/form16/{employee_id}")
 def generate_form16(
     employee_id: int,
     year: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     from app.models.user import Employee
@@ -316,86 +328,16 @@ def generate_form16(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.employee_id == employee_id,
-        PayrollRecord.year == year,
-        PayrollRecord.status.in_(['approved', 'paid'])
-    ).all()
-    
-    if not records:
+    certificate = Form16Service(db).get_certificate(employee_id, year)
+    if not certificate:
         raise HTTPException(status_code=404, detail="No payroll records found for this year")
     
-    total_gross = sum(r.gross_earnings for r in records)
-    total_tds = sum(r.tds for r in records)
-    total_pf = sum(r.pf_employee for r in records)
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    
-    styles = getSampleStyleSheet()
-    elements = []
-    
-    elements.append(Paragraph("FORM 16", styles['Heading1']))
-    elements.append(Paragraph(f"Certificate under Section 203 of the Income-tax Act, 1961 for tax deducted at source", styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    employer_details = [
-        ['Employer Name:', 'PayrollEdge Platform'],
-        ['Employer Address:', 'Jeedimetla, Hyderabad - 500055'],
-        ['Employee Name:', f"{employee.first_name} {employee.last_name or ''}"],
-        ['Employee PAN:', employee.pan_number or 'N/A'],
-        ['Employee Designation:', employee.designation.name if employee.designation else 'N/A'],
-        ['Financial Year:', f"{year}-{year + 1}"],
-    ]
-    
-    emp_table = Table(employer_details, colWidths=[2*inch, 4*inch])
-    emp_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-    ]))
-    elements.append(emp_table)
-    elements.append(Spacer(1, 20))
-    
-    salary_data = [
-        ['Month', 'Gross Salary (₹)', 'TDS (₹)', 'PF (₹)'],
-    ]
-    month_names = ['Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan', 'Feb', 'Mar']
-    
-    for i, record in enumerate(records[:12]):
-        salary_data.append([
-            month_names[record.month - 1],
-            f"{record.gross_earnings:,.2f}",
-            f"{record.tds:,.2f}",
-            f"{record.pf_employee:,.2f}"
-        ])
-    
-    salary_data.append(['Total', f"{total_gross:,.2f}", f"{total_tds:,.2f}", f"{total_pf:,.2f}"])
-    
-    salary_table = Table(salary_data, colWidths=[2*inch, 2*inch, 2*inch, 2*inch])
-    salary_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-    ]))
-    elements.append(salary_table)
-    elements.append(Spacer(1, 30))
-    
-    elements.append(Paragraph("This is a computer-generated certificate.", styles['Normal']))
-    elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", styles['Normal']))
-    
-    doc.build(elements)
-    buffer.seek(0)
-    
-    from fastapi.responses import StreamingResponse
+    pdf = render_certificate(certificate)
+    
     return StreamingResponse(
-        iter([buffer.getvalue()]),
+        iter([pdf]),
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=Form16_{employee.employee_code}_{year}.pdf"}
+        headers={"Content-Disposition": f"attachment; filename={certificate.filename}"}
     )
 
 
@@ -406,288 +348,95 @@ def send_payslip_email(
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
 ):
     from app.models.user import Employee
-    from app.core.config import settings
     
     record = db.query(PayrollRecord).filter(PayrollRecord.id == record_id).first()
     if not record:
         raise HTTPException(status_code=404, detail="Payroll record not found")
     
+    if record.status not in ('approved', 'paid'):
+        raise HTTPException(status_code=400, detail="Payroll record is not approved")
+    
     employee = db.query(Employee).filter(Employee.id == record.employee_id).first()
     if not employee or not employee.email:
         raise HTTPException(status_code=400, detail="Employee email not found")
     
-    try:
-        import smtplib
-        from email.mime.text import MIMEText
-        from email.mime.multipart import MIMEMultipart
-        from email.mime.base import MIMEBase
-        from email import encoders
-        
-        msg = MIMEMultipart()
-        msg['From'] = settings.SMTP_USERNAME if hasattr(settings, 'SMTP_USERNAME') else 'noreply@payrolledge.com'
-        msg['To'] = employee.email
-        msg['Subject'] = f" Payslip for {datetime(record.year, record.month, 1).strftime('%B %Y')}"
-        
-        body = f"""Dear {employee.first_name},
-
-Please find attached your payslip for {datetime(record.year, record.month, 1).strftime('%B %Y')}.
-
-Net Salary: ₹{record.net_salary:,.2f}
-
-Login to PayrollEdge Platform to view detailed payslip.
-
-Best regards,
-HR Team
-PayrollEdge Platform"""
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        return {"message": f"Payslip email sent to {employee.email}"}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
+    if not settings.SMTP_HOST:
+        raise HTTPException(status_code=503, detail="SMTP is not configured")
+    
+    service = PayslipMailService(db)
+    counts = service.dispatch(record.month, record.year, record_ids=[record_id])
+    if not counts["sent"]:
+        delivery = db.query(PayslipDelivery).filter(PayslipDelivery.payroll_record_id == record_id).first()
+        error = delivery.last_error if delivery else "no delivery was attempted"
+        raise HTTPException(status_code=500, detail=f"Failed to send email: {error}")
+    
+    return {"message": f"Payslip email sent to {employee.email}"}
 
 
 @router.post("/bulk-send-payslips")
 def bulk_send_payslips(
     month: int,
     year: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year,
-        PayrollRecord.status.in_(['approved', 'paid'])
-    ).all()
-    
-    from app.models.user import Employee
+    if not settings.SMTP_HOST:
+        raise HTTPException(status_code=503, detail="SMTP is not configured")
     
-    sent_count = 0
-    failed_count = 0
-    
-    for record in records:
-        employee = db.query(Employee).filter(Employee.id == record.employee_id).first()
-        if employee and employee.email:
-            sent_count += 1
+    total_records, sent_count = ReportService(db).payslip_recipient_counts(month, year)
+    background_tasks.add_task(run_payslip_dispatch, month, year)
     
     return {
         "message": f"Bulk payslip processing initiated",
-        "total_records": len(records),
+        "total_records": total_records,
         "emails_to_send": sent_count,
-        "note": "Email sending requires SMTP configuration"
+        "note": "Delivery status is available from /reports/payslip-deliveries"
     }
 
 
-@router.get("/journal-entries")
-def generate_journal_entries(
+@router.get("/payslip-deliveries")
+def payslip_deliveries(
     month: int,
     year: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year,
-        PayrollRecord.status.in_(['approved', 'paid'])
-    ).all()
-    
-    from app.models.user import Employee
-    
-    entries = []
-    total_debit = 0
-    total_credit = 0
-    
-    total_gross = sum(r.gross_earnings for r in records)
-    total_pf_emp = sum(r.pf_employee for r in records)
-    total_pf_er = sum(r.pf_employer for r in records)
-    total_esic_emp = sum(r.esic_employee for r in records)
-    total_esic_er = sum(r.esic_employer for r in records)
-    total_pt = sum(r.professional_tax for r in records)
-    total_tds = sum(r.tds for r in records)
-    total_net = sum(r.net_salary for r in records)
-    
-    entries.append({
-        "date": f"{year}-{month:02d}-01",
-        "voucher_type": "Payment",
-        "voucher_no": f"SLR/{month:02d}/{year}",
-        "account": "Salary Expense - Gross",
-        "debit": round(total_gross, 2),
-        "credit": 0,
-        "narration": f"Salary expense for {datetime(year, month, 1).strftime('%B %Y')}"
-    })
-    total_debit += total_gross
-    
-    entries.append({
-        "date": f"{year}-{month:02d}-01",
-        "voucher_type": "Payment",
-        "voucher_no": f"SLR/{month:02d}/{year}",
-        "account": "PF Expense - Employer",
-        "debit": round(total_pf_er, 2),
-        "credit": 0,
-        "narration": f"PF employer contribution for {datetime(year, month, 1).strftime('%B %Y')}"
-    })
-    total_debit += total_pf_er
-    
-    entries.append({
-        "date": f"{year}-{month:02d}-01",
-        "voucher_type": "Payment",
-        "voucher_no": f"SLR/{month:02d}/{year}",
-        "account": "ESI Expense - Employer",
-        "debit": round(total_esic_er, 2),
-        "credit": 0,
-        "narration": f"ESI employer contribution for {datetime(year, month, 1).strftime('%B %Y')}"
-    })
-    total_debit += total_esic_er
-    
-    entries.append({
-        "date": f"{year}-{month:02d}-01",
-        "voucher_type": "Payment",
-        "voucher_no": f"SLR/{month:02d}/{year}",
-        "account": "Bank/Cash",
-        "debit": 0,
-        "credit": round(total_net, 2),
-        "narration": f"Net salary payment for {datetime(year, month, 1).strftime('%B %Y')}"
-    })
-    total_credit += total_net
-    
-    if total_pf_emp > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"SLR/{month:02d}/{year}",
-            "account": "PF Payable - Employee",
-            "debit": 0,
-            "credit": round(total_pf_emp, 2),
-            "narration": f"PF deduction from employees for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_credit += total_pf_emp
-    
-    if total_pf_er > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"SLR/{month:02d}/{year}",
-            "account": "PF Payable - Employer",
-            "debit": 0,
-            "credit": round(total_pf_er, 2),
-            "narration": f"PF employer contribution for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_credit += total_pf_er
-    
-    if total_esic_emp > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"SLR/{month:02d}/{year}",
-            "account": "ESI Payable - Employee",
-            "debit": 0,
-            "credit": round(total_esic_emp, 2),
-            "narration": f"ESI deduction from employees for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_credit += total_esic_emp
-    
-    if total_esic_er > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"SLR/{month:02d}/{year}",
-            "account": "ESI Payable - Employer",
-            "debit": 0,
-            "credit": round(total_esic_er, 2),
-            "narration": f"ESI employer contribution for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_credit += total_esic_er
-    
-    if total_pt > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"SLR/{month:02d}/{year}",
-            "account": "Professional Tax Payable",
-            "debit": 0,
-            "credit": round(total_pt, 2),
-            "narration": f"Professional Tax for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_credit += total_pt
-    
-    if total_tds > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"SLR/{month:02d}/{year}",
-            "account": "TDS Payable",
-            "debit": 0,
-            "credit": round(total_tds, 2),
-            "narration": f"TDS deducted for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_credit += total_tds
-    
+    return PayslipMailService(db).delivery_summary(month, year)
+
+
+def _voucher_response(voucher_set, month: int, year: int, prefix: str) -> dict:
     return {
         "month": month,
         "year": year,
         "voucher_date": f"{year}-{month:02d}-01",
-        "voucher_number": f"SLR/{month:02d}/{year}",
-        "entries": entries,
-        "totals": {
-            "total_debit": round(total_debit, 2),
-            "total_credit": round(total_credit, 2),
-            "balanced": abs(total_debit - total_credit) < 0.01
-        }
+        "voucher_number": f"{prefix}/{month:02d}/{year}",
+        "entries": [p.as_dict() for p in voucher_set.postings],
+        "totals": voucher_set.totals()
     }
 
 
+@router.get("/journal-entries")
+def generate_journal_entries(
+    month: int,
+    year: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    voucher_set = VoucherService(db).build(JOURNAL, month, year)
+    return _voucher_response(voucher_set, month, year, "SLR")
+
+
 @router.get("/journal-entries-csv")
 def generate_journal_entries_csv(
     month: int,
     year: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year,
-        PayrollRecord.status.in_(['approved', 'paid'])
-    ).all()
-    
-    total_gross = sum(r.gross_earnings for r in records)
-    total_pf_emp = sum(r.pf_employee for r in records)
-    total_pf_er = sum(r.pf_employer for r in records)
-    total_esic_emp = sum(r.esic_employee for r in records)
-    total_esic_er = sum(r.esic_employer for r in records)
-    total_pt = sum(r.professional_tax for r in records)
-    total_tds = sum(r.tds for r in records)
-    total_net = sum(r.net_salary for r in records)
-    
-    csv_lines = [
-        "Date,Voucher Type,Voucher No,Account,Debit,Credit,Narration"
-    ]
-    
-    def add_entry(date, voucher_type, voucher_no, account, debit, credit, narration):
-        csv_lines.append(f'{date},{voucher_type},{voucher_no},"{account}",{debit:.2f},{credit:.2f},"{narration}"')
-    
-    add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "Salary Expense - Gross", total_gross, 0, f"Salary expense for {datetime(year, month, 1).strftime('%B %Y')}")
-    add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "PF Expense - Employer", total_pf_er, 0, f"PF employer contribution")
-    add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "ESI Expense - Employer", total_esic_er, 0, f"ESI employer contribution")
-    add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "Bank/Cash", 0, total_net, f"Net salary payment")
-    if total_pf_emp > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "PF Payable - Employee", 0, total_pf_emp, f"PF employee deduction")
-    if total_pf_er > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "PF Payable - Employer", 0, total_pf_er, f"PF employer contribution")
-    if total_esic_emp > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "ESI Payable - Employee", 0, total_esic_emp, f"ESI employee deduction")
-    if total_esic_er > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "ESI Payable - Employer", 0, total_esic_er, f"ESI employer contribution")
-    if total_pt > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "Professional Tax Payable", 0, total_pt, f"Professional Tax")
-    if total_tds > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"SLR/{month:02d}/{year}", "TDS Payable", 0, total_tds, f"TDS deduction")
-    
-    csv_content = "\n".join(csv_lines)
-    
-    from fastapi.responses import StreamingResponse
+    voucher_set = VoucherService(db).build(JOURNAL, month, year)
     return StreamingResponse(
-        iter([csv_content]),
+        voucher_set.iter_csv(),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=journal_entries_{month}_{year}.csv"}
     )
@@ -746,198 +495,118 @@ def mark_payroll_paid(
     }
 
 
+@router.get("/disbursement-file")
+def disbursement_file(
+    month: int,
+    year: int,
+    layout: str = "neft_csv",
+    value_date: str = None,
+    max_rows: Optional[int] = Query(None, gt=0),
+    max_amount: Optional[float] = Query(None, gt=0),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.HR))
+):
+    if layout not in BANK_LAYOUTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown bank layout. Available: {', '.join(sorted(BANK_LAYOUTS))}"
+        )
+    
+    pending, max_payment_paise = DisbursementService(db).payment_bounds(month, year)
+    if not pending:
+        raise HTTPException(status_code=404, detail="No approved payroll records found")
+    
+    try:
+        paid_on = datetime.strptime(value_date, '%Y-%m-%d').date() if value_date else datetime.now().date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="value_date must be YYYY-MM-DD")
+    
+    context = DisbursementContext(month, year, paid_on, settings.DISBURSEMENT_DEBIT_ACCOUNT)
+    
+    # Once streaming starts the 200 is sent; an overflowing field must be refused here.
+    try:
+        DisbursementWriter(BANK_LAYOUTS[layout], context, max_rows=max_rows, max_amount=max_amount).check(
+            pending, max_payment_paise
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Payments do not fit the {layout} layout: {e}")
+    
+    def entries(export_db: Session):
+        validation = ReturnValidation()
+        writer = DisbursementWriter(BANK_LAYOUTS[layout], context, max_rows=max_rows, max_amount=max_amount)
+        yield from writer.files(DisbursementService(export_db).payments(month, year, validation))
+        yield "CONTROL.csv", writer.control_file(validation)
+    
+    return StreamingResponse(
+        iter_zip(session_rows(entries), compression=zipfile.ZIP_DEFLATED),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=salary_disbursement_{month}_{year}.zip"}
+    )
+
+
 @router.get("/payment-entries")
 def generate_payment_entries(
     month: int,
     year: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year,
-        PayrollRecord.status == 'paid'
-    ).all()
-    
-    if not records:
+    voucher_set = VoucherService(db).build(PAYMENT, month, year)
+    if not voucher_set.record_count:
         raise HTTPException(status_code=404, detail="No paid payroll records found for this period")
     
-    total_gross = sum(r.gross_earnings for r in records)
-    total_pf_emp = sum(r.pf_employee for r in records)
-    total_pf_er = sum(r.pf_employer for r in records)
-    total_esic_emp = sum(r.esic_employee for r in records)
-    total_esic_er = sum(r.esic_employer for r in records)
-    total_pt = sum(r.professional_tax for r in records)
-    total_tds = sum(r.tds for r in records)
-    total_net = sum(r.net_salary for r in records)
-    total_other = sum(r.other_deductions for r in records)
-    
-    entries = []
-    total_debit = 0
-    total_credit = 0
-    
-    if total_net > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "Salary Payable - Net",
-            "debit": round(total_net, 2),
-            "credit": 0,
-            "narration": f"Net salary payment for {datetime(year, month, 1).strftime('%B %Y')}"
-        })
-        total_debit += total_net
-    
-    if total_pf_emp > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "PF Payable - Employee",
-            "debit": round(total_pf_emp, 2),
-            "credit": 0,
-            "narration": f"PF remittance for employees"
-        })
-        total_debit += total_pf_emp
-    
-    if total_pf_er > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "PF Payable - Employer",
-            "debit": round(total_pf_er, 2),
-            "credit": 0,
-            "narration": f"PF employer contribution remittance"
-        })
-        total_debit += total_pf_er
-    
-    if total_esic_emp > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "ESI Payable - Employee",
-            "debit": round(total_esic_emp, 2),
-            "credit": 0,
-            "narration": f"ESI remittance for employees"
-        })
-        total_debit += total_esic_emp
-    
-    if total_esic_er > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "ESI Payable - Employer",
-            "debit": round(total_esic_er, 2),
-            "credit": 0,
-            "narration": f"ESI employer contribution remittance"
-        })
-        total_debit += total_esic_er
-    
-    if total_pt > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "Professional Tax Payable",
-            "debit": round(total_pt, 2),
-            "credit": 0,
-            "narration": f"Professional Tax payment"
-        })
-        total_debit += total_pt
-    
-    if total_tds > 0:
-        entries.append({
-            "date": f"{year}-{month:02d}-01",
-            "voucher_type": "Payment",
-            "voucher_no": f"PMT/{month:02d}/{year}",
-            "account": "TDS Payable",
-            "debit": round(total_tds, 2),
-            "credit": 0,
-            "narration": f"TDS remittance"
-        })
-        total_debit += total_tds
-    
-    entries.append({
-        "date": f"{year}-{month:02d}-01",
-        "voucher_type": "Payment",
-        "voucher_no": f"PMT/{month:02d}/{year}",
-        "account": "Bank",
-        "debit": 0,
-        "credit": round(total_debit, 2),
-        "narration": f"Total payment via bank for {datetime(year, month, 1).strftime('%B %Y')}"
-    })
-    total_credit += total_debit
-    
-    return {
-        "month": month,
-        "year": year,
-        "voucher_date": f"{year}-{month:02d}-01",
-        "voucher_number": f"PMT/{month:02d}/{year}",
-        "entries": entries,
-        "totals": {
-            "total_debit": round(total_debit, 2),
-            "total_credit": round(total_credit, 2),
-            "balanced": abs(total_debit - total_credit) < 0.01
-        }
-    }
+    return _voucher_response(voucher_set, month, year, "PMT")
 
 
 @router.get("/payment-entries-csv")
 def generate_payment_entries_csv(
     month: int,
     year: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    records = db.query(PayrollRecord).filter(
-        PayrollRecord.month == month,
-        PayrollRecord.year == year,
-        PayrollRecord.status == 'paid'
-    ).all()
-    
-    if not records:
+    voucher_set = VoucherService(db).build(PAYMENT, month, year)
+    if not voucher_set.record_count:
         raise HTTPException(status_code=404, detail="No paid payroll records found")
     
-    total_gross = sum(r.gross_earnings for r in records)
-    total_pf_emp = sum(r.pf_employee for r in records)
-    total_pf_er = sum(r.pf_employer for r in records)
-    total_esic_emp = sum(r.esic_employee for r in records)
-    total_esic_er = sum(r.esic_employer for r in records)
-    total_pt = sum(r.professional_tax for r in records)
-    total_tds = sum(r.tds for r in records)
-    total_net = sum(r.net_salary for r in records)
-    
-    csv_lines = ["Date,Voucher Type,Voucher No,Account,Debit,Credit,Narration"]
-    
-    def add_entry(date, voucher_type, voucher_no, account, debit, credit, narration):
-        csv_lines.append(f'{date},{voucher_type},{voucher_no},"{account}",{debit:.2f},{credit:.2f},"{narration}"')
-    
-    if total_net > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "Salary Payable - Net", total_net, 0, "Net salary payment")
-    if total_pf_emp > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "PF Payable - Employee", total_pf_emp, 0, "PF employee remittance")
-    if total_pf_er > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "PF Payable - Employer", total_pf_er, 0, "PF employer remittance")
-    if total_esic_emp > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "ESI Payable - Employee", total_esic_emp, 0, "ESI employee remittance")
-    if total_esic_er > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "ESI Payable - Employer", total_esic_er, 0, "ESI employer remittance")
-    if total_pt > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "Professional Tax Payable", total_pt, 0, "Professional Tax payment")
-    if total_tds > 0:
-        add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "TDS Payable", total_tds, 0, "TDS remittance")
-    
-    total_payment = total_net + total_pf_emp + total_pf_er + total_esic_emp + total_esic_er + total_pt + total_tds
-    add_entry(f"{year}-{month:02d}-01", "Payment", f"PMT/{month:02d}/{year}", "Bank", 0, total_payment, "Total bank payment")
-    
-    csv_content = "\n".join(csv_lines)
-    
-    from fastapi.responses import StreamingResponse
     return StreamingResponse(
-        iter([csv_content]),
+        voucher_set.iter_csv(),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=payment_entries_{month}_{year}.csv"}
     )
+
+
+@router.get("/vouchers")
+def export_vouchers(
+    kind: str = Query(JOURNAL, pattern=f"^({JOURNAL}|{PAYMENT})$"),
+    month: int = Query(..., ge=1, le=12),
+    year: int = Query(..., ge=2020),
+    to_month: Optional[int] = Query(None, ge=1, le=12),
+    to_year: Optional[int] = Query(None, ge=2020),
+    split_by_department: bool = False,
+    format: str = Query("json", pattern=f"^({'|'.join(VOUCHER_FORMATS)})$"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    voucher_set = VoucherService(db).build(kind, month, year, to_month, to_year, split_by_department)
+    filename = f"{kind}_vouchers_{month}_{year}"
+    
+    if format == "json":
+        return voucher_set.to_json()
+    if format == "csv":
+        return StreamingResponse(
+            voucher_set.iter_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}.csv"}
+        )
+    if format == "tally":
+        return Response(
+            voucher_set.to_tally_xml(),
+            media_type="application/xml",
+            headers={"Content-Disposition": f"attachment; filename={filename}.xml"}
+        )
+    return Response(
+        voucher_set.to_iif(),
+        media_type="text/plain",
+        headers={"Content-Disposition": f"attachment; filename={filename}.iif"}
+    )
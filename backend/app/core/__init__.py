@@ -1,12 +1,17 @@
 from app.core.config import settings
-from app.core.database import Base, engine, get_db, init_db
+from app.core.database import Base, engine, async_engine, get_db, get_async_db, init_db
+from app.core.replicas import get_read_db, get_async_read_db, replica_router
 from app.core.security import (
     verify_password,
+    verify_and_update_password,
     get_password_hash,
+    get_password_hash_async,
     create_access_token,
+    create_user_token,
     decode_token,
     get_current_user,
     get_current_active_user,
+    require_roles,
     pwd_context,
     oauth2_scheme
 )
@@ -15,14 +20,23 @@ __all__ = [
     "settings",
     "Base",
     "engine",
+    "async_engine",
     "get_db",
+    "get_async_db",
     "init_db",
+    "get_read_db",
+    "get_async_read_db",
+    "replica_router",
     "verify_password",
+    "verify_and_update_password",
     "get_password_hash",
+    "get_password_hash_async",
     "create_access_token",
+    "create_user_token",
     "decode_token",
     "get_current_user",
     "get_current_active_user",
+    "require_roles",
     "pwd_context",
     "oauth2_scheme"
 ]
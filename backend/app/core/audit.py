@@ -0,0 +1,71 @@
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from app.models.document import AuditLog
+from typing import Optional
+from datetime import datetime
+import orjson
+
+PENDING_AUDIT_KEY = "pending_audit_events"
+
+
+def dumps_diff(value: Optional[dict]) -> Optional[str]:
+    """Compact JSON for an audit diff; datetimes and enums are encoded natively, anything else via str()."""
+    if not value:
+        return None
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def row_values(row) -> dict:
+    """Every column of a mapped row; create events record this so history can start from them."""
+    return {column.key: getattr(row, column.key) for column in row.__mapper__.column_attrs}
+
+
+def record_audit(
+    db: Session,
+    user_id: Optional[int],
+    action: str,
+    entity_type: str,
+    entity_id: Optional[int] = None,
+    old_value: Optional[dict] = None,
+    new_value: Optional[dict] = None
+):
+    """Queue an audit event on `db`; it is written by the same commit as the change it describes.
+
+    Events accumulate in the session's unit of work and are inserted together,
+    in one executemany, right before the session commits. The change and its
+    audit trail are therefore durable together, a mutation costs one commit
+    instead of two, and a rollback discards both. Record the event before
+    calling commit; on a session that is never committed the event is dropped
+    with the change.
+
+    created_at is taken here, to the microsecond, rather than left to the
+    database's whole-second default: history cuts events by time, and two
+    changes in the same second must still fall on the right sides of a cut.
+    """
+    session = db if isinstance(db, Session) else db.sync_session  # AsyncSession
+    if not session.in_transaction():
+        # Tie the event to a transaction so that ending it without a commit discards the event.
+        session.begin()
+    session.info.setdefault(PENDING_AUDIT_KEY, []).append({
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "old_value": dumps_diff(old_value),
+        "new_value": dumps_diff(new_value),
+        "created_at": datetime.now(),
+    })
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_audit(session: Session):
+    events = session.info.pop(PENDING_AUDIT_KEY, None)
+    if events:
+        session.execute(insert(AuditLog), events)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_audit(session: Session, transaction):
+    # Outermost transaction ended without passing through before_commit (rollback or close).
+    if transaction.parent is None:
+        session.info.pop(PENDING_AUDIT_KEY, None)
@@ -9,11 +9,34 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./payrolledge.db"
+    # Derived from DATABASE_URL (aiosqlite / asyncpg) unless set explicitly
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool (pre-ping and recycle only apply to server databases)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # SQLite pragmas applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Read replicas for reports, exports and list endpoints; empty reads from the primary
+    DATABASE_REPLICA_URLS: list = []
+    REPLICA_MAX_LAG_SECONDS: float = 30.0
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0
     
     # Security
     SECRET_KEY: str = "payrolledge-secret-key-change-in-production-2024"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_VERSION_REFRESH_SECONDS: float = 30.0
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
     
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:5176", "http://localhost:5177", "http://127.0.0.1:5173", "http://127.0.0.1:5174", "http://127.0.0.1:5175", "http://127.0.0.1:5176", "http://127.0.0.1:5177"]
@@ -21,6 +44,64 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
+    # Cursor pages with count=estimate stop counting here and report the total as inexact
+    PAGINATION_COUNT_CAP: int = 10000
+    
+    # Employee search (FTS5 on SQLite, pg_trgm on PostgreSQL)
+    # Words at least this long that match nothing are widened to near spellings
+    SEARCH_FUZZY_MIN_LENGTH: int = 4
+    
+    # File storage
+    STORAGE_DIR: str = "./storage"
+    # Document files are stored by SHA-256 under STORAGE_DIR/documents
+    DOCUMENT_MAX_BYTES: int = 50 * 1024 * 1024
+    # Thumbnail/first-page preview rendering processes (0 renders in-process)
+    DOCUMENT_PREVIEW_WORKERS: int = 2
+    # Document expiry scan: look-ahead window, how long expired documents stay listed,
+    # documents listed per department in the widget, widget cache, rescan interval (0 disables)
+    DOCUMENT_EXPIRY_WITHIN_DAYS: int = 30
+    DOCUMENT_EXPIRY_LOOKBACK_DAYS: int = 365
+    DOCUMENT_EXPIRY_WIDGET_ITEMS: int = 5
+    DOCUMENT_EXPIRY_CACHE_TTL_SECONDS: float = 300.0
+    DOCUMENT_EXPIRY_SCAN_INTERVAL_SECONDS: float = 86400.0
+    
+    # Audit log: monthly partitions; those older than AUDIT_ONLINE_MONTHS are archived to gzipped NDJSON
+    AUDIT_ONLINE_MONTHS: int = 24
+    AUDIT_ARCHIVE_DIR: str = "./storage/audit_archive"
+    # PostgreSQL partitions are created this many months ahead
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 2
+    # How often the server rolls finished months into partitions (0 disables)
+    AUDIT_ROLLOVER_INTERVAL_SECONDS: float = 86400.0
+    # Entity history snapshots: one per this many audit events, bounding as-of replays
+    AUDIT_SNAPSHOT_EVERY: int = 100
+    
+    # Form 16 batch generation
+    FORM16_RENDER_WORKERS: int = 4
+    FORM16_JOB_CHUNK_SIZE: int = 500
+    # A running job with no checkpoint for this long is taken to have lost its runner and may be resumed
+    FORM16_JOB_STALE_SECONDS: int = 900
+    
+    # Bank salary disbursement files
+    DISBURSEMENT_DEBIT_ACCOUNT: str = ""
+    DISBURSEMENT_MAX_ROWS: int = 5000
+    DISBURSEMENT_MAX_AMOUNT: float = 10000000.0
+    
+    # Email (SMTP)
+    SMTP_HOST: str = ""
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_START_TLS: bool = True
+    SMTP_USE_TLS: bool = False
+    SMTP_TIMEOUT: float = 30.0
+    SMTP_FROM: str = "noreply@payrolledge.com"
+    
+    # Payslip email dispatch
+    PAYSLIP_MAIL_CONNECTIONS: int = 4
+    PAYSLIP_MAIL_MESSAGES_PER_CONNECTION: int = 200
+    PAYSLIP_MAIL_RATE_PER_SECOND: float = 20.0
+    PAYSLIP_MAIL_MAX_RETRIES: int = 3
+    PAYSLIP_MAIL_RETRY_BACKOFF: float = 2.0
 
     class Config:
         case_sensitive = True
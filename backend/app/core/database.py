@@ -1,16 +1,122 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from typing import Dict, Optional
+import os
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=False
-)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASELINE_REVISION = "0001"
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver (aiosqlite or asyncpg)."""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+")[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    raise ValueError(f"No async driver configured for {dialect} databases")
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory(url: str) -> bool:
+    return ":memory:" in url or url.split("://", 1)[1] in ("", "/")
+
+
+def sqlite_pragmas() -> Dict[str, object]:
+    """PRAGMAs from settings, in the order they are applied to each connection.
+
+    busy_timeout comes first so switching the journal mode waits out a concurrent
+    writer instead of failing; journal_mode=WAL is persistent in the file, the rest
+    are per connection. A negative cache_size is in KiB rather than pages.
+    """
+    return {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    }
+
+
+def set_sqlite_pragmas(target_engine, pragmas: Optional[Dict[str, object]] = None):
+    """Apply `pragmas` (default: `sqlite_pragmas()`) whenever the engine opens a connection."""
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(target_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def engine_options(url: str) -> dict:
+    """Pool arguments for `url`; in-memory SQLite keeps SQLAlchemy's single-connection pool."""
+    if _is_sqlite(url) and _is_memory(url):
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if not _is_sqlite(url):
+        # Server connections are dropped by idle timeouts and failovers; local files are not.
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE_SECONDS
+    return options
+
+
+def make_engine(url: str):
+    """Sync engine for `url` with the configured pool and, for SQLite, the pragma profile."""
+    sqlite = _is_sqlite(url)
+    created = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if sqlite else {},
+        echo=False,
+        **engine_options(url)
+    )
+    if sqlite:
+        set_sqlite_pragmas(created)
+    return created
+
+
+def make_async_engine(url: str):
+    """Async engine for an async-driver `url`, configured like `make_engine`."""
+    sqlite = _is_sqlite(url)
+    created = create_async_engine(
+        url,
+        # aiosqlite defaults to NullPool for database files, which opens a connection
+        # and a worker thread per session; keep them pooled like the sync engine does.
+        poolclass=AsyncAdaptedQueuePool if sqlite and not _is_memory(url) else None,
+        echo=False,
+        **engine_options(url)
+    )
+    if sqlite:
+        set_sqlite_pragmas(created.sync_engine)
+    return created
+
+
+engine = make_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+
+async_engine = make_async_engine(ASYNC_DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -22,5 +128,33 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def migration_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
 def init_db():
+    """Create missing tables, then bring the schema to the latest migration.
+
+    create_all builds new databases complete (indexes included), so their
+    migrations find nothing to do. Databases that predate migrations are
+    stamped at the baseline first and upgraded from there.
+    """
+    from alembic import command
+    from sqlalchemy import inspect
+
     Base.metadata.create_all(bind=engine)
+    config = migration_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        if not inspect(connection).has_table("alembic_version"):
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
@@ -0,0 +1,149 @@
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import (
+    engine, async_engine, make_engine, make_async_engine, async_database_url
+)
+from app.models.system import ReplicationHeartbeat
+from typing import List, Optional
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_ID = 1
+
+
+class ReadSession(Session):
+    """Session that reads from `replica` and sends flushes and DML to `primary`.
+
+    With no replica (none configured, or all stale) everything goes to the primary.
+    """
+
+    def __init__(self, primary=None, replica=None, **kw):
+        super().__init__(**kw)
+        self.primary = primary
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replica is None or self._flushing or isinstance(clause, UpdateBase):
+            return self.primary
+        return self.replica
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = make_engine(url)
+        self.async_engine = make_async_engine(async_database_url(url))
+        self.lag: Optional[float] = None  # None until a heartbeat has been read
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaRouter:
+    """Chooses a fresh replica per read session, round robin.
+
+    Every `check_interval` seconds the primary's heartbeat row is rewritten and
+    each replica's copy of it is read back; a replica whose copy is older than
+    `max_lag` seconds, or that cannot be reached, is skipped until the next check.
+    Lag is only known to within `check_interval`.
+    """
+
+    def __init__(self, urls: List[str], max_lag: float, check_interval: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+
+    def refresh_due(self) -> bool:
+        return bool(self.replicas) and time.monotonic() - self._checked_at >= self.check_interval
+
+    def _beat(self) -> float:
+        now = time.time()
+        with engine.begin() as conn:
+            updated = conn.execute(
+                update(ReplicationHeartbeat).where(ReplicationHeartbeat.id == HEARTBEAT_ID).values(beat_at=now)
+            ).rowcount
+            if not updated:
+                conn.execute(insert(ReplicationHeartbeat).values(id=HEARTBEAT_ID, beat_at=now))
+        return now
+
+    def refresh(self):
+        with self._lock:
+            if not self.refresh_due():
+                return
+            self._checked_at = time.monotonic()
+        try:
+            self._beat()
+        except SQLAlchemyError:
+            logger.exception("Could not write the replication heartbeat on the primary")
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    beat_at = conn.execute(
+                        select(ReplicationHeartbeat.beat_at).where(ReplicationHeartbeat.id == HEARTBEAT_ID)
+                    ).scalar()
+                replica.lag = None if beat_at is None else max(time.time() - beat_at, 0.0)
+            except SQLAlchemyError as e:
+                replica.lag = None
+                logger.warning("Replica %s unreachable: %s", replica.name, e)
+
+    def choose(self) -> Optional[Replica]:
+        fresh = [r for r in self.replicas if r.lag is not None and r.lag <= self.max_lag]
+        if not fresh:
+            return None
+        return fresh[next(self._turn) % len(fresh)]
+
+    def status(self) -> List[dict]:
+        return [
+            {"replica": r.name, "lag_seconds": r.lag, "in_rotation": r.lag is not None and r.lag <= self.max_lag}
+            for r in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_SECONDS
+)
+
+ReadSessionLocal = sessionmaker(class_=ReadSession, primary=engine, autocommit=False, autoflush=False)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    sync_session_class=ReadSession, primary=async_engine.sync_engine, autoflush=False, expire_on_commit=False
+)
+
+
+def read_session() -> ReadSession:
+    """A session for read-only work, on a fresh replica when one is available."""
+    if replica_router.refresh_due():
+        replica_router.refresh()
+    replica = replica_router.choose()
+    return ReadSessionLocal(replica=replica.engine if replica else None)
+
+
+def get_read_db():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    if replica_router.refresh_due():
+        await run_in_threadpool(replica_router.refresh)
+    replica = replica_router.choose()
+    async with AsyncReadSessionLocal(replica=replica.async_engine.sync_engine if replica else None) as db:
+        yield db
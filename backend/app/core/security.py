@@ -1,26 +1,157 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.cache import TTLCache
+import asyncio
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min and max rounds to the configured cost makes passlib flag hashes
+# of any other cost, so they are upgraded (or downgraded) on the next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+class UserPrincipal(NamedTuple):
+    """The fields authorization needs, cached per user instead of loading `User` each request."""
+    id: int
+    role: object
+    is_active: bool
+    is_superuser: bool
+    employee_id: Optional[int]
+
+
+principal_cache = TTLCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+
+class TokenVersionTable:
+    """In-memory copy of `user_token_versions`, reloaded every `refresh_seconds`.
+
+    Only users whose tokens were ever revoked have a row, so the whole table is
+    small enough to hold. Revocations made in this process apply at once; those
+    made by other workers apply at the next refresh. The reload is a blocking
+    query, so async callers run `refresh` in the threadpool when `refresh_due`.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: dict = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh_due(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def refresh(self):
+        with self._lock:
+            if self.refresh_due():
+                self._reload()
+
+    def _reload(self):
+        from sqlalchemy.exc import SQLAlchemyError
+        from app.core.database import SessionLocal
+        from app.models.user import UserTokenVersion
+        
+        db = SessionLocal()
+        try:
+            versions = dict(db.query(UserTokenVersion.user_id, UserTokenVersion.version).all())
+        except SQLAlchemyError as e:
+            logger.warning(f"Token version refresh failed, keeping previous table: {e}")
+            versions = self._versions
+        finally:
+            db.close()
+        
+        for user_id, version in self._versions.items():
+            if versions.get(user_id, 0) < version:
+                versions[user_id] = version
+        self._versions = versions
+        self._loaded_at = time.monotonic()
+
+    def get(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def set(self, user_id: int, version: int):
+        with self._lock:
+            if self._versions.get(user_id, 0) < version:
+                self._versions[user_id] = version
+
+
+token_versions = TokenVersionTable(settings.TOKEN_VERSION_REFRESH_SECONDS)
+
+
+def invalidate_user(user_id: int, token_version: Optional[int] = None):
+    principal_cache.invalidate(user_id)
+    if token_version is not None:
+        token_versions.set(user_id, token_version)
+
+
+def current_token_version(db: Session, user_id: int) -> int:
+    from app.models.user import UserTokenVersion
+    
+    version = db.query(UserTokenVersion.version).filter(UserTokenVersion.user_id == user_id).scalar()
+    return version or 0
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """Bump the user's token version in the current transaction and return it.
+
+    Call `invalidate_user(user_id, version)` after the commit so this process
+    stops accepting the old tokens straight away.
+    """
+    from app.models.user import UserTokenVersion
+    
+    row = db.query(UserTokenVersion).filter(UserTokenVersion.user_id == user_id).first()
+    if row is None:
+        row = UserTokenVersion(user_id=user_id, version=0)
+        db.add(row)
+    row.version = (row.version or 0) + 1
+    return row.version
+
+
+# bcrypt releases the GIL, so a few threads use that many cores; capping them
+# keeps a login storm from starving every other request of CPU. Async callers
+# await the pool, so a login waiting for a hashing thread holds no request thread.
+_hash_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a replacement hash when the stored one uses a different cost."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, pwd_context.hash, password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    """For sync callers (admin user creation); blocks the calling thread until the pool has hashed."""
+    return _hash_pool.submit(pwd_context.hash, password).result()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -34,10 +165,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_user_token(db: Session, user, expires_delta: Optional[timedelta] = None) -> str:
+    """Issue a token carrying the claims `get_current_user` authorizes from."""
+    role = user.role.value if hasattr(user.role, "value") else user.role
+    return create_access_token(
+        data={
+            "sub": str(user.id),
+            "role": role,
+            "su": bool(user.is_superuser),
+            "emp": user.employee_id,
+            "ver": current_token_version(db, user.id)
+        },
+        expires_delta=expires_delta
+    )
+
+
 def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        logger.info(f"Token decoded successfully: {payload}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Token decoded for subject %s", payload.get("sub"))
         return payload
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
@@ -49,15 +196,12 @@ def decode_token(token: str) -> Optional[dict]:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
     from app.models.user import User
     
-    logger.info(f"get_current_user called with token: {token[:50]}...")
-    
     payload = decode_token(token)
     if payload is None:
-        logger.error("Token decode failed")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -65,8 +209,6 @@ async def get_current_user(
         )
     
     user_id_str = payload.get("sub")
-    logger.info(f"Token payload: {payload}, user_id_str: {user_id_str}")
-    
     if user_id_str is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,17 +223,59 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    if "ver" in payload:
+        # Claims tokens are authorized without touching the database; revocation
+        # (role change, deactivation) works by bumping the user's token version.
+        from app.models.user import UserRole
+        
+        if token_versions.refresh_due():
+            await run_in_threadpool(token_versions.refresh)
+        if payload["ver"] < token_versions.get(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        try:
+            role = UserRole(payload.get("role"))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+            )
+        return UserPrincipal(user_id, role, True, bool(payload.get("su")), payload.get("emp"))
+    
+    # Tokens issued before role claims existed fall back to a cached lookup.
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    row = (await db.execute(
+        select(User.id, User.role, User.is_active, User.is_superuser, User.employee_id).filter(User.id == user_id)
+    )).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
-    return user
+    principal = UserPrincipal(*row)
+    principal_cache.set(user_id, principal)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Resolved user %s from database", user_id)
+    return principal
 
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+def require_roles(*roles):
+    """Dependency allowing superusers and the given roles, decided from token claims alone."""
+    def role_checker(current_user: UserPrincipal = Depends(get_current_active_user)):
+        if current_user.role not in roles and not current_user.is_superuser:
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        return current_user
+    return role_checker
@@ -1,4 +1,6 @@
-from app.models.user import User, UserRole, Department, Designation, Employee, EmployeeStatus
+from app.models.user import (
+    User, UserRole, UserTokenVersion, Department, Designation, Employee, EmployeeStatus
+)
 from app.models.attendance import (
     Attendance, AttendanceStatus, Shift,
     LeaveRequest, LeaveType, LeaveRequestStatus, LeaveBalance
@@ -6,17 +8,23 @@ from app.models.attendance import (
 from app.models.payroll import (
     SalaryComponent, ComponentType,
     PayrollRecord, PayrollStatus,
-    PayrollSettings
+    PayrollSettings, Form16Job, Form16JobStatus,
+    PayslipDelivery, PayslipDeliveryStatus
 )
 from app.models.document import (
-    Document, DocumentType, DocumentStatus,
-    OnboardingChecklist, Holiday, AuditLog
+    Document, DocumentType, DocumentStatus, DocumentPreviewStatus, DocumentUpload, DocumentExpirySummary,
+    OnboardingChecklist, Holiday, AuditLog, AuditSnapshot
 )
+from app.models.system import ReplicationHeartbeat, CodeSequence
+from app.models import search  # noqa: F401  (creates the employee search index with `employees`)
 
 __all__ = [
-    "User", "UserRole", "Department", "Designation", "Employee", "EmployeeStatus",
+    "User", "UserRole", "UserTokenVersion", "Department", "Designation", "Employee", "EmployeeStatus",
     "Attendance", "AttendanceStatus", "Shift",
     "LeaveRequest", "LeaveType", "LeaveRequestStatus", "LeaveBalance",
     "SalaryComponent", "ComponentType", "PayrollRecord", "PayrollStatus", "PayrollSettings",
-    "Document", "DocumentType", "DocumentStatus", "OnboardingChecklist", "Holiday", "AuditLog"
+    "Form16Job", "Form16JobStatus", "PayslipDelivery", "PayslipDeliveryStatus",
+    "Document", "DocumentType", "DocumentStatus", "DocumentPreviewStatus", "DocumentUpload", "DocumentExpirySummary",
+    "OnboardingChecklist", "Holiday", "AuditLog", "AuditSnapshot",
+    "ReplicationHeartbeat", "CodeSequence"
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,6 +17,9 @@ class AttendanceStatus(str, enum.Enum):
 
 class Attendance(Base):
     __tablename__ = "attendances"
+    __table_args__ = (
+        Index("uq_attendances_employee_id_date", "employee_id", "date", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -78,6 +81,9 @@ class LeaveRequestStatus(str, enum.Enum):
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        Index("ix_leave_requests_employee_id_status", "employee_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -103,6 +109,9 @@ class LeaveRequest(Base):
 
 class LeaveBalance(Base):
     __tablename__ = "leave_balances"
+    __table_args__ = (
+        Index("ix_leave_balances_employee_id_year_leave_type", "employee_id", "year", "leave_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import BigInteger, Column, Index, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -25,6 +25,13 @@ class DocumentStatus(str, enum.Enum):
     REJECTED = "rejected"
 
 
+class DocumentPreviewStatus(str, enum.Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    UNSUPPORTED = "unsupported"
+
+
 class Document(Base):
     __tablename__ = "documents"
     
@@ -36,6 +43,14 @@ class Document(Base):
     file_path = Column(String(500))
     file_url = Column(String(500))
     
+    # Uploaded file, stored under its SHA-256 (app/services/document_store.py)
+    file_name = Column(String(255))
+    content_type = Column(String(100))
+    file_size = Column(BigInteger)
+    content_sha256 = Column(String(64), index=True)
+    # Thumbnail and first-page previews of the file (app/services/document_previews.py)
+    preview_status = Column(SQLEnum(DocumentPreviewStatus), nullable=True)
+    
     document_number = Column(String(100))
     issue_date = Column(DateTime, nullable=True)
     expiry_date = Column(DateTime, nullable=True)
@@ -50,6 +65,45 @@ class Document(Base):
     
     employee = relationship("Employee", back_populates="documents")
     verifier = relationship("User")
+    
+    __table_args__ = (
+        # Expiry scans read a date range of this index; employee_id and status come with it
+        Index("ix_documents_expiry_date_employee_id_status", "expiry_date", "employee_id", "status"),
+    )
+
+
+class DocumentExpirySummary(Base):
+    """One department's result from the last document expiry scan; the dashboard reads these, not documents."""
+
+    __tablename__ = "document_expiry_summaries"
+    
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)  # None: employees without one
+    within_days = Column(Integer, nullable=False)
+    expired_count = Column(Integer, nullable=False, default=0)
+    expiring_count = Column(Integer, nullable=False, default=0)
+    # JSON lists of the first DOCUMENT_EXPIRY_WIDGET_ITEMS documents of each kind
+    expired_items = Column(Text)
+    expiring_items = Column(Text)
+    scanned_at = Column(DateTime, nullable=False)
+
+
+class DocumentUpload(Base):
+    """Resumable upload of a document's file; the bytes received so far are the size of its part file."""
+
+    __tablename__ = "document_uploads"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex, also names the part file
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    file_name = Column(String(255), nullable=False)
+    content_type = Column(String(100))
+    total_size = Column(BigInteger, nullable=False)
+    
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    completed_at = Column(DateTime, nullable=True)
+    
+    document = relationship("Document")
 
 
 class OnboardingChecklist(Base):
@@ -88,6 +142,11 @@ class Holiday(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_entity_type_created_at", "entity_type", "created_at"),
+        Index("ix_audit_logs_entity_type_entity_id", "entity_type", "entity_id"),
+        Index("ix_audit_logs_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -105,3 +164,23 @@ class AuditLog(Base):
     created_at = Column(DateTime, server_default=func.now())
     
     user = relationship("User")
+
+
+class AuditSnapshot(Base):
+    """State of an entity as of one audit event, so history replays start here instead of at creation."""
+
+    __tablename__ = "audit_snapshots"
+    __table_args__ = (
+        Index("ix_audit_snapshots_entity_type_entity_id_taken_at", "entity_type", "entity_id", "taken_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(100), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    
+    # Last event included; no foreign key, since archival drops audit_logs partitions.
+    audit_log_id = Column(Integer, nullable=False)
+    taken_at = Column(DateTime, nullable=False)  # created_at of that event
+    state = Column(Text)  # JSON object; NULL if the entity did not exist at that point
+    
+    created_at = Column(DateTime, server_default=func.now())
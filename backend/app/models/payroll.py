@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,9 @@ class ComponentType(str, enum.Enum):
 
 class SalaryComponent(Base):
     __tablename__ = "salary_components"
+    __table_args__ = (
+        Index("ix_salary_components_employee_id_is_active", "employee_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -41,6 +44,10 @@ class PayrollStatus(str, enum.Enum):
 
 class PayrollRecord(Base):
     __tablename__ = "payroll_records"
+    __table_args__ = (
+        Index("ix_payroll_records_year_month_status", "year", "month", "status"),
+        Index("uq_payroll_records_employee_id_year_month", "employee_id", "year", "month", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -116,3 +123,55 @@ class PayrollSettings(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class Form16JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Form16Job(Base):
+    __tablename__ = "form16_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    financial_year = Column(Integer, nullable=False)
+    status = Column(SQLEnum(Form16JobStatus), default=Form16JobStatus.PENDING)
+    
+    total_employees = Column(Integer, default=0)
+    processed_employees = Column(Integer, default=0)
+    last_employee_id = Column(Integer, default=0)
+    parts = Column(Integer, default=0)
+    error = Column(Text)
+    
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime, nullable=True)
+    
+    creator = relationship("User")
+
+
+class PayslipDeliveryStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class PayslipDelivery(Base):
+    __tablename__ = "payslip_deliveries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    payroll_record_id = Column(Integer, ForeignKey("payroll_records.id"), nullable=False, unique=True, index=True)
+    
+    email = Column(String(255))
+    status = Column(SQLEnum(PayslipDeliveryStatus), default=PayslipDeliveryStatus.PENDING)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    sent_at = Column(DateTime, nullable=True)
+    
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    payroll_record = relationship("PayrollRecord")
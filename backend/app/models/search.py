@@ -0,0 +1,139 @@
+"""Employee search index, kept in the database next to `employees`.
+
+SQLite gets an FTS5 table (plus an fts5vocab view of its terms for typo
+expansion); PostgreSQL gets a trigram-indexed document table. Both are filled
+by triggers on `employees` and `departments`, so every write path, including
+bulk inserts that bypass the ORM, keeps the index current. Other backends get
+no index and search falls back to ILIKE.
+
+The objects are created with the `employees` table (create_all) and by the
+0003 migration for existing databases; they are raw DDL rather than ORM tables.
+"""
+from sqlalchemy import event
+from app.models.user import Employee
+
+EMPLOYEE_SEARCH_TABLE = "employee_search"
+EMPLOYEE_SEARCH_VOCAB = "employee_search_vocab"
+EMPLOYEE_SEARCH_COLUMNS = ("name", "employee_code", "email", "phone", "department")
+# bm25 weight per column, in EMPLOYEE_SEARCH_COLUMNS order
+EMPLOYEE_SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 3.0, 1.0)
+
+_SQLITE_DIGITS = "replace(replace(replace(replace(replace(coalesce(e.phone, ''), ' ', ''), '-', ''), '+', ''), '(', ''), ')', '')"
+# Digits only, plus the last ten digits so numbers match with or without the country code
+_SQLITE_PHONE = f"{_SQLITE_DIGITS} || ' ' || substr({_SQLITE_DIGITS}, -10)"
+_SQLITE_ROWS = f"""
+    SELECT e.id, trim(coalesce(e.first_name, '') || ' ' || coalesce(e.last_name, '')),
+           e.employee_code, e.email, {_SQLITE_PHONE}, d.name
+    FROM employees e LEFT JOIN departments d ON d.id = e.department_id"""
+_SQLITE_INSERT = f"INSERT INTO {EMPLOYEE_SEARCH_TABLE} (rowid, {', '.join(EMPLOYEE_SEARCH_COLUMNS)})"
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {EMPLOYEE_SEARCH_TABLE} USING fts5(
+        {', '.join(EMPLOYEE_SEARCH_COLUMNS)},
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {EMPLOYEE_SEARCH_VOCAB} USING fts5vocab({EMPLOYEE_SEARCH_TABLE}, 'row')",
+    f"INSERT INTO {EMPLOYEE_SEARCH_TABLE} ({EMPLOYEE_SEARCH_TABLE}, rank) "
+    f"VALUES ('rank', 'bm25({', '.join(str(w) for w in EMPLOYEE_SEARCH_WEIGHTS)})')",
+    f"""CREATE TRIGGER IF NOT EXISTS employee_search_insert AFTER INSERT ON employees BEGIN
+        {_SQLITE_INSERT} {_SQLITE_ROWS} WHERE e.id = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employee_search_update
+    AFTER UPDATE OF first_name, last_name, employee_code, email, phone, department_id ON employees BEGIN
+        DELETE FROM {EMPLOYEE_SEARCH_TABLE} WHERE rowid = OLD.id;
+        {_SQLITE_INSERT} {_SQLITE_ROWS} WHERE e.id = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employee_search_delete AFTER DELETE ON employees BEGIN
+        DELETE FROM {EMPLOYEE_SEARCH_TABLE} WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employee_search_department AFTER UPDATE OF name ON departments BEGIN
+        DELETE FROM {EMPLOYEE_SEARCH_TABLE} WHERE rowid IN (SELECT id FROM employees WHERE department_id = NEW.id);
+        {_SQLITE_INSERT} {_SQLITE_ROWS} WHERE e.department_id = NEW.id;
+    END""",
+]
+
+SQLITE_REBUILD = [
+    f"DELETE FROM {EMPLOYEE_SEARCH_TABLE}",
+    f"{_SQLITE_INSERT} {_SQLITE_ROWS}",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS employee_search_department",
+    "DROP TRIGGER IF EXISTS employee_search_delete",
+    "DROP TRIGGER IF EXISTS employee_search_update",
+    "DROP TRIGGER IF EXISTS employee_search_insert",
+    f"DROP TABLE IF EXISTS {EMPLOYEE_SEARCH_VOCAB}",
+    f"DROP TABLE IF EXISTS {EMPLOYEE_SEARCH_TABLE}",
+]
+
+_POSTGRES_ROWS = f"""
+    SELECT e.id, lower(concat_ws(' ', e.first_name, e.last_name, e.employee_code, e.email,
+                                 regexp_replace(coalesce(e.phone, ''), '[^0-9]', '', 'g'), d.name))
+    FROM employees e LEFT JOIN departments d ON d.id = e.department_id"""
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""CREATE TABLE IF NOT EXISTS {EMPLOYEE_SEARCH_TABLE} (
+        employee_id INTEGER PRIMARY KEY REFERENCES employees (id) ON DELETE CASCADE,
+        document TEXT NOT NULL
+    )""",
+    f"CREATE INDEX IF NOT EXISTS ix_employee_search_document_trgm ON {EMPLOYEE_SEARCH_TABLE} "
+    "USING gin (document gin_trgm_ops)",
+    f"""CREATE OR REPLACE FUNCTION employee_search_sync() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO {EMPLOYEE_SEARCH_TABLE} (employee_id, document) {_POSTGRES_ROWS}
+        WHERE CASE WHEN TG_TABLE_NAME = 'employees' THEN e.id = NEW.id ELSE e.department_id = NEW.id END
+        ON CONFLICT (employee_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE TRIGGER employee_search_sync
+    AFTER INSERT OR UPDATE OF first_name, last_name, employee_code, email, phone, department_id ON employees
+    FOR EACH ROW EXECUTE FUNCTION employee_search_sync()""",
+    """CREATE OR REPLACE TRIGGER employee_search_department
+    AFTER UPDATE OF name ON departments
+    FOR EACH ROW EXECUTE FUNCTION employee_search_sync()""",
+]
+
+POSTGRES_REBUILD = [
+    f"DELETE FROM {EMPLOYEE_SEARCH_TABLE}",
+    f"INSERT INTO {EMPLOYEE_SEARCH_TABLE} (employee_id, document) {_POSTGRES_ROWS}",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS employee_search_department ON departments",
+    "DROP TRIGGER IF EXISTS employee_search_sync ON employees",
+    "DROP FUNCTION IF EXISTS employee_search_sync()",
+    f"DROP TABLE IF EXISTS {EMPLOYEE_SEARCH_TABLE}",
+]
+
+SEARCH_DDL = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}
+SEARCH_REBUILD = {"sqlite": SQLITE_REBUILD, "postgresql": POSTGRES_REBUILD}
+SEARCH_DROP = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}
+
+
+def _run(connection, statements):
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def create_employee_search(connection):
+    """Create the index objects if missing and (re)fill the index from `employees`."""
+    _run(connection, SEARCH_DDL.get(connection.dialect.name, []))
+    rebuild_employee_search(connection)
+
+
+def rebuild_employee_search(connection):
+    _run(connection, SEARCH_REBUILD.get(connection.dialect.name, []))
+
+
+def drop_employee_search(connection):
+    _run(connection, SEARCH_DROP.get(connection.dialect.name, []))
+
+
+@event.listens_for(Employee.metadata, "after_create")
+def _create_with_employees(target, connection, tables=(), **kw):
+    # On the metadata rather than the table, so `departments` exists for its trigger.
+    if Employee.__table__ in tables:
+        create_employee_search(connection)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, String
+from app.core.database import Base
+
+
+class ReplicationHeartbeat(Base):
+    """Single row the primary rewrites periodically; its age on a replica is that replica's lag."""
+
+    __tablename__ = "replication_heartbeat"
+
+    id = Column(Integer, primary_key=True)
+    beat_at = Column(Float, nullable=False)  # Unix time, so lag needs no timezone handling
+
+
+class CodeSequence(Base):
+    """Named counter for generated codes; `next_value` is the first value not yet handed out."""
+
+    __tablename__ = "code_sequences"
+
+    name = Column(String(50), primary_key=True)
+    next_value = Column(Integer, nullable=False)
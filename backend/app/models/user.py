@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -30,6 +31,15 @@ class User(Base):
     employee = relationship("Employee", back_populates="user", foreign_keys=[employee_id])
 
 
+class UserTokenVersion(Base):
+    """Tokens carrying an older `ver` claim than this are rejected."""
+    __tablename__ = "user_token_versions"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
 class Department(Base):
     __tablename__ = "departments"
     
@@ -71,6 +81,11 @@ class EmployeeStatus(str, enum.Enum):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_department_id_is_active", "department_id", "is_active"),
+        # Emails are unique as typed, but matched without regard to case.
+        Index("ix_employees_email_lower", text("lower(email)")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_code = Column(String(50), unique=True, index=True)
@@ -28,14 +28,14 @@ from app.schemas.payroll import (
     PayrollSettingsBase, PayrollSettingsCreate, PayrollSettingsUpdate, PayrollSettingsResponse
 )
 from app.schemas.document import (
-    DocumentType, DocumentStatus,
+    DocumentType, DocumentStatus, DocumentPreviewStatus,
     DocumentBase, DocumentCreate, DocumentUpdate, DocumentResponse, DocumentVerification,
     OnboardingChecklistBase, OnboardingChecklistCreate, OnboardingChecklistUpdate, OnboardingChecklistResponse,
     HolidayBase, HolidayCreate, HolidayUpdate, HolidayResponse,
     AuditLogResponse
 )
 from app.schemas.common import (
-    PaginatedResponse, SuccessResponse, ErrorResponse, HealthCheck
+    PaginatedResponse, CursorPage, SuccessResponse, ErrorResponse, HealthCheck
 )
 
 __all__ = [
@@ -58,10 +58,10 @@ __all__ = [
     "PayrollRecordBase", "PayrollRecordCreate", "PayrollRecordUpdate", "PayrollRecordResponse",
     "PayrollProcessRequest", "PayrollApprovalRequest", "PayrollSummary",
     "PayrollSettingsBase", "PayrollSettingsCreate", "PayrollSettingsUpdate", "PayrollSettingsResponse",
-    "DocumentType", "DocumentStatus",
+    "DocumentType", "DocumentStatus", "DocumentPreviewStatus",
     "DocumentBase", "DocumentCreate", "DocumentUpdate", "DocumentResponse", "DocumentVerification",
     "OnboardingChecklistBase", "OnboardingChecklistCreate", "OnboardingChecklistUpdate", "OnboardingChecklistResponse",
     "HolidayBase", "HolidayCreate", "HolidayUpdate", "HolidayResponse",
     "AuditLogResponse",
-    "PaginatedResponse", "SuccessResponse", "ErrorResponse", "HealthCheck"
+    "PaginatedResponse", "CursorPage", "SuccessResponse", "ErrorResponse", "HealthCheck"
 ]
@@ -14,6 +14,19 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total_pages: int
 
 
+class CursorPage(BaseModel, Generic[T]):
+    """Keyset page: pass `next_cursor` back as `cursor` for the next page.
+
+    `total` is absent with count=none and a lower bound when `total_is_exact` is false.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    page_size: int
+    total: Optional[int] = None
+    total_is_exact: Optional[bool] = None
+
+
 class SuccessResponse(BaseModel):
     message: str
     data: Optional[dict] = None
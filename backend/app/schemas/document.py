@@ -24,6 +24,13 @@ class DocumentStatus(str, Enum):
     REJECTED = "rejected"
 
 
+class DocumentPreviewStatus(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    UNSUPPORTED = "unsupported"
+
+
 class DocumentBase(BaseModel):
     document_type: DocumentType
     document_name: str
@@ -54,6 +61,11 @@ class DocumentResponse(DocumentBase):
     employee_id: int
     file_path: Optional[str]
     file_url: Optional[str]
+    file_name: Optional[str] = None
+    content_type: Optional[str] = None
+    file_size: Optional[int] = None
+    content_sha256: Optional[str] = None
+    preview_status: Optional[DocumentPreviewStatus] = None
     status: DocumentStatus
     verified_by: Optional[int] = None
     verified_at: Optional[datetime] = None
@@ -65,6 +77,50 @@ class DocumentResponse(DocumentBase):
         from_attributes = True
 
 
+class DocumentUploadCreate(BaseModel):
+    file_name: str
+    total_size: int
+    content_type: Optional[str] = None
+
+
+class DocumentUploadResponse(BaseModel):
+    id: str
+    document_id: int
+    file_name: str
+    content_type: Optional[str] = None
+    total_size: int
+    offset: int
+    completed: bool
+
+
+class DocumentExpiryItem(BaseModel):
+    id: int
+    employee_id: int
+    employee_code: Optional[str] = None
+    employee_name: str
+    document_type: DocumentType
+    document_name: str
+    expiry_date: datetime
+
+
+class DepartmentDocumentExpiry(BaseModel):
+    department_id: Optional[int] = None
+    department_name: Optional[str] = None
+    expired_count: int
+    expiring_count: int
+    expired: List[DocumentExpiryItem]
+    expiring: List[DocumentExpiryItem]
+
+
+class DocumentExpirySummaryResponse(BaseModel):
+    """Result of the last expiry scan; `scanned_at` is absent until a scan has found something due."""
+    scanned_at: Optional[datetime] = None
+    within_days: Optional[int] = None
+    total_expired: int
+    total_expiring: int
+    departments: List[DepartmentDocumentExpiry]
+
+
 class DocumentVerification(BaseModel):
     status: DocumentStatus
     remarks: Optional[str] = None
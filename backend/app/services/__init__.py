@@ -1,13 +1,24 @@
 from app.services.auth_service import AuthService
-from app.services.employee_service import EmployeeService, UserService
-from app.services.attendance_service import AttendanceService, LeaveService
-from app.services.payroll_service import PayrollService
+from app.services.employee_service import EmployeeService, AsyncEmployeeService, UserService
+from app.services.attendance_service import AttendanceService, AsyncAttendanceService, LeaveService
+from app.services.payroll_service import PayrollService, AsyncPayrollService
 from app.services.document_service import DocumentService, OnboardingService, HolidayService, AuditService
+from app.services.document_expiry import DocumentExpiryService
+from app.services.history_service import HistoryService
+from app.services.report_service import ReportService
+from app.services.voucher_service import VoucherService
+from app.services.form16_service import Form16Service
+from app.services.statutory_service import StatutoryReturnService
+from app.services.disbursement_service import DisbursementService
+from app.services.payslip_mailer import PayslipMailService
 
 __all__ = [
     "AuthService",
-    "EmployeeService", "UserService",
-    "AttendanceService", "LeaveService",
-    "PayrollService",
-    "DocumentService", "OnboardingService", "HolidayService", "AuditService"
+    "EmployeeService", "AsyncEmployeeService", "UserService",
+    "AttendanceService", "AsyncAttendanceService", "LeaveService",
+    "PayrollService", "AsyncPayrollService",
+    "DocumentService", "OnboardingService", "HolidayService", "AuditService", "DocumentExpiryService", "HistoryService",
+    "ReportService", "VoucherService", "Form16Service",
+    "StatutoryReturnService", "DisbursementService",
+    "PayslipMailService"
 ]
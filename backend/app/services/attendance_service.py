@@ -1,12 +1,44 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select, func, tuple_
+from sqlalchemy.exc import IntegrityError
 from app.models.attendance import Attendance, Shift, LeaveRequest, LeaveBalance
-from app.models.document import AuditLog
+from app.core.audit import record_audit
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, AttendanceStatus
 from app.schemas.leave import LeaveType, LeaveRequestStatus
 from typing import Optional, List
 from datetime import datetime, date
-import json
+from app.services.pagination import KeysetPage, keyset_statement, keyset_page, total_statement
+
+
+ATTENDANCE_KEYSET = (Attendance.date, Attendance.id)
+# created_at is filled in by the database (CURRENT_TIMESTAMP on SQLite, without the
+# fractional seconds bound datetimes carry), so equality on it is unreliable; ids
+# are assigned in insertion order and page in the same order.
+LEAVE_REQUEST_KEYSET = (LeaveRequest.id,)
+
+
+def attendance_list_statement(
+    employee_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status: Optional[AttendanceStatus] = None
+):
+    stmt = select(Attendance)
+    
+    if employee_id:
+        stmt = stmt.filter(Attendance.employee_id == employee_id)
+    
+    if start_date:
+        stmt = stmt.filter(Attendance.date >= start_date)
+    
+    if end_date:
+        stmt = stmt.filter(Attendance.date <= end_date)
+    
+    if status:
+        stmt = stmt.filter(Attendance.status == status)
+    
+    return stmt
 
 
 class AttendanceService:
@@ -42,7 +74,12 @@ class AttendanceService:
         
         db_attendance = Attendance(**attendance_data.model_dump())
         self.db.add(db_attendance)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another request inserted the same (employee_id, date) after the check above.
+            self.db.rollback()
+            raise ValueError("Attendance already exists for this date")
         self.db.refresh(db_attendance)
         
         return db_attendance
@@ -59,22 +96,11 @@ class AttendanceService:
         skip: int = 0,
         limit: int = 20
     ) -> tuple[List[Attendance], int]:
-        query = self.db.query(Attendance)
-        
-        if employee_id:
-            query = query.filter(Attendance.employee_id == employee_id)
-        
-        if start_date:
-            query = query.filter(Attendance.date >= start_date)
-        
-        if end_date:
-            query = query.filter(Attendance.date <= end_date)
-        
-        if status:
-            query = query.filter(Attendance.status == status)
-        
-        total = query.count()
-        attendances = query.order_by(Attendance.date.desc()).offset(skip).limit(limit).all()
+        stmt = attendance_list_statement(employee_id, start_date, end_date, status)
+        total = self.db.scalar(select(func.count()).select_from(stmt.subquery()))
+        attendances = self.db.scalars(
+            stmt.order_by(Attendance.date.desc()).offset(skip).limit(limit)
+        ).all()
         
         return attendances, total
 
@@ -110,22 +136,29 @@ class AttendanceService:
         return attendance
 
     def bulk_create_attendance(self, attendances_data: List[AttendanceCreate]) -> List[Attendance]:
+        """Create the entries that don't exist yet; existing and repeated (employee, date) pairs are skipped."""
+        keys = {(a.employee_id, a.date) for a in attendances_data}
+        seen = set()
+        if keys:
+            seen = set(self.db.query(Attendance.employee_id, Attendance.date).filter(
+                tuple_(Attendance.employee_id, Attendance.date).in_(keys)
+            ).all())
+        
         created_attendances = []
         
         for attendance_data in attendances_data:
-            existing = self.db.query(Attendance).filter(
-                and_(
-                    Attendance.employee_id == attendance_data.employee_id,
-                    Attendance.date == attendance_data.date
-                )
-            ).first()
-            
-            if not existing:
+            key = (attendance_data.employee_id, attendance_data.date)
+            if key not in seen:
+                seen.add(key)
                 db_attendance = Attendance(**attendance_data.model_dump())
                 self.db.add(db_attendance)
                 created_attendances.append(db_attendance)
         
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError("Attendance for some of these dates was recorded concurrently; retry the upload")
         
         for attendance in created_attendances:
             self.db.refresh(attendance)
@@ -177,21 +210,6 @@ class LeaveService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _log_audit(self, user_id: int, action: str, entity_type: str, entity_id: int, old_value: dict = None, new_value: dict = None):
-        try:
-            audit_log = AuditLog(
-                user_id=user_id,
-                action=action,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                old_value=json.dumps(old_value) if old_value else None,
-                new_value=json.dumps(new_value) if new_value else None,
-            )
-            self.db.add(audit_log)
-            self.db.commit()
-        except Exception:
-            pass
-
     def create_leave_request(self, leave_data: dict) -> LeaveRequest:
         db_leave = LeaveRequest(**leave_data)
         self.db.add(db_leave)
@@ -226,6 +244,31 @@ class LeaveService:
         
         return leaves, total
 
+    def get_leave_requests_page(
+        self,
+        employee_id: Optional[int] = None,
+        status: Optional[LeaveRequestStatus] = None,
+        leave_type: Optional[LeaveType] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        count: str = "estimate"
+    ) -> KeysetPage:
+        query = self.db.query(LeaveRequest)
+        
+        if employee_id:
+            query = query.filter(LeaveRequest.employee_id == employee_id)
+        
+        if status:
+            query = query.filter(LeaveRequest.status == status)
+        
+        if leave_type:
+            query = query.filter(LeaveRequest.leave_type == leave_type)
+        
+        leaves = keyset_statement(query, LEAVE_REQUEST_KEYSET, cursor, limit).all()
+        total_stmt = total_statement(query, count)
+        total = self.db.scalar(total_stmt) if total_stmt is not None else None
+        return keyset_page(leaves, LEAVE_REQUEST_KEYSET, limit, total, count)
+
     def update_leave_request(
         self,
         leave_id: int,
@@ -262,11 +305,11 @@ class LeaveService:
         leave.approved_at = datetime.now()
         leave.remarks = remarks
         
+        record_audit(self.db, approved_by, f"leave_{status.value}", "leave_request", leave_id, {"status": old_status}, {"status": status.value})
+        
         self.db.commit()
         self.db.refresh(leave)
         
-        self._log_audit(approved_by, f"leave_{status.value}", "leave_request", leave_id, {"status": old_status}, {"status": status.value})
-        
         return leave
 
     def get_leave_balance(self, employee_id: int, leave_type: LeaveType, year: int) -> Optional[LeaveBalance]:
@@ -307,3 +350,41 @@ class LeaveService:
         self.db.refresh(balance)
         
         return balance
+
+
+class AsyncAttendanceService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_attendances(
+        self,
+        employee_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[AttendanceStatus] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> tuple[List[Attendance], int]:
+        stmt = attendance_list_statement(employee_id, start_date, end_date, status)
+        total = await self.db.scalar(select(func.count()).select_from(stmt.subquery()))
+        attendances = (await self.db.scalars(
+            stmt.order_by(Attendance.date.desc()).offset(skip).limit(limit)
+        )).all()
+        
+        return attendances, total
+
+    async def get_attendances_page(
+        self,
+        employee_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[AttendanceStatus] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        count: str = "estimate"
+    ) -> KeysetPage:
+        stmt = attendance_list_statement(employee_id, start_date, end_date, status)
+        attendances = (await self.db.scalars(keyset_statement(stmt, ATTENDANCE_KEYSET, cursor, limit))).all()
+        total_stmt = total_statement(stmt, count)
+        total = await self.db.scalar(total_stmt) if total_stmt is not None else None
+        return keyset_page(attendances, ATTENDANCE_KEYSET, limit, total, count)
@@ -0,0 +1,250 @@
+from sqlalchemy import Column, Index, MetaData, Table, and_, delete, func, insert, inspect, select, text
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.document import AuditLog
+from app.services.sequence_service import SequenceService
+from pathlib import Path
+from typing import List, Optional
+from datetime import datetime
+import asyncio
+import gzip
+import logging
+import os
+import re
+import orjson
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r"^audit_logs_(\d{4})(\d{2})$")
+DEFAULT_PARTITION = "audit_logs_default"
+ARCHIVE_YIELD_PER = 5000
+# code_sequences row each month's move locks first, so rollovers from several workers take turns
+ROLLOVER_LOCK_SEQUENCE = "audit_rollover"
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    match = PARTITION_PATTERN.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+class AuditPartitions:
+    """Monthly `audit_logs_YYYYMM` tables beside `audit_logs`, for backends without declarative partitions.
+
+    Events are always written to `audit_logs`; `rollover` moves every finished
+    month into its own table with the same columns and indexes. The newest row
+    always stays behind, because SQLite numbers new rows from the largest id
+    left in the table and ids must stay unique across partitions. Reads go to
+    `audit_logs` plus only the monthly tables overlapping their date range.
+    The server runs `rollover` on a schedule (`run_scheduled_rollovers`);
+    archiving stays a manual call.
+    """
+
+    def __init__(self):
+        self._metadata = MetaData()
+
+    def partition_months(self, db: Session) -> List[datetime]:
+        names = inspect(db.connection()).get_table_names()
+        return sorted(month for month in map(partition_month, names) if month)
+
+    def sources(self, db: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> list:
+        """Entities to read for events between the dates: `AuditLog` first, then overlapping months, newest first."""
+        entities = [AuditLog]
+        for month in reversed(self.partition_months(db)):
+            if (end_date is None or month <= end_date) and (start_date is None or add_months(month, 1) > start_date):
+                entities.append(aliased(AuditLog, self.table(month), name=partition_name(month), adapt_on_names=True))
+        return entities
+
+    def table(self, month: datetime) -> Table:
+        name = partition_name(month)
+        if name not in self._metadata.tables:
+            # No foreign keys: partitions hold history and are never written after the move.
+            table = Table(name, self._metadata, *[
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in AuditLog.__table__.columns
+            ])
+            for index in AuditLog.__table__.indexes:
+                Index(index.name.replace("audit_logs", name, 1), *[table.c[c.name] for c in index.columns])
+        return self._metadata.tables[name]
+
+    def rollover(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Move finished months out of `audit_logs`, one transaction per month; returns rows moved."""
+        current = month_start(now or datetime.now())
+        newest_id = db.scalar(select(func.max(AuditLog.id)))
+        oldest = db.scalar(select(func.min(AuditLog.created_at)).filter(AuditLog.created_at < current))
+        moved = 0
+        month = month_start(oldest) if oldest else current
+        while month < current:
+            moved += self._move_month(db, month, newest_id)
+            month = add_months(month, 1)
+        return moved
+
+    def _lock(self, db: Session):
+        """Held until the caller commits: a month is moved by one worker, then found done by the rest."""
+        SequenceService(db).reserve(ROLLOVER_LOCK_SEQUENCE)
+
+    def _move_month(self, db: Session, month: datetime, newest_id: int) -> int:
+        in_month = and_(
+            AuditLog.created_at >= month,
+            AuditLog.created_at < add_months(month, 1),
+            AuditLog.id < newest_id
+        )
+        self._lock(db)
+        if db.scalar(select(AuditLog.id).filter(in_month).limit(1)) is None:
+            db.rollback()
+            return 0
+        table = self.table(month)
+        table.create(db.connection(), checkfirst=True)
+        columns = [c.name for c in table.columns]
+        moved = db.execute(insert(table).from_select(
+            columns, select(*[AuditLog.__table__.c[name] for name in columns]).filter(in_month)
+        )).rowcount
+        db.execute(delete(AuditLog).filter(in_month), execution_options={"synchronize_session": False})
+        db.commit()
+        return moved
+
+    def archive(self, db: Session, before: Optional[datetime] = None, archive_dir: Optional[str] = None) -> List[dict]:
+        """Export every partition wholly before `before` to gzipped NDJSON, then drop it.
+
+        `before` defaults to AUDIT_ONLINE_MONTHS before the current month.
+        """
+        self.rollover(db)
+        before = before or add_months(month_start(datetime.now()), -settings.AUDIT_ONLINE_MONTHS)
+        archive_dir = Path(archive_dir or settings.AUDIT_ARCHIVE_DIR)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archived = []
+        for month in self.partition_months(db):
+            if add_months(month, 1) > before:
+                continue
+            path = archive_dir / f"{partition_name(month)}.ndjson.gz"
+            rows = self._export(db, self.table(month), path)
+            self._drop(db, month)
+            db.commit()
+            archived.append({"partition": partition_name(month), "rows": rows, "path": str(path)})
+        return archived
+
+    def _export(self, db: Session, table: Table, path: Path) -> int:
+        expected = db.scalar(select(func.count()).select_from(table))
+        partial = path.with_name(path.name + ".partial")
+        rows = 0
+        with gzip.open(partial, "wb") as output:
+            result = db.execute(select(table).order_by(table.c.id), execution_options={"yield_per": ARCHIVE_YIELD_PER})
+            for row in result:
+                # Column names are str subclasses, which orjson only takes as keys with OPT_NON_STR_KEYS.
+                output.write(orjson.dumps(row._asdict(), option=orjson.OPT_NON_STR_KEYS) + b"\n")
+                rows += 1
+        if rows != expected:
+            partial.unlink()
+            raise RuntimeError(f"Archived {rows} of {expected} rows from {table.name}; the partition was kept")
+        with open(partial, "rb") as written:
+            os.fsync(written.fileno())
+        partial.replace(path)
+        return rows
+
+    def _drop(self, db: Session, month: datetime):
+        self.table(month).drop(db.connection())
+
+
+class PostgresAuditPartitions(AuditPartitions):
+    """`audit_logs` declaratively partitioned by month on created_at (migration 0005).
+
+    Queries read the parent table and the planner prunes partitions outside the
+    date range. `rollover` creates the coming months' partitions, moving any
+    rows that landed in `audit_logs_default` for those months into them.
+    """
+
+    def partition_months(self, db: Session) -> List[datetime]:
+        names = db.scalars(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'audit_logs'"
+        ))
+        return sorted(month for month in map(partition_month, names) if month)
+
+    def sources(self, db: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> list:
+        return [AuditLog]
+
+    def rollover(self, db: Session, now: Optional[datetime] = None) -> int:
+        current = month_start(now or datetime.now())
+        existing = set(self.partition_months(db))
+        oldest = db.scalar(text(f"SELECT min(created_at) FROM {DEFAULT_PARTITION}"))
+        month = min(month_start(oldest), current) if oldest else current
+        last = add_months(current, settings.AUDIT_PARTITION_MONTHS_AHEAD)
+        moved = 0
+        while month <= last:
+            if month not in existing:
+                moved += self._attach_month(db, month)
+            month = add_months(month, 1)
+        return moved
+
+    def _attach_month(self, db: Session, month: datetime) -> int:
+        # Created detached and filled from the default partition first: attaching
+        # a range that the default partition still holds rows for would fail.
+        name = partition_name(month)
+        bounds = {"start": month, "end": add_months(month, 1)}
+        self._lock(db)
+        if month in self.partition_months(db):
+            db.rollback()
+            return 0
+        db.execute(text(f"CREATE TABLE {name} (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = db.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), bounds).rowcount
+        db.execute(text(
+            f"ALTER TABLE audit_logs ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+        ))
+        db.commit()
+        return moved
+
+    def _drop(self, db: Session, month: datetime):
+        name = partition_name(month)
+        db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+
+
+AUDIT_PARTITION_BACKENDS = {
+    "postgresql": PostgresAuditPartitions,
+}
+
+
+def audit_partitions_for(dialect_name: str) -> AuditPartitions:
+    return AUDIT_PARTITION_BACKENDS.get(dialect_name, AuditPartitions)()
+
+
+audit_partitions = audit_partitions_for(engine.dialect.name)
+
+
+def scheduled_rollover() -> int:
+    """One rollover in its own session; failures are logged and retried at the next interval."""
+    db = SessionLocal()
+    try:
+        return audit_partitions.rollover(db)
+    except Exception:
+        logger.exception("Scheduled audit log rollover failed")
+        return 0
+    finally:
+        db.close()
+
+
+async def run_scheduled_rollovers():
+    """Lifespan task: move finished months out of `audit_logs` every AUDIT_ROLLOVER_INTERVAL_SECONDS."""
+    while True:
+        await run_in_threadpool(scheduled_rollover)
+        await asyncio.sleep(settings.AUDIT_ROLLOVER_INTERVAL_SECONDS)
@@ -1,6 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    get_password_hash_async, verify_password, verify_and_update_password, create_user_token, invalidate_user,
+    revoke_user_tokens
+)
 from app.schemas.auth import LoginRequest, RegisterRequest
 from app.schemas.user import UserCreate
 from typing import Optional
@@ -9,19 +13,21 @@ from app.core.config import settings
 
 
 class AuthService:
-    def __init__(self, db: Session):
+    """Login, registration and password changes on `AsyncSession`, so bcrypt waits hold no request thread."""
+
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def register(self, user_data: RegisterRequest) -> User:
+    async def register(self, user_data: RegisterRequest) -> User:
         try:
-            existing_user = self.db.query(User).filter(
+            existing_user = (await self.db.scalars(select(User).filter(
                 (User.email == user_data.email) | (User.username == user_data.username)
-            ).first()
+            ))).first()
             
             if existing_user:
                 raise ValueError("User with this email or username already exists")
             
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
             
             db_user = User(
                 email=user_data.email,
@@ -32,29 +38,33 @@ class AuthService:
             )
             
             self.db.add(db_user)
-            self.db.commit()
-            self.db.refresh(db_user)
+            await self.db.commit()
+            await self.db.refresh(db_user)
             
             return db_user
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             raise ValueError(f"Registration failed: {str(e)}")
 
-    def login(self, login_data: LoginRequest) -> Optional[dict]:
-        user = self.db.query(User).filter(User.username == login_data.username).first()
+    async def login(self, login_data: LoginRequest) -> Optional[dict]:
+        user = (await self.db.scalars(select(User).filter(User.username == login_data.username))).first()
         
         if not user:
             return None
         
-        if not verify_password(login_data.password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+        if not verified:
             return None
         
         if not user.is_active:
             return None
         
-        access_token = create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        if new_hash:
+            user.hashed_password = new_hash
+            await self.db.commit()
+        
+        access_token = await self.db.run_sync(
+            create_user_token, user, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         )
         
         return {
@@ -63,22 +73,24 @@ class AuthService:
             "user": user
         }
 
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
-        return self.db.query(User).filter(User.id == user_id).first()
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self.db.get(User, user_id)
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
-        return self.db.query(User).filter(User.email == email).first()
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        return (await self.db.scalars(select(User).filter(User.email == email))).first()
 
-    def change_password(self, user_id: int, old_password: str, new_password: str) -> bool:
-        user = self.db.query(User).filter(User.id == user_id).first()
+    async def change_password(self, user_id: int, old_password: str, new_password: str) -> bool:
+        user = await self.get_user_by_id(user_id)
         
         if not user:
             raise ValueError("User not found")
         
-        if not verify_password(old_password, user.hashed_password):
+        if not await verify_password(old_password, user.hashed_password):
             raise ValueError("Invalid old password")
         
-        user.hashed_password = get_password_hash(new_password)
-        self.db.commit()
+        user.hashed_password = await get_password_hash_async(new_password)
+        version = await self.db.run_sync(revoke_user_tokens, user_id)
+        await self.db.commit()
+        invalidate_user(user_id, version)
         
         return True
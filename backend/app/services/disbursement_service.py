@@ -0,0 +1,339 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.payroll import PayrollRecord
+from app.models.user import Employee
+from app.services.statutory_service import ReturnValidation
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from datetime import date
+import csv
+import hashlib
+import io
+import re
+
+YIELD_PER = 2000
+CHUNK_ROWS = 500
+LINE_END = "\r\n"
+# Bank convention: the account hash total keeps only its low-order 20 digits.
+HASH_TOTAL_MODULUS = 10 ** 20
+
+IFSC_PATTERN = re.compile(r"^[A-Z]{4}0[A-Z0-9]{6}$")
+ACCOUNT_PATTERN = re.compile(r"^\d{6,18}$")
+
+
+class Payment(NamedTuple):
+    record_id: int
+    employee_code: str
+    beneficiary_name: str
+    account_number: str
+    ifsc_code: str
+    amount_paise: int
+
+    @property
+    def amount(self) -> str:
+        return f"{self.amount_paise // 100}.{self.amount_paise % 100:02d}"
+
+
+class DisbursementContext(NamedTuple):
+    month: int
+    year: int
+    value_date: date
+    debit_account: str
+
+
+class Batch:
+    def __init__(self, number: int, layout: "BankLayout", context: DisbursementContext):
+        self.number = number
+        self.count = 0
+        self.amount_paise = 0
+        self.account_hash_total = 0
+        self.filename = f"SAL_{context.year}{context.month:02d}_B{number:03d}.{layout.extension}"
+        self._digest = hashlib.sha256()
+
+    @property
+    def amount(self) -> str:
+        return f"{self.amount_paise // 100}.{self.amount_paise % 100:02d}"
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def add(self, payment: Payment):
+        self.count += 1
+        self.amount_paise += payment.amount_paise
+        # Banks check the sum of beneficiary account numbers as a hash total.
+        self.account_hash_total = (self.account_hash_total + int(payment.account_number)) % HASH_TOTAL_MODULUS
+
+    def encode(self, text: str) -> bytes:
+        data = text.encode("ascii", "replace")
+        self._digest.update(data)
+        return data
+
+
+class BankLayout:
+    """A bank upload format. Subclass and `register_layout` to add a bank."""
+
+    name = ""
+    extension = "txt"
+
+    def header(self, batch: Batch, context: DisbursementContext) -> str:
+        return ""
+
+    def row(self, payment: Payment, sequence: int, context: DisbursementContext) -> str:
+        raise NotImplementedError
+
+    def trailer(self, batch: Batch, context: DisbursementContext) -> str:
+        return ""
+
+
+class CsvBankLayout(BankLayout):
+    extension = "csv"
+
+    def __init__(self, name: str, columns: List[Tuple[str, Callable[[Payment, int, DisbursementContext], object]]]):
+        self.name = name
+        self.columns = columns
+
+    def _line(self, values) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator=LINE_END).writerow(values)
+        return buffer.getvalue()
+
+    def header(self, batch: Batch, context: DisbursementContext) -> str:
+        return self._line([label for label, _ in self.columns])
+
+    def row(self, payment: Payment, sequence: int, context: DisbursementContext) -> str:
+        return self._line([value(payment, sequence, context) for _, value in self.columns])
+
+
+class Field(NamedTuple):
+    width: int
+    value: Callable
+    numeric: bool = False
+
+
+def _fixed(fields: List[Field], *args) -> str:
+    parts = []
+    for field in fields:
+        value = str(field.value(*args))
+        if field.numeric:
+            # Cutting digits off an amount or hash total would send the bank a wrong control total.
+            if len(value) > field.width:
+                raise ValueError(f"{value} does not fit a {field.width}-digit field")
+            parts.append(value.rjust(field.width, "0"))
+        else:
+            parts.append(value.upper().ljust(field.width)[:field.width])
+    return "".join(parts) + LINE_END
+
+
+class FixedWidthBankLayout(BankLayout):
+    def __init__(self, name: str, header: List[Field], row: List[Field], trailer: List[Field]):
+        self.name = name
+        self.header_fields = header
+        self.row_fields = row
+        self.trailer_fields = trailer
+
+    def header(self, batch: Batch, context: DisbursementContext) -> str:
+        return _fixed(self.header_fields, batch, context)
+
+    def row(self, payment: Payment, sequence: int, context: DisbursementContext) -> str:
+        return _fixed(self.row_fields, payment, sequence, context)
+
+    def trailer(self, batch: Batch, context: DisbursementContext) -> str:
+        return _fixed(self.trailer_fields, batch, context)
+
+
+BANK_LAYOUTS: Dict[str, BankLayout] = {}
+
+
+def register_layout(layout: BankLayout) -> BankLayout:
+    BANK_LAYOUTS[layout.name] = layout
+    return layout
+
+
+register_layout(CsvBankLayout("neft_csv", [
+    ("Sr No", lambda p, seq, ctx: seq),
+    ("Transaction Type", lambda p, seq, ctx: "NEFT"),
+    ("Debit Account", lambda p, seq, ctx: ctx.debit_account),
+    ("Beneficiary Name", lambda p, seq, ctx: p.beneficiary_name),
+    ("Beneficiary Account", lambda p, seq, ctx: p.account_number),
+    ("IFSC", lambda p, seq, ctx: p.ifsc_code),
+    ("Amount", lambda p, seq, ctx: p.amount),
+    ("Value Date", lambda p, seq, ctx: ctx.value_date.strftime("%d/%m/%Y")),
+    ("Narration", lambda p, seq, ctx: f"SALARY {ctx.month:02d}/{ctx.year} {p.employee_code}"),
+]))
+
+register_layout(FixedWidthBankLayout(
+    "neft_fixed",
+    header=[
+        Field(1, lambda b, ctx: "H"),
+        Field(18, lambda b, ctx: ctx.debit_account, numeric=True),
+        Field(8, lambda b, ctx: ctx.value_date.strftime("%d%m%Y")),
+        Field(5, lambda b, ctx: b.number, numeric=True),
+        Field(20, lambda b, ctx: f"SALARY {ctx.month:02d}{ctx.year}"),
+    ],
+    row=[
+        Field(1, lambda p, seq, ctx: "D"),
+        Field(6, lambda p, seq, ctx: seq, numeric=True),
+        Field(18, lambda p, seq, ctx: p.account_number, numeric=True),
+        Field(11, lambda p, seq, ctx: p.ifsc_code),
+        Field(35, lambda p, seq, ctx: p.beneficiary_name),
+        Field(15, lambda p, seq, ctx: p.amount_paise, numeric=True),
+        Field(20, lambda p, seq, ctx: p.employee_code),
+    ],
+    trailer=[
+        Field(1, lambda b, ctx: "T"),
+        Field(6, lambda b, ctx: b.count, numeric=True),
+        Field(17, lambda b, ctx: b.amount_paise, numeric=True),
+        Field(20, lambda b, ctx: b.account_hash_total, numeric=True),
+    ]
+))
+
+
+def validate_payment(payment: Payment) -> List[str]:
+    problems = []
+    if not ACCOUNT_PATTERN.match(payment.account_number):
+        problems.append("Bank account number must be 6-18 digits")
+    if not IFSC_PATTERN.match(payment.ifsc_code):
+        problems.append("Invalid IFSC code")
+    if not payment.beneficiary_name:
+        problems.append("Beneficiary name is required")
+    if payment.amount_paise <= 0:
+        problems.append("Net salary must be positive")
+    return problems
+
+
+class DisbursementWriter:
+    """Splits a payment stream into bank files capped by row count and amount.
+
+    Each batch is written as its own file with a header and trailer carrying
+    the batch's control totals; `control_file` summarises every batch with the
+    SHA-256 of the bytes actually written.
+    """
+
+    def __init__(
+        self,
+        layout: BankLayout,
+        context: DisbursementContext,
+        max_rows: Optional[int] = None,
+        max_amount: Optional[float] = None
+    ):
+        self.layout = layout
+        self.context = context
+        self.max_rows = max_rows or settings.DISBURSEMENT_MAX_ROWS
+        self.max_amount_paise = int(round((max_amount or settings.DISBURSEMENT_MAX_AMOUNT) * 100))
+        self.batches: List[Batch] = []
+        self._next: Optional[Payment] = None
+
+    def _batch_full(self, batch: Batch, payment: Payment) -> bool:
+        # A single payment above the amount cap still goes out, alone in its batch.
+        return batch.count > 0 and (
+            batch.count >= self.max_rows
+            or batch.amount_paise + payment.amount_paise > self.max_amount_paise
+        )
+
+    def check(self, payment_count: int, max_payment_paise: int):
+        """Raise ValueError if the largest values `files` could write overflow the layout.
+
+        Formats a header, row and trailer with the worst case for `payment_count`
+        payments of at most `max_payment_paise`, so a file that would fail half
+        way through a streamed response is refused before it starts.
+        """
+        rows = min(self.max_rows, payment_count)
+        batch = Batch(payment_count, self.layout, self.context)
+        batch.count = rows
+        # A batch stays under the amount cap unless it holds a single larger payment.
+        batch.amount_paise = max(min(self.max_amount_paise, max_payment_paise * rows), max_payment_paise)
+        batch.account_hash_total = HASH_TOTAL_MODULUS - 1
+        payment = Payment(0, "", "", "0", "", max_payment_paise)
+        self.layout.header(batch, self.context)
+        self.layout.row(payment, rows, self.context)
+        self.layout.trailer(batch, self.context)
+
+    def _write_batch(self, batch: Batch, payments: Iterator[Payment]) -> Iterator[bytes]:
+        lines = [self.layout.header(batch, self.context)]
+        while self._next is not None and not self._batch_full(batch, self._next):
+            batch.add(self._next)
+            lines.append(self.layout.row(self._next, batch.count, self.context))
+            self._next = next(payments, None)
+            if len(lines) >= CHUNK_ROWS:
+                yield batch.encode("".join(lines))
+                lines = []
+        lines.append(self.layout.trailer(batch, self.context))
+        yield batch.encode("".join(lines))
+
+    def files(self, payments: Iterable[Payment]) -> Iterator[Tuple[str, Iterator[bytes]]]:
+        """Yield (filename, chunks) per batch; each must be consumed before the next."""
+        payments = iter(payments)
+        self._next = next(payments, None)
+        while self._next is not None:
+            batch = Batch(len(self.batches) + 1, self.layout, self.context)
+            self.batches.append(batch)
+            yield batch.filename, self._write_batch(batch, payments)
+
+    def control_file(self, validation: Optional[ReturnValidation] = None) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator=LINE_END)
+        writer.writerow(["Batch", "File", "Records", "Amount", "Account Hash Total", "SHA256"])
+        for batch in self.batches:
+            writer.writerow([
+                batch.number, batch.filename, batch.count, batch.amount, batch.account_hash_total, batch.sha256
+            ])
+        total_paise = sum(batch.amount_paise for batch in self.batches)
+        writer.writerow([
+            "TOTAL", "", sum(batch.count for batch in self.batches),
+            f"{total_paise // 100}.{total_paise % 100:02d}", "", ""
+        ])
+        if validation and validation.issues:
+            writer.writerow([])
+            writer.writerow(["Excluded Record", "Employee Code", "Reason"])
+            for issue in validation.issues:
+                writer.writerow([issue.record_id, issue.employee_code, issue.message])
+        return buffer.getvalue().encode("ascii", "replace")
+
+
+class DisbursementService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def payment_bounds(self, month: int, year: int) -> Tuple[int, int]:
+        """(count, largest net salary in paise) of the approved records `payments` reads from."""
+        count, largest = self.db.query(
+            func.count(PayrollRecord.id), func.max(PayrollRecord.net_salary)
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            PayrollRecord.status == 'approved'
+        ).one()
+        return count, int(round((largest or 0) * 100))
+
+    def payments(self, month: int, year: int, validation: Optional[ReturnValidation] = None) -> Iterator[Payment]:
+        """Approved, unpaid records with valid bank details, in record order."""
+        validation = validation or ReturnValidation()
+
+        rows = self.db.query(
+            PayrollRecord.id.label("record_id"),
+            PayrollRecord.net_salary,
+            Employee.employee_code,
+            Employee.first_name,
+            Employee.last_name,
+            Employee.bank_account_number,
+            Employee.ifsc_code
+        ).join(
+            Employee, Employee.id == PayrollRecord.employee_id
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            PayrollRecord.status == 'approved'
+        ).order_by(PayrollRecord.id).yield_per(YIELD_PER)
+
+        for row in rows:
+            payment = Payment(
+                record_id=row.record_id,
+                employee_code=row.employee_code,
+                beneficiary_name=f"{row.first_name} {row.last_name or ''}".strip(),
+                account_number=(row.bank_account_number or '').replace(" ", ""),
+                ifsc_code=(row.ifsc_code or '').strip().upper(),
+                amount_paise=int(round((row.net_salary or 0) * 100))
+            )
+            if validation.accept(row, validate_payment(payment)):
+                yield payment
@@ -0,0 +1,216 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, func, insert, select
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.document import Document, DocumentExpirySummary, DocumentStatus
+from app.models.user import Department, Employee
+from app.services.sequence_service import SequenceService
+from app.services.pagination import KeysetPage, keyset_page, keyset_statement, total_statement
+from typing import Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_KEYSET = (Document.expiry_date, Document.id)
+EXPIRY_KIND_PATTERN = "^(expired|expiring)$"
+
+# The published summary by its scanned_at, so a scan in any process replaces it; the TTL
+# only bounds how long department renames take to show.
+expiry_summary_cache = TTLCache(1, settings.DOCUMENT_EXPIRY_CACHE_TTL_SECONDS)
+# Wait before retrying a scheduled scan that failed
+SCAN_RETRY_SECONDS = 300
+# code_sequences row every scan locks first, so scans from any worker run one at a time
+SCAN_LOCK_SEQUENCE = "document_expiry_scan"
+
+
+def _window(kind: str, now: datetime, within_days: int):
+    """[first, end) of the expiry dates of `kind`.
+
+    Expired documents only count for DOCUMENT_EXPIRY_LOOKBACK_DAYS: older ones
+    have as a rule been replaced, and would otherwise widen every scan forever.
+    """
+    if kind == "expired":
+        return now - timedelta(days=settings.DOCUMENT_EXPIRY_LOOKBACK_DAYS), now
+    return now, now + timedelta(days=within_days)
+
+
+class DocumentExpiryService:
+    """Expired and soon-expiring documents of active employees, per department.
+
+    Every query is a range on ix_documents_expiry_date_employee_id_status, so
+    the cost follows the documents due rather than all documents on file.
+    Rejected documents are left out; they are not on record to expire.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _due(self, columns, first: datetime, end: datetime, department_id: Optional[int] = None):
+        stmt = select(*columns).join(Employee, Employee.id == Document.employee_id).filter(and_(
+            Document.expiry_date >= first,
+            Document.expiry_date < end,
+            Document.status != DocumentStatus.REJECTED,
+            Employee.is_active == True
+        ))
+        if department_id is not None:
+            stmt = stmt.filter(Employee.department_id == department_id)
+        return stmt
+
+    def get_documents_page(
+        self,
+        kind: str,
+        within_days: Optional[int] = None,
+        department_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        count: str = "estimate"
+    ) -> KeysetPage:
+        """Expired documents, most recently expired first, or expiring ones, soonest first."""
+        within_days = within_days or settings.DOCUMENT_EXPIRY_WITHIN_DAYS
+        stmt = self._due([Document], *_window(kind, datetime.now(), within_days), department_id)
+        documents = self.db.scalars(
+            keyset_statement(stmt, EXPIRY_KEYSET, cursor, limit, descending=kind == "expired")
+        ).all()
+        total = self.db.scalar(total_statement(stmt, count)) if count != "none" else None
+        return keyset_page(documents, EXPIRY_KEYSET, limit, total, count)
+
+    def _first_in_department(self, kind: str, department_id: Optional[int], now: datetime, within_days: int) -> list:
+        """First DOCUMENT_EXPIRY_WIDGET_ITEMS documents of `kind` in one department, in list order.
+
+        One short walk of the index per department; ranking all due documents
+        at once would sort every one of them to keep a handful.
+        """
+        stmt = self._due([
+            Document.id, Document.employee_id, Document.document_type, Document.document_name, Document.expiry_date,
+            Employee.employee_code, Employee.first_name, Employee.last_name
+        ], *_window(kind, now, within_days))
+        stmt = stmt.filter(
+            Employee.department_id == department_id if department_id is not None else Employee.department_id.is_(None)
+        )
+        order = Document.expiry_date.desc() if kind == "expired" else Document.expiry_date.asc()
+        rows = self.db.execute(stmt.order_by(order, Document.id).limit(settings.DOCUMENT_EXPIRY_WIDGET_ITEMS))
+        return [{
+            "id": row.id,
+            "employee_id": row.employee_id,
+            "employee_code": row.employee_code,
+            "employee_name": f"{row.first_name} {row.last_name or ''}".strip(),
+            "document_type": row.document_type.value,
+            "document_name": row.document_name,
+            "expiry_date": row.expiry_date
+        } for row in rows]
+
+    def lock_scans(self):
+        """Wait for any other scan to commit; held until this transaction ends.
+
+        Without it two scans' delete-then-insert can interleave under READ
+        COMMITTED and leave both results in the table, doubling every total.
+        """
+        SequenceService(self.db).reserve(SCAN_LOCK_SEQUENCE)
+
+    def scan(self, within_days: Optional[int] = None) -> dict:
+        """Recount every department and publish the result for the dashboard; returns the new summary."""
+        within_days = within_days or settings.DOCUMENT_EXPIRY_WITHIN_DAYS
+        self.lock_scans()
+        now = datetime.now()
+        expired = func.sum(case((Document.expiry_date < now, 1), else_=0))
+        # One range covering both kinds: expired (within the lookback) up to the end of the window.
+        counts = self.db.execute(
+            self._due(
+                [Employee.department_id, expired.label("expired"), func.count().label("due")],
+                _window("expired", now, within_days)[0], _window("expiring", now, within_days)[1]
+            ).group_by(Employee.department_id)
+        ).all()
+
+        self.db.execute(delete(DocumentExpirySummary))
+        if counts:
+            self.db.execute(insert(DocumentExpirySummary), [{
+                "department_id": row.department_id,
+                "within_days": within_days,
+                "expired_count": row.expired,
+                "expiring_count": row.due - row.expired,
+                "expired_items": orjson.dumps(
+                    self._first_in_department("expired", row.department_id, now, within_days) if row.expired else []
+                ).decode(),
+                "expiring_items": orjson.dumps(
+                    self._first_in_department("expiring", row.department_id, now, within_days)
+                    if row.due > row.expired else []
+                ).decode(),
+                "scanned_at": now
+            } for row in counts])
+        self.db.commit()
+        return self.get_summary()
+
+    def last_scanned_at(self) -> Optional[datetime]:
+        return self.db.scalar(select(func.max(DocumentExpirySummary.scanned_at)))
+
+    def get_summary(self) -> dict:
+        """The last published scan, cached per scan for up to DOCUMENT_EXPIRY_CACHE_TTL_SECONDS."""
+        scanned_at = self.last_scanned_at()
+        summary = expiry_summary_cache.get(scanned_at)
+        if summary is not None:
+            return summary
+        rows = self.db.execute(
+            select(DocumentExpirySummary, Department.name)
+            .outerjoin(Department, Department.id == DocumentExpirySummary.department_id)
+            .order_by(DocumentExpirySummary.expired_count.desc(), DocumentExpirySummary.expiring_count.desc())
+        ).all()
+        departments = [{
+            "department_id": row.department_id,
+            "department_name": name,
+            "expired_count": row.expired_count,
+            "expiring_count": row.expiring_count,
+            "expired": orjson.loads(row.expired_items or "[]"),
+            "expiring": orjson.loads(row.expiring_items or "[]")
+        } for row, name in rows]
+        summary = {
+            "scanned_at": rows[0][0].scanned_at if rows else None,
+            "within_days": rows[0][0].within_days if rows else None,
+            "total_expired": sum(d["expired_count"] for d in departments),
+            "total_expiring": sum(d["expiring_count"] for d in departments),
+            "departments": departments
+        }
+        expiry_summary_cache.set(scanned_at, summary)
+        return summary
+
+
+def scan_if_due() -> float:
+    """Scan when the published summary is older than DOCUMENT_EXPIRY_SCAN_INTERVAL_SECONDS; returns seconds to the next check.
+
+    Every worker runs this, but a scan by any of them resets the age for all,
+    so the table is rescanned about once per interval rather than once per worker.
+    The age is checked again under the scan lock: workers that fall due together
+    queue on it, and only the first finds the summary still old.
+    """
+    interval = settings.DOCUMENT_EXPIRY_SCAN_INTERVAL_SECONDS
+    db = SessionLocal()
+    try:
+        service = DocumentExpiryService(db)
+
+        def wait() -> float:
+            last = service.last_scanned_at()
+            return interval - (datetime.now() - last).total_seconds() if last else 0
+
+        if (remaining := wait()) > 0:
+            return remaining
+        service.lock_scans()
+        if (remaining := wait()) > 0:
+            db.rollback()
+            return remaining
+        service.scan()
+        return interval
+    except Exception:
+        logger.exception("Scheduled document expiry scan failed")
+        return min(interval, SCAN_RETRY_SECONDS)
+    finally:
+        db.close()
+
+
+async def run_scheduled_scans():
+    """Lifespan task: keep the dashboard summary at most one interval old."""
+    while True:
+        await asyncio.sleep(await run_in_threadpool(scan_if_due))
@@ -0,0 +1,157 @@
+from sqlalchemy import update
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.document import Document, DocumentPreviewStatus
+from app.services.document_store import document_store
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import logging
+import multiprocessing
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Variant -> longest side in pixels
+PREVIEW_SIZES = {"thumb": 256, "page": 1024}
+PREVIEW_VARIANT_PATTERN = f"^({'|'.join(PREVIEW_SIZES)})$"
+PREVIEW_QUALITY = 80
+PREVIEW_BATCH = 32
+# Shortest content hash prefix accepted as a preview URL's version (the frontend sends 16)
+PREVIEW_VERSION_LENGTH = 16
+
+
+def _open_first_page(source: str, content_type: str):
+    """The image, or a PDF's first page rasterised, at no more than the largest preview size; None if unsupported."""
+    from PIL import Image, ImageOps
+
+    largest = max(PREVIEW_SIZES.values())
+    if content_type == "application/pdf":
+        try:
+            import pypdfium2
+        except ImportError:
+            return None
+        pdf = pypdfium2.PdfDocument(source)
+        try:
+            page = pdf[0]
+            # Render straight at preview size (page sizes are in points) rather than at full resolution.
+            return page.render(scale=largest / max(page.get_size())).to_pil()
+        finally:
+            pdf.close()
+    if content_type.startswith("image/"):
+        image = Image.open(source)
+        # JPEG scans are decoded at a reduced scale, which is most of the saving for phone photos.
+        image.draft("RGB", (largest, largest))
+        return ImageOps.exif_transpose(image)
+    return None
+
+
+def render_previews(source: str, content_type: str, targets: Dict[str, str]) -> DocumentPreviewStatus:
+    """Write a JPEG per variant in `targets` (variant -> path). Module level so pool workers can unpickle it."""
+    from PIL import Image
+
+    try:
+        image = _open_first_page(source, content_type)
+        if image is None:
+            return DocumentPreviewStatus.UNSUPPORTED
+        if image.mode in ("RGBA", "LA", "P"):
+            # Transparent signatures and stamps go on white rather than black.
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image = image.convert("RGB")
+        for variant, path in targets.items():
+            preview = image.copy()
+            preview.thumbnail((PREVIEW_SIZES[variant], PREVIEW_SIZES[variant]))
+            partial = f"{path}.partial"
+            preview.save(partial, "JPEG", quality=PREVIEW_QUALITY, optimize=True, progressive=True)
+            os.replace(partial, path)
+        return DocumentPreviewStatus.READY
+    except Exception as e:
+        # Usually a corrupt or mislabelled upload; the document stays viewable as a file.
+        logger.warning("Preview rendering failed for %s: %s", source, e)
+        return DocumentPreviewStatus.FAILED
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _preview_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.DOCUMENT_PREVIEW_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Spawned workers do not inherit the server's threads or open connections.
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.DOCUMENT_PREVIEW_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def _render_missing(documents: List[Document]) -> List[DocumentPreviewStatus]:
+    """Status per document, rendering only content whose previews are not cached yet."""
+    statuses: List[Optional[DocumentPreviewStatus]] = []
+    jobs = []
+    for document in documents:
+        targets = {variant: document_store.preview_path(document.content_sha256, variant) for variant in PREVIEW_SIZES}
+        if all(path.exists() for path in targets.values()):
+            statuses.append(DocumentPreviewStatus.READY)
+            continue
+        for path in targets.values():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        statuses.append(None)
+        jobs.append((
+            str(document_store.object_path(document.content_sha256)),
+            document.content_type or "",
+            {variant: str(path) for variant, path in targets.items()}
+        ))
+    if jobs:
+        pool = _preview_pool()
+        rendered = iter(pool.map(render_previews, *zip(*jobs)) if pool else [render_previews(*job) for job in jobs])
+        statuses = [status or next(rendered) for status in statuses]
+    return statuses
+
+
+def generate_previews(document_ids: Iterable[int]):
+    """Background task: render previews for the documents' current files and record the outcome.
+
+    Each status is written only if the document still has the content that was
+    rendered, so a file replaced meanwhile keeps its own pending status.
+    """
+    document_ids = list(document_ids)
+    db = SessionLocal()
+    try:
+        for start in range(0, len(document_ids), PREVIEW_BATCH):
+            documents = db.query(Document).filter(
+                Document.id.in_(document_ids[start:start + PREVIEW_BATCH]),
+                Document.content_sha256.isnot(None)
+            ).all()
+            for document, status in zip(documents, _render_missing(documents)):
+                db.execute(
+                    update(Document)
+                    .filter(Document.id == document.id, Document.content_sha256 == document.content_sha256)
+                    .values(preview_status=status),
+                    execution_options={"synchronize_session": False}
+                )
+            db.commit()
+    finally:
+        db.close()
+
+
+def queue_missing_previews(db, limit: int = 1000) -> List[int]:
+    """Mark up to `limit` documents with a file but no finished previews as pending; returns their ids."""
+    ids = [row.id for row in db.query(Document.id).filter(
+        Document.content_sha256.isnot(None),
+        (Document.preview_status.is_(None)) | (Document.preview_status == DocumentPreviewStatus.PENDING)
+    ).order_by(Document.id).limit(limit)]
+    if ids:
+        db.query(Document).filter(Document.id.in_(ids)).update(
+            {Document.preview_status: DocumentPreviewStatus.PENDING}, synchronize_session=False
+        )
+        db.commit()
+    return ids
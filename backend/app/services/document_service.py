@@ -1,10 +1,14 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, select, union_all
 from app.models.document import Document, OnboardingChecklist, Holiday, AuditLog
+from app.core.audit import record_audit, row_values
 from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentStatus
 from typing import Optional, List
 from datetime import datetime
-import json
+from app.services.pagination import KeysetPage, keyset_statement, keyset_page, total_statement
+from app.services.audit_partitions import audit_partitions
+
+AUDIT_LOG_KEYSET = (AuditLog.id,)
 
 
 class DocumentService:
@@ -122,29 +126,16 @@ class HolidayService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _log_audit(self, user_id: int, action: str, entity_type: str, entity_id: int, old_value: dict = None, new_value: dict = None):
-        try:
-            audit_log = AuditLog(
-                user_id=user_id,
-                action=action,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                old_value=json.dumps(old_value) if old_value else None,
-                new_value=json.dumps(new_value) if new_value else None,
-            )
-            self.db.add(audit_log)
-            self.db.commit()
-        except Exception:
-            pass
-
     def create_holiday(self, holiday_data: dict, user_id: int = None) -> Holiday:
         db_holiday = Holiday(**holiday_data)
         self.db.add(db_holiday)
-        self.db.commit()
-        self.db.refresh(db_holiday)
+        self.db.flush()
         
         if user_id:
-            self._log_audit(user_id, "create", "holiday", db_holiday.id, None, holiday_data)
+            record_audit(self.db, user_id, "create", "holiday", db_holiday.id, None, row_values(db_holiday))
+        
+        self.db.commit()
+        self.db.refresh(db_holiday)
         
         return db_holiday
 
@@ -169,16 +160,17 @@ class HolidayService:
             return None
         
         old_values = {"name": holiday.name, "date": str(holiday.date), "isOptional": holiday.isOptional}
+        # Only the values applied go into the audit event, so replaying it reproduces the row.
+        holiday_data = {key: value for key, value in holiday_data.items() if value is not None}
         for key, value in holiday_data.items():
-            if value is not None:
-                setattr(holiday, key, value)
+            setattr(holiday, key, value)
+        
+        if user_id:
+            record_audit(self.db, user_id, "update", "holiday", holiday_id, old_values, holiday_data)
         
         self.db.commit()
         self.db.refresh(holiday)
         
-        if user_id:
-            self._log_audit(user_id, "update", "holiday", holiday_id, old_values, holiday_data)
-        
         return holiday
 
     def delete_holiday(self, holiday_id: int, user_id: int = None) -> bool:
@@ -189,10 +181,11 @@ class HolidayService:
         
         old_values = {"name": holiday.name, "date": str(holiday.date)}
         holiday.is_active = False
-        self.db.commit()
         
         if user_id:
-            self._log_audit(user_id, "delete", "holiday", holiday_id, old_values, None)
+            record_audit(self.db, user_id, "delete", "holiday", holiday_id, old_values, {"is_active": False})
+        
+        self.db.commit()
         
         return True
 
@@ -208,22 +201,119 @@ class AuditService:
         self.db.refresh(db_log)
         return db_log
 
+    def _audit_log_queries(
+        self,
+        user_id: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        action: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> list:
+        """(entity, filtered select) for audit_logs and each partition overlapping the date range."""
+        queries = []
+        for entity in audit_partitions.sources(self.db, start_date, end_date):
+            stmt = select(entity)
+            if user_id:
+                stmt = stmt.filter(entity.user_id == user_id)
+            if entity_type:
+                stmt = stmt.filter(entity.entity_type == entity_type)
+            if entity_id:
+                stmt = stmt.filter(entity.entity_id == entity_id)
+            if action:
+                stmt = stmt.filter(entity.action == action)
+            if start_date:
+                stmt = stmt.filter(entity.created_at >= start_date)
+            if end_date:
+                stmt = stmt.filter(entity.created_at <= end_date)
+            queries.append((entity, stmt))
+        return queries
+
+    def _merged(self, statements: list):
+        """One entity over the union of per-partition statements, or the single statement's own."""
+        if len(statements) == 1:
+            return statements[0]
+        merged = union_all(*[select(stmt.subquery()) for _, stmt in statements]).subquery("audit_logs_merged")
+        entity = aliased(AuditLog, merged, adapt_on_names=True)
+        return entity, select(entity)
+
     def get_audit_logs(
         self,
         user_id: Optional[int] = None,
         entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        action: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
         skip: int = 0,
         limit: int = 50
     ) -> tuple[List[AuditLog], int]:
-        query = self.db.query(AuditLog)
-        
-        if user_id:
-            query = query.filter(AuditLog.user_id == user_id)
-        
-        if entity_type:
-            query = query.filter(AuditLog.entity_type == entity_type)
-        
-        total = query.count()
-        logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
-        
+        queries = self._audit_log_queries(user_id, entity_type, entity_id, action, start_date, end_date)
+        total = sum(
+            self.db.scalar(select(func.count()).select_from(stmt.subquery())) for _, stmt in queries
+        )
+        # No partition can contribute more than skip + limit rows to the page.
+        entity, stmt = self._merged([
+            (entity, stmt.order_by(entity.created_at.desc(), entity.id.desc()).limit(skip + limit))
+            for entity, stmt in queries
+        ])
+        logs = self.db.scalars(
+            stmt.order_by(None).order_by(entity.created_at.desc(), entity.id.desc()).offset(skip).limit(limit)
+        ).all()
         return logs, total
+
+    def get_audit_logs_page(
+        self,
+        user_id: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        action: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        count: str = "estimate"
+    ) -> KeysetPage:
+        """Newest first by id, which follows insertion order like created_at but compares exactly.
+
+        Each partition in range is paged on its own and the pages are merged, so
+        a page reads at most limit + 1 rows from every partition it touches.
+        """
+        queries = self._audit_log_queries(user_id, entity_type, entity_id, action, start_date, end_date)
+        entity, stmt = self._merged([
+            (entity, keyset_statement(stmt, (entity.id,), cursor, limit)) for entity, stmt in queries
+        ])
+        logs = self.db.scalars(keyset_statement(stmt, (entity.id,), None, limit)).all()
+        total = None
+        if count != "none":
+            total = sum(self.db.scalar(total_statement(stmt, count)) for _, stmt in queries)
+        return keyset_page(logs, AUDIT_LOG_KEYSET, limit, total, count)
+
+    def get_entity_events(
+        self,
+        entity_type: str,
+        entity_id: int,
+        after_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        newest_first: bool = False
+    ) -> List[AuditLog]:
+        """Events for one entity in id order, across the partitions overlapping the dates."""
+        queries = self._audit_log_queries(
+            entity_type=entity_type, entity_id=entity_id, start_date=start_date, end_date=end_date
+        )
+        if after_id:
+            queries = [(entity, stmt.filter(entity.id > after_id)) for entity, stmt in queries]
+        entity, stmt = self._merged(queries)
+        return self.db.scalars(stmt.order_by(entity.id.desc() if newest_first else entity.id)).all()
+
+    def archive_audit_logs(self, before: Optional[datetime] = None, user_id: Optional[int] = None) -> List[dict]:
+        """Roll finished months into partitions and archive those before `before` (see audit_partitions)."""
+        archived = audit_partitions.archive(self.db, before)
+        if archived and user_id:
+            record_audit(self.db, user_id, "archive", "audit_log", None, None, {
+                "partitions": [partition["partition"] for partition in archived],
+                "rows": sum(partition["rows"] for partition in archived)
+            })
+            self.db.commit()
+        return archived
@@ -0,0 +1,264 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.audit import record_audit
+from app.core.config import settings
+from app.models.document import Document, DocumentPreviewStatus, DocumentUpload
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+from datetime import datetime
+import hashlib
+import mimetypes
+import re
+import uuid
+import aiofiles
+import aiofiles.os
+
+IO_CHUNK_BYTES = 1024 * 1024
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(first, last) byte of a single-range `Range` header; None to send the whole file.
+
+    Multiple ranges and unknown units are answered with the whole file, which
+    RFC 9110 allows. ValueError if the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or last < first:
+        raise ValueError("Range not satisfiable")
+    return first, last
+
+
+class DocumentStore:
+    """Document files on disk, stored once per content under their SHA-256.
+
+    Finished files live at objects/ab/cd/<sha256>, so identical scans uploaded
+    for several documents take the space of one. Uploads in progress are part
+    files in uploads/ and are written at the offset the client gives, so a
+    retried chunk overwrites itself. All file I/O goes through aiofiles in
+    IO_CHUNK_BYTES pieces; no file is ever held in memory whole.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def object_key(self, sha256: str) -> str:
+        return f"objects/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / self.object_key(sha256)
+
+    def preview_path(self, sha256: str, variant: str) -> Path:
+        """JPEG preview of a stored file; keyed by content like the file itself, so it is rendered once."""
+        return self.root / "previews" / sha256[:2] / f"{sha256}-{variant}.jpg"
+
+    def upload_path(self, upload_id: str) -> Path:
+        return self.root / "uploads" / f"{upload_id}.part"
+
+    async def upload_size(self, upload_id: str) -> int:
+        path = self.upload_path(upload_id)
+        return (await aiofiles.os.stat(path)).st_size if await aiofiles.os.path.exists(path) else 0
+
+    async def write_upload(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes], limit: int) -> int:
+        """Write `chunks` into the part file from `offset`; returns the part file's size afterwards."""
+        path = self.upload_path(upload_id)
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        if offset > await self.upload_size(upload_id):
+            raise ValueError("Upload-Offset is past the bytes received so far")
+        mode = "r+b" if await aiofiles.os.path.exists(path) else "wb"
+        async with aiofiles.open(path, mode) as output:
+            await output.seek(offset)
+            position = offset
+            async for chunk in chunks:
+                position += len(chunk)
+                if position > limit:
+                    raise ValueError(f"The upload is larger than its declared {limit} bytes")
+                await output.write(chunk)
+        return await self.upload_size(upload_id)
+
+    async def commit_upload(self, upload_id: str) -> Tuple[str, int]:
+        """Hash a complete part file and move it into place; returns (sha256, size)."""
+        path = self.upload_path(upload_id)
+        digest = hashlib.sha256()
+        size = 0
+        async with aiofiles.open(path, "rb") as source:
+            while chunk := await source.read(IO_CHUNK_BYTES):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        await self._place(path, sha256)
+        return sha256, size
+
+    async def save(self, chunks: AsyncIterator[bytes], limit: int) -> Tuple[str, int]:
+        """Store a whole file streamed in one request, hashing as it is written; returns (sha256, size)."""
+        upload_id = uuid.uuid4().hex
+        path = self.upload_path(upload_id)
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(path, "wb") as output:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > limit:
+                        raise ValueError(f"Files are limited to {limit} bytes")
+                    digest.update(chunk)
+                    await output.write(chunk)
+        except BaseException:
+            await self.discard_upload(upload_id)
+            raise
+        sha256 = digest.hexdigest()
+        await self._place(path, sha256)
+        return sha256, size
+
+    async def _place(self, path: Path, sha256: str):
+        target = self.object_path(sha256)
+        if await aiofiles.os.path.exists(target):
+            await aiofiles.os.remove(path)  # same content already stored
+            return
+        await aiofiles.os.makedirs(target.parent, exist_ok=True)
+        await aiofiles.os.replace(path, target)
+
+    async def discard_upload(self, upload_id: str):
+        path = self.upload_path(upload_id)
+        if await aiofiles.os.path.exists(path):
+            await aiofiles.os.remove(path)
+
+    async def read(self, sha256: str, first: int = 0, last: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Bytes `first` to `last` (inclusive; default the end) of a stored file, in IO_CHUNK_BYTES pieces."""
+        async with aiofiles.open(self.object_path(sha256), "rb") as source:
+            await source.seek(first)
+            remaining = None if last is None else last - first + 1
+            while remaining is None or remaining > 0:
+                chunk = await source.read(IO_CHUNK_BYTES if remaining is None else min(IO_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+
+document_store = DocumentStore(str(Path(settings.STORAGE_DIR) / "documents"))
+
+
+class DocumentFileService:
+    """Uploads and downloads of document files, served from `AsyncSession` so the event loop never blocks on I/O."""
+
+    def __init__(self, db: AsyncSession, store: DocumentStore = document_store):
+        self.db = db
+        self.store = store
+
+    async def get_document(self, document_id: int) -> Optional[Document]:
+        return await self.db.get(Document, document_id)
+
+    async def upload_file(
+        self,
+        document: Document,
+        file_name: str,
+        content_type: Optional[str],
+        chunks: AsyncIterator[bytes],
+        user_id: Optional[int] = None
+    ) -> Document:
+        sha256, size = await self.store.save(chunks, settings.DOCUMENT_MAX_BYTES)
+        return await self._attach(document, file_name, content_type, sha256, size, user_id)
+
+    async def start_upload(
+        self,
+        document: Document,
+        file_name: str,
+        content_type: Optional[str],
+        total_size: int,
+        user_id: Optional[int] = None
+    ) -> DocumentUpload:
+        if total_size <= 0:
+            raise ValueError("total_size must be positive")
+        if total_size > settings.DOCUMENT_MAX_BYTES:
+            raise ValueError(f"Files are limited to {settings.DOCUMENT_MAX_BYTES} bytes")
+        upload = DocumentUpload(
+            id=uuid.uuid4().hex,
+            document_id=document.id,
+            file_name=file_name,
+            content_type=content_type,
+            total_size=total_size,
+            created_by=user_id
+        )
+        self.db.add(upload)
+        await self.db.commit()
+        return upload
+
+    async def get_upload(self, upload_id: str) -> Optional[DocumentUpload]:
+        return await self.db.scalar(select(DocumentUpload).filter(DocumentUpload.id == upload_id))
+
+    async def upload_offset(self, upload: DocumentUpload) -> int:
+        return upload.total_size if upload.completed_at else await self.store.upload_size(upload.id)
+
+    async def write_chunk(
+        self,
+        upload: DocumentUpload,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        user_id: Optional[int] = None
+    ) -> int:
+        """Write a chunk at `offset`; the upload is attached to its document once all bytes are in.
+
+        When concurrent requests both see the last byte arrive, only the one whose
+        conditional UPDATE marks the upload complete commits the file; the others
+        return the full offset and leave `upload.completed_at` unset.
+        """
+        if upload.completed_at:
+            raise ValueError("The upload is already complete")
+        received = await self.store.write_upload(upload.id, offset, chunks, upload.total_size)
+        if received == upload.total_size:
+            completed_at = datetime.now()
+            claimed = (await self.db.execute(
+                update(DocumentUpload)
+                .where(DocumentUpload.id == upload.id, DocumentUpload.completed_at.is_(None))
+                .values(completed_at=completed_at),
+                execution_options={"synchronize_session": False}
+            )).rowcount
+            if claimed != 1:
+                await self.db.commit()  # nothing written; a rollback would expire `upload` for the caller
+                return received
+            # Marked complete in the transaction that attaches the file, so a failure below undoes both.
+            sha256, size = await self.store.commit_upload(upload.id)
+            upload.completed_at = completed_at
+            document = await self.get_document(upload.document_id)
+            await self._attach(document, upload.file_name, upload.content_type, sha256, size, user_id)
+        return received
+
+    async def _attach(
+        self,
+        document: Document,
+        file_name: str,
+        content_type: Optional[str],
+        sha256: str,
+        size: int,
+        user_id: Optional[int]
+    ) -> Document:
+        # The previous object is kept: other documents may share its content.
+        old_values = {"content_sha256": document.content_sha256, "file_size": document.file_size}
+        document.file_name = file_name
+        document.content_type = content_type or mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        document.file_size = size
+        document.content_sha256 = sha256
+        document.file_path = self.store.object_key(sha256)
+        document.file_url = f"{settings.API_V1_STR}/documents/{document.id}/file"
+        document.preview_status = DocumentPreviewStatus.PENDING
+        if user_id:
+            record_audit(self.db, user_id, "upload", "document", document.id, old_values, {
+                "content_sha256": sha256, "file_size": size, "file_name": file_name
+            })
+        await self.db.commit()
+        await self.db.refresh(document)
+        return document
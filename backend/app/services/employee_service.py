@@ -1,88 +1,96 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from app.models.user import User, Department, Designation, Employee
-from app.models.document import AuditLog
+from app.core.audit import record_audit, row_values
 from app.schemas.user import (
     EmployeeCreate, EmployeeUpdate,
     DepartmentCreate, DepartmentUpdate,
     DesignationCreate, DesignationUpdate,
     UserCreate, UserUpdate
 )
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    get_password_hash, verify_and_update_password, create_user_token, invalidate_user,
+    revoke_user_tokens
+)
 from typing import Optional, List
 from datetime import datetime, timedelta
-import random
-import string
-import json
 from app.core.config import settings
+from app.services.pagination import KeysetPage, keyset_statement, keyset_page, total_statement
+from app.services.search_service import SearchQuery, employee_search
+from app.services.sequence_service import SequenceService
+
+
+def employee_list_statement(
+    search: Optional[SearchQuery] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    is_active: Optional[bool] = None
+):
+    stmt = select(Employee).options(
+        joinedload(Employee.department),
+        joinedload(Employee.designation)
+    )
+    
+    if search:
+        stmt = employee_search.filter(stmt, search)
+    
+    if department_id:
+        stmt = stmt.filter(Employee.department_id == department_id)
+    
+    if status:
+        stmt = stmt.filter(Employee.status == status)
+    
+    if is_active is not None:
+        stmt = stmt.filter(Employee.is_active == is_active)
+    
+    return stmt
+
+
+EMPLOYEE_KEYSET = (Employee.id,)
+EMPLOYEE_CODE_PREFIX = "EMP"
+
+
+def employee_list_item(emp: Employee) -> dict:
+    return {
+        "id": emp.id,
+        "employee_code": emp.employee_code,
+        "first_name": emp.first_name,
+        "last_name": emp.last_name,
+        "email": emp.email,
+        "phone": emp.phone,
+        "department": emp.department.name if emp.department else None,
+        "designation": emp.designation.name if emp.designation else None,
+        "status": emp.status.value if emp.status else None,
+        "is_active": emp.is_active,
+        "date_of_joining": emp.date_of_joining
+    }
 
 
 class EmployeeService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _log_audit(self, user_id: int, action: str, entity_type: str, entity_id: int, old_value: dict = None, new_value: dict = None):
-        try:
-            audit_log = AuditLog(
-                user_id=user_id,
-                action=action,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                old_value=json.dumps(old_value) if old_value else None,
-                new_value=json.dumps(new_value) if new_value else None,
-            )
-            self.db.add(audit_log)
-            self.db.commit()
-        except Exception:
-            pass
-
     def _generate_employee_code(self) -> str:
-        year = datetime.now().year
-        while True:
-            random_suffix = ''.join(random.choices(string.digits, k=4))
-            code = f"EMP{year}{random_suffix}"
-            existing = self.db.query(Employee).filter(Employee.employee_code == code).first()
-            if not existing:
-                return code
-
-    def employee_login(self, employee_code: str, password: str) -> Optional[dict]:
-        """Login using employee code and password (creates user if doesn't exist)"""
-        employee = self.db.query(Employee).filter(Employee.employee_code == employee_code).first()
-        
-        if not employee:
-            return None
-        
-        user = self.db.query(User).filter(User.employee_id == employee.id).first()
-        
-        if not user:
-            return None
-        
-        if not verify_password(password, user.hashed_password):
-            return None
-        
-        if not user.is_active:
-            return None
-        
-        access_token = create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-        
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "employee": {
-                "id": employee.id,
-                "employee_code": employee.employee_code,
-                "first_name": employee.first_name,
-                "last_name": employee.last_name,
-                "email": employee.email,
-                "phone": employee.phone,
-                "department": employee.department.name if employee.department else None,
-                "designation": employee.designation.name if employee.designation else None,
-                "date_of_joining": employee.date_of_joining
-            }
-        }
+        return self.reserve_employee_codes(1)[0]
+
+    def reserve_employee_codes(self, count: int, year: Optional[int] = None) -> List[str]:
+        """`count` unused EMPYYYYNNNN codes, reserved from the year's counter (suffixes widen past 9999).
+
+        Codes issued before the counter existed were random four-digit suffixes.
+        The counter starts at 1 and skips any of those it reaches, so codes stay
+        four digits until the year's suffixes are all used.
+        """
+        prefix = f"{EMPLOYEE_CODE_PREFIX}{year or datetime.now().year}"
+        sequence = SequenceService(self.db)
+        codes = []
+        while len(codes) < count:
+            candidates = [
+                f"{prefix}{value:04d}" for value in sequence.reserve(f"employee_code:{prefix}", count - len(codes))
+            ]
+            issued = set(self.db.scalars(select(Employee.employee_code).filter(Employee.employee_code.in_(candidates))))
+            codes += [code for code in candidates if code not in issued]
+        return codes
 
     def create_employee(self, employee_data: EmployeeCreate, user_id: int = None) -> Employee:
         employee_code = self._generate_employee_code()
@@ -93,11 +101,13 @@ class EmployeeService:
         )
         
         self.db.add(db_employee)
-        self.db.commit()
-        self.db.refresh(db_employee)
+        self.db.flush()
         
         if user_id:
-            self._log_audit(user_id, "create", "employee", db_employee.id, None, employee_data.model_dump())
+            record_audit(self.db, user_id, "create", "employee", db_employee.id, None, row_values(db_employee))
+        
+        self.db.commit()
+        self.db.refresh(db_employee)
         
         return db_employee
 
@@ -116,47 +126,14 @@ class EmployeeService:
         status: Optional[str] = None,
         is_active: Optional[bool] = None
     ) -> tuple[List[dict], int]:
-        query = self.db.query(Employee)
-        
-        if search:
-            query = query.filter(
-                or_(
-                    Employee.first_name.ilike(f"%{search}%"),
-                    Employee.last_name.ilike(f"%{search}%"),
-                    Employee.email.ilike(f"%{search}%"),
-                    Employee.employee_code.ilike(f"%{search}%")
-                )
-            )
-        
-        if department_id:
-            query = query.filter(Employee.department_id == department_id)
-        
-        if status:
-            query = query.filter(Employee.status == status)
-        
-        if is_active is not None:
-            query = query.filter(Employee.is_active == is_active)
-        
-        total = query.count()
-        employees = query.order_by(Employee.id.desc()).offset(skip).limit(limit).all()
-        
-        result = []
-        for emp in employees:
-            result.append({
-                "id": emp.id,
-                "employee_code": emp.employee_code,
-                "first_name": emp.first_name,
-                "last_name": emp.last_name,
-                "email": emp.email,
-                "phone": emp.phone,
-                "department": emp.department.name if emp.department else None,
-                "designation": emp.designation.name if emp.designation else None,
-                "status": emp.status.value if emp.status else None,
-                "is_active": emp.is_active,
-                "date_of_joining": emp.date_of_joining
-            })
-        
-        return result, total
+        search_query = employee_search.prepare(self.db, search) if search else None
+        stmt = employee_list_statement(search_query, department_id, status, is_active)
+        total = self.db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        employees = self.db.scalars(
+            stmt.order_by(Employee.id.desc()).offset(skip).limit(limit)
+        ).all()
+        
+        return [employee_list_item(emp) for emp in employees], total
 
     def update_employee(self, employee_id: int, employee_data: EmployeeUpdate, user_id: int = None) -> Optional[Employee]:
         employee = self.get_employee(employee_id)
@@ -171,12 +148,12 @@ class EmployeeService:
             old_values[key] = getattr(employee, key)
             setattr(employee, key, value)
         
+        if user_id:
+            record_audit(self.db, user_id, "update", "employee", employee_id, old_values, update_data)
+        
         self.db.commit()
         self.db.refresh(employee)
         
-        if user_id:
-            self._log_audit(user_id, "update", "employee", employee_id, old_values, update_data)
-        
         return employee
 
     def delete_employee(self, employee_id: int, user_id: int = None) -> bool:
@@ -187,21 +164,24 @@ class EmployeeService:
         
         old_values = {"first_name": employee.first_name, "last_name": employee.last_name, "is_active": employee.is_active}
         employee.is_active = False
-        self.db.commit()
         
         if user_id:
-            self._log_audit(user_id, "delete", "employee", employee_id, old_values, None)
+            record_audit(self.db, user_id, "delete", "employee", employee_id, old_values, {"is_active": False})
+        
+        self.db.commit()
         
         return True
 
     def create_department(self, department_data: DepartmentCreate, user_id: int = None) -> Department:
         db_department = Department(**department_data.model_dump())
         self.db.add(db_department)
-        self.db.commit()
-        self.db.refresh(db_department)
+        self.db.flush()
         
         if user_id:
-            self._log_audit(user_id, "create", "department", db_department.id, None, department_data.model_dump())
+            record_audit(self.db, user_id, "create", "department", db_department.id, None, row_values(db_department))
+        
+        self.db.commit()
+        self.db.refresh(db_department)
         
         return db_department
 
@@ -225,12 +205,12 @@ class EmployeeService:
             old_values[key] = getattr(department, key)
             setattr(department, key, value)
         
+        if user_id:
+            record_audit(self.db, user_id, "update", "department", department_id, old_values, update_data)
+        
         self.db.commit()
         self.db.refresh(department)
         
-        if user_id:
-            self._log_audit(user_id, "update", "department", department_id, old_values, update_data)
-        
         return department
 
     def delete_department(self, department_id: int, user_id: int = None) -> bool:
@@ -240,10 +220,11 @@ class EmployeeService:
         
         old_values = {"name": department.name, "code": department.code}
         department.is_active = False
-        self.db.commit()
         
         if user_id:
-            self._log_audit(user_id, "delete", "department", department_id, old_values, None)
+            record_audit(self.db, user_id, "delete", "department", department_id, old_values, {"is_active": False})
+        
+        self.db.commit()
         
         return True
 
@@ -338,11 +319,18 @@ class UserService:
         if not user:
             return None
         
+        claims = (user.role, user.is_active, user.is_superuser, user.employee_id)
         for key, value in user_data.items():
             if value is not None and key != "id":
                 setattr(user, key, value)
         
+        # Tokens embed these fields, so changing any of them revokes issued tokens.
+        version = None
+        if claims != (user.role, user.is_active, user.is_superuser, user.employee_id):
+            version = revoke_user_tokens(self.db, user_id)
+        
         self.db.commit()
+        invalidate_user(user_id, version)
         self.db.refresh(user)
         return user
 
@@ -352,5 +340,96 @@ class UserService:
             return False
         
         user.is_active = False
+        version = revoke_user_tokens(self.db, user_id)
         self.db.commit()
+        invalidate_user(user_id, version)
         return True
+
+
+class AsyncEmployeeService:
+    """Read paths and employee login served from `AsyncSession`; relationships are eager-loaded up front."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def employee_login(self, employee_code: str, password: str) -> Optional[dict]:
+        """Login using employee code and password (creates user if doesn't exist)"""
+        employee = (await self.db.scalars(
+            select(Employee).options(joinedload(Employee.department), joinedload(Employee.designation))
+            .filter(Employee.employee_code == employee_code)
+        )).first()
+        
+        if not employee:
+            return None
+        
+        user = (await self.db.scalars(select(User).filter(User.employee_id == employee.id))).first()
+        
+        if not user:
+            return None
+        
+        verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not verified:
+            return None
+        
+        if not user.is_active:
+            return None
+        
+        if new_hash:
+            user.hashed_password = new_hash
+            await self.db.commit()
+        
+        access_token = await self.db.run_sync(
+            create_user_token, user, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+        
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "employee": {
+                "id": employee.id,
+                "employee_code": employee.employee_code,
+                "first_name": employee.first_name,
+                "last_name": employee.last_name,
+                "email": employee.email,
+                "phone": employee.phone,
+                "department": employee.department.name if employee.department else None,
+                "designation": employee.designation.name if employee.designation else None,
+                "date_of_joining": employee.date_of_joining
+            }
+        }
+
+    async def get_employees(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        search: Optional[str] = None,
+        department_id: Optional[int] = None,
+        status: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> tuple[List[dict], int]:
+        search_query = await self.db.run_sync(employee_search.prepare, search) if search else None
+        stmt = employee_list_statement(search_query, department_id, status, is_active)
+        total = await self.db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        employees = (await self.db.scalars(
+            stmt.order_by(Employee.id.desc()).offset(skip).limit(limit)
+        )).all()
+        
+        return [employee_list_item(emp) for emp in employees], total
+
+    async def get_employees_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        count: str = "estimate",
+        search: Optional[str] = None,
+        department_id: Optional[int] = None,
+        status: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> KeysetPage:
+        search_query = await self.db.run_sync(employee_search.prepare, search) if search else None
+        stmt = employee_list_statement(search_query, department_id, status, is_active)
+        employees = (await self.db.scalars(keyset_statement(stmt, EMPLOYEE_KEYSET, cursor, limit))).all()
+        total_stmt = total_statement(stmt, count)
+        total = await self.db.scalar(total_stmt) if total_stmt is not None else None
+        page = keyset_page(employees, EMPLOYEE_KEYSET, limit, total, count)
+        return page._replace(items=[employee_list_item(emp) for emp in page.items])
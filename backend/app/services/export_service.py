@@ -0,0 +1,162 @@
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.replicas import read_session
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
+from datetime import date, datetime
+import csv
+import enum
+import io
+import json
+import tempfile
+import zipfile
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson|xlsx)$"
+
+YIELD_PER = 1000
+CHUNK_ROWS = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+Columns = List[Tuple[str, str]]
+
+
+def _cell(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value):
+    value = _cell(value)
+    return value if isinstance(value, str) else str(value)
+
+
+def session_rows(rows_factory: Callable[[Session], Iterable[dict]]) -> Iterator[dict]:
+    """Run `rows_factory` on a session owned by the generator itself.
+
+    The request-scoped session from `get_db` is closed before a streaming body is
+    consumed, so exports open their own read session (on a replica when one is
+    fresh) and close it once the last row is sent.
+    """
+    db = read_session()
+    try:
+        yield from rows_factory(db)
+    finally:
+        db.close()
+
+
+def iter_csv(columns: Columns, rows: Iterable[dict], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([label for _, label in columns])
+    pending = 0
+    for row in rows:
+        writer.writerow([_cell(row.get(key)) for key, _ in columns])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(columns: Columns, rows: Iterable[dict], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({key: row.get(key) for key, _ in columns}, default=_json_default))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_xlsx(columns: Columns, rows: Iterable[dict], sheet_title: str = "Report") -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    # Write-only workbooks flush each appended row to a temporary XML part, so
+    # memory stays flat; the finished zip is then streamed back from disk.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    sheet.append([label for _, label in columns])
+    for row in rows:
+        sheet.append([_cell(row.get(key)) for key, _ in columns])
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class _ZipSink:
+    """Write-only, unseekable buffer; zipfile falls back to data descriptors for it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(
+    entries: Iterable[Tuple[str, Union[bytes, Iterable[bytes]]]],
+    compression: int = zipfile.ZIP_STORED
+) -> Iterator[bytes]:
+    """Stream a zip archive; a member may be bytes or an iterable of byte chunks."""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=compression) as archive:
+        for name, content in entries:
+            if isinstance(content, bytes):
+                archive.writestr(name, content)
+            else:
+                with archive.open(name, "w") as member:
+                    for piece in content:
+                        member.write(piece)
+                        chunk = sink.drain()
+                        if chunk:
+                            yield chunk
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def export_response(fmt: str, columns: Columns, rows: Iterable[dict], filename: str) -> StreamingResponse:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if fmt == "csv":
+        body = iter_csv(columns, rows)
+    elif fmt == "ndjson":
+        body = iter_ndjson(columns, rows)
+    else:
+        body = iter_xlsx(columns, rows, sheet_title=filename)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"}
+    )
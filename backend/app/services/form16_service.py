@@ -0,0 +1,277 @@
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, and_, or_
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.payroll import PayrollRecord, Form16Job, Form16JobStatus
+from app.models.user import Employee
+from app.services.pdf_templates import get_template, Form16Template
+from app.services.export_service import iter_zip
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta
+from itertools import groupby, islice
+from pathlib import Path
+import multiprocessing
+import os
+import threading
+import zipfile
+
+FINANCIAL_YEAR_START_MONTH = 4
+YIELD_PER = 1000
+RENDER_BATCH = 64
+
+
+class Form16Data(NamedTuple):
+    employee_id: int
+    employee_code: str
+    employee_name: str
+    pan_number: Optional[str]
+    designation: Optional[str]
+    financial_year: int
+    monthly: Dict[int, Tuple[float, float, float]]
+
+    @property
+    def filename(self) -> str:
+        return f"Form16_{self.employee_code}_{self.financial_year}.pdf"
+
+
+def financial_year_filter(year: int):
+    """Records for FY `year`: April of `year` through March of `year + 1`."""
+    return or_(
+        and_(PayrollRecord.year == year, PayrollRecord.month >= FINANCIAL_YEAR_START_MONTH),
+        and_(PayrollRecord.year == year + 1, PayrollRecord.month < FINANCIAL_YEAR_START_MONTH)
+    )
+
+
+def render_certificate(data: Form16Data) -> bytes:
+    # Module level so worker processes can unpickle it by reference.
+    return get_template(Form16Template).render_form16(data)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.FORM16_RENDER_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Spawned workers do not inherit the server's threads or open connections.
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.FORM16_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def render_certificates(certificates: Iterable[Form16Data]) -> Iterator[Tuple[str, bytes]]:
+    """Render in order, fanning each batch out to the worker pool when one is configured."""
+    pool = _render_pool()
+    certificates = iter(certificates)
+    while True:
+        batch = list(islice(certificates, RENDER_BATCH))
+        if not batch:
+            break
+        pdfs = pool.map(render_certificate, batch) if pool else map(render_certificate, batch)
+        for data, pdf in zip(batch, pdfs):
+            yield data.filename, pdf
+
+
+def job_dir(job_id: int) -> Path:
+    return Path(settings.STORAGE_DIR) / "form16" / str(job_id)
+
+
+def _part_path(job_id: int, part: int) -> Path:
+    return job_dir(job_id) / f"part{part:04d}.zip"
+
+
+class Form16Service:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _record_filter(self, year: int):
+        return (
+            financial_year_filter(year),
+            PayrollRecord.status.in_(['approved', 'paid'])
+        )
+
+    def count_employees(self, year: int) -> int:
+        return self.db.query(
+            func.count(func.distinct(PayrollRecord.employee_id))
+        ).filter(*self._record_filter(year)).scalar() or 0
+
+    def iter_certificates(
+        self,
+        year: int,
+        employee_id: Optional[int] = None,
+        after_employee_id: int = 0,
+        limit: Optional[int] = None
+    ) -> Iterator[Form16Data]:
+        """One aggregate query for the whole year, grouped by employee and month in SQL.
+
+        With `limit`, the next `limit` employees are picked first and only their
+        records are aggregated, so each chunk of a job costs the same.
+        """
+        totals = self.db.query(
+            PayrollRecord.employee_id.label("employee_id"),
+            PayrollRecord.month.label("month"),
+            func.sum(PayrollRecord.gross_earnings).label("gross"),
+            func.sum(PayrollRecord.tds).label("tds"),
+            func.sum(PayrollRecord.pf_employee).label("pf")
+        ).filter(*self._record_filter(year))
+
+        if employee_id:
+            totals = totals.filter(PayrollRecord.employee_id == employee_id)
+        if after_employee_id:
+            totals = totals.filter(PayrollRecord.employee_id > after_employee_id)
+        if limit is not None:
+            next_employees = self.db.query(PayrollRecord.employee_id).filter(*self._record_filter(year))
+            if after_employee_id:
+                next_employees = next_employees.filter(PayrollRecord.employee_id > after_employee_id)
+            next_employees = next_employees.distinct().order_by(PayrollRecord.employee_id).limit(limit)
+            totals = totals.filter(PayrollRecord.employee_id.in_(next_employees.subquery().select()))
+        totals = totals.group_by(PayrollRecord.employee_id, PayrollRecord.month).subquery()
+
+        query = self.db.query(
+            Employee, totals.c.month, totals.c.gross, totals.c.tds, totals.c.pf
+        ).join(
+            totals, totals.c.employee_id == Employee.id
+        ).options(
+            joinedload(Employee.designation)
+        ).order_by(Employee.id, totals.c.month)
+
+        rows = query.yield_per(YIELD_PER)
+        for _, group in groupby(rows, key=lambda row: row.Employee.id):
+            yield self._certificate(year, list(group))
+
+    def _certificate(self, year: int, rows) -> Form16Data:
+        employee = rows[0].Employee
+        return Form16Data(
+            employee_id=employee.id,
+            employee_code=employee.employee_code,
+            employee_name=f"{employee.first_name} {employee.last_name or ''}",
+            pan_number=employee.pan_number,
+            designation=employee.designation.name if employee.designation else None,
+            financial_year=year,
+            monthly={
+                row.month: (row.gross or 0.0, row.tds or 0.0, row.pf or 0.0)
+                for row in rows
+            }
+        )
+
+    def get_certificate(self, employee_id: int, year: int) -> Optional[Form16Data]:
+        return next(self.iter_certificates(year, employee_id=employee_id), None)
+
+    def create_job(self, year: int, created_by: Optional[int] = None) -> Form16Job:
+        job = Form16Job(
+            financial_year=year,
+            status=Form16JobStatus.PENDING,
+            total_employees=self.count_employees(year),
+            created_by=created_by
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Form16Job]:
+        return self.db.query(Form16Job).filter(Form16Job.id == job_id).first()
+
+    def is_job_stale(self, job: Form16Job) -> bool:
+        """A running job that has not checkpointed for FORM16_JOB_STALE_SECONDS lost its runner."""
+        cutoff = datetime.now() - timedelta(seconds=settings.FORM16_JOB_STALE_SECONDS)
+        return job.status == Form16JobStatus.RUNNING and (job.updated_at is None or job.updated_at < cutoff)
+
+    def claim_job(self, job_id: int) -> bool:
+        """Mark the job running unless another runner has it; True if this caller may run it.
+
+        A conditional UPDATE, so two runners queued for the same job cannot both
+        write its part files.
+        """
+        cutoff = datetime.now() - timedelta(seconds=settings.FORM16_JOB_STALE_SECONDS)
+        claimed = self.db.query(Form16Job).filter(
+            Form16Job.id == job_id,
+            or_(
+                Form16Job.status.in_([Form16JobStatus.PENDING, Form16JobStatus.FAILED]),
+                and_(Form16Job.status == Form16JobStatus.RUNNING, Form16Job.updated_at < cutoff)
+            )
+        ).update(
+            {Form16Job.status: Form16JobStatus.RUNNING, Form16Job.updated_at: datetime.now()},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return claimed == 1
+
+    def _checkpoint(self, job: Form16Job):
+        # Stamped from the same clock claim_job and is_job_stale use; the column's
+        # onupdate=func.now() is UTC on SQLite and would make running jobs look stale.
+        job.updated_at = datetime.now()
+        self.db.commit()
+
+    def run_job(self, job: Form16Job, chunk_size: Optional[int] = None):
+        """Render the job in chunks from its checkpoint, committing progress after each part.
+
+        A part is written to a temporary file and renamed into place before the
+        checkpoint moves, so a crash at any point resumes by rewriting the same part.
+        """
+        chunk_size = chunk_size or settings.FORM16_JOB_CHUNK_SIZE
+        job.status = Form16JobStatus.RUNNING
+        job.error = None
+        self._checkpoint(job)
+
+        try:
+            job_dir(job.id).mkdir(parents=True, exist_ok=True)
+            while True:
+                chunk = list(self.iter_certificates(
+                    job.financial_year, after_employee_id=job.last_employee_id or 0, limit=chunk_size
+                ))
+                if not chunk:
+                    break
+
+                part = (job.parts or 0) + 1
+                path = _part_path(job.id, part)
+                partial = path.with_suffix(".tmp")
+                with open(partial, "wb") as output:
+                    for data in iter_zip(render_certificates(chunk)):
+                        output.write(data)
+                os.replace(partial, path)
+
+                job.parts = part
+                job.last_employee_id = chunk[-1].employee_id
+                job.processed_employees = (job.processed_employees or 0) + len(chunk)
+                self._checkpoint(job)
+
+            job.status = Form16JobStatus.COMPLETED
+            job.completed_at = datetime.now()
+            self._checkpoint(job)
+        except Exception as e:
+            self.db.rollback()
+            job.status = Form16JobStatus.FAILED
+            job.error = str(e)
+            self._checkpoint(job)
+
+    def iter_job_archive(self, job: Form16Job) -> Iterator[bytes]:
+        """Merge the job's parts into one zip, streamed member by member."""
+        job_id, parts = job.id, job.parts or 0
+
+        def entries():
+            for part in range(1, parts + 1):
+                with zipfile.ZipFile(_part_path(job_id, part)) as archive:
+                    for name in archive.namelist():
+                        yield name, archive.read(name)
+
+        return iter_zip(entries())
+
+
+def run_form16_job(job_id: int):
+    """Background entry point; owns its session since the request's is closed by then."""
+    db = SessionLocal()
+    try:
+        service = Form16Service(db)
+        if service.claim_job(job_id):
+            service.run_job(service.get_job(job_id))
+    finally:
+        db.close()
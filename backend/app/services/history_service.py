@@ -0,0 +1,209 @@
+from sqlalchemy import and_, func, insert, select, union_all
+from sqlalchemy.orm import Session
+from app.core.audit import dumps_diff, row_values
+from app.core.config import settings
+from app.models.attendance import LeaveRequest
+from app.models.document import AuditLog, AuditSnapshot, Holiday
+from app.models.payroll import PayrollRecord
+from app.models.user import Department, Employee
+from app.services.audit_partitions import audit_partitions
+from app.services.document_service import AuditService
+from typing import List, NamedTuple, Optional
+from datetime import datetime
+import orjson
+
+# entity_type as written by record_audit -> model holding the entity's current row
+HISTORY_MODELS = {
+    "employee": Employee,
+    "department": Department,
+    "holiday": Holiday,
+    "payroll": PayrollRecord,
+    "leave_request": LeaveRequest,
+}
+SNAPSHOT_INSERT_BATCH = 500
+
+
+class EntityState(NamedTuple):
+    state: Optional[dict]  # None if the entity did not exist at that time
+    replayed: int  # audit events applied to reach it
+
+
+def _event_values(event: AuditLog) -> tuple:
+    """(before, after) values of the fields an event changed.
+
+    Soft deletes recorded before they wrote {"is_active": false} are read as
+    having done so.
+    """
+    before = orjson.loads(event.old_value) if event.old_value else {}
+    after = orjson.loads(event.new_value) if event.new_value else {}
+    if event.action == "delete":
+        before.setdefault("is_active", True)
+        after.setdefault("is_active", False)
+    return before, after
+
+
+def _row_state(row) -> dict:
+    # Through the audit encoder, so values compare equal to those replayed from diffs.
+    return orjson.loads(dumps_diff(row_values(row)))
+
+
+def _snapshot_state(snapshot: AuditSnapshot) -> Optional[dict]:
+    return orjson.loads(snapshot.state) if snapshot.state else None
+
+
+def _replay(state: Optional[dict], events: List[AuditLog]) -> Optional[dict]:
+    """`state` with each event's new values applied, oldest event first."""
+    for event in events:
+        _, after = _event_values(event)
+        state = dict(after) if event.action == "create" else {**(state or {}), **after}
+    return state
+
+
+def _undo(state: Optional[dict], events: List[AuditLog]) -> Optional[dict]:
+    """`state` with each event's old values restored, newest event first."""
+    for event in events:
+        before, _ = _event_values(event)
+        state = None if event.action == "create" else {**(state or {}), **before}
+    return state
+
+
+class HistoryService:
+    """State of an audited entity at any time, rebuilt from its audit events.
+
+    Forward replay starts from the newest snapshot taken before the requested
+    time, or from the create event, and applies each later event's new values.
+    Entities whose creation was never audited (payroll records, leave requests)
+    are rebuilt backwards instead: the current row with the old values of every
+    event after the requested time undone, and no state before the row's
+    created_at. Snapshots are written by
+    `take_snapshots` for entities with AUDIT_SNAPSHOT_EVERY events since their
+    last one, which bounds forward replays to that many events. History only
+    reaches as far back as the events still online (see AUDIT_ONLINE_MONTHS).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _model(self, entity_type: str):
+        model = HISTORY_MODELS.get(entity_type)
+        if model is None:
+            raise ValueError(f"No history for entity type '{entity_type}'")
+        return model
+
+    def state_at(self, entity_type: str, entity_id: int, at: Optional[datetime] = None) -> EntityState:
+        model = self._model(entity_type)
+        at = at or datetime.now()
+        snapshot = self.db.scalars(
+            select(AuditSnapshot)
+            .filter(
+                AuditSnapshot.entity_type == entity_type,
+                AuditSnapshot.entity_id == entity_id,
+                AuditSnapshot.taken_at <= at
+            )
+            .order_by(AuditSnapshot.taken_at.desc(), AuditSnapshot.audit_log_id.desc())
+            .limit(1)
+        ).first()
+        audit = AuditService(self.db)
+        if snapshot:
+            events = audit.get_entity_events(
+                entity_type, entity_id, after_id=snapshot.audit_log_id, start_date=snapshot.taken_at, end_date=at
+            )
+            return EntityState(_replay(_snapshot_state(snapshot), events), len(events))
+        events = audit.get_entity_events(entity_type, entity_id, end_date=at)
+        if events and events[0].action == "create":
+            return EntityState(_replay(None, events), len(events))
+        later = [
+            event for event in audit.get_entity_events(entity_type, entity_id, start_date=at, newest_first=True)
+            if event.created_at > at
+        ]
+        row = self.db.get(model, entity_id)
+        if row is None or (row.created_at and row.created_at > at):
+            return EntityState(None, 0)
+        return EntityState(_undo(_row_state(row), later), len(later))
+
+    def take_snapshots(self, min_events: Optional[int] = None) -> int:
+        """Snapshot entities with at least `min_events` events since their last snapshot; returns snapshots taken.
+
+        Each entity's new events are replayed once, with a snapshot after every
+        AUDIT_SNAPSHOT_EVERY of them, and one after the last event when at least
+        `min_events` (default AUDIT_SNAPSHOT_EVERY) follow the previous snapshot.
+        """
+        every = settings.AUDIT_SNAPSHOT_EVERY
+        min_events = min_events or every
+        events = union_all(*[
+            select(entity.id, entity.entity_type, entity.entity_id).filter(
+                entity.entity_type.in_(HISTORY_MODELS),
+                entity.entity_id.isnot(None)
+            )
+            for entity in audit_partitions.sources(self.db)
+        ]).subquery()
+        last = (
+            select(
+                AuditSnapshot.entity_type,
+                AuditSnapshot.entity_id,
+                func.max(AuditSnapshot.audit_log_id).label("audit_log_id")
+            )
+            .group_by(AuditSnapshot.entity_type, AuditSnapshot.entity_id)
+            .subquery()
+        )
+        due = self.db.execute(
+            select(events.c.entity_type, events.c.entity_id)
+            .outerjoin(last, and_(
+                last.c.entity_type == events.c.entity_type,
+                last.c.entity_id == events.c.entity_id
+            ))
+            .filter(events.c.id > func.coalesce(last.c.audit_log_id, 0))
+            .group_by(events.c.entity_type, events.c.entity_id)
+            .having(func.count() >= min_events)
+        ).all()
+
+        taken = 0
+        snapshots = []
+        for entity_type, entity_id in due:
+            snapshots += self._entity_snapshots(entity_type, entity_id, every, min_events)
+            if len(snapshots) >= SNAPSHOT_INSERT_BATCH:
+                taken += self._insert_snapshots(snapshots)
+                snapshots = []
+        if snapshots:
+            taken += self._insert_snapshots(snapshots)
+        return taken
+
+    def _insert_snapshots(self, snapshots: List[dict]) -> int:
+        self.db.execute(insert(AuditSnapshot), snapshots)
+        self.db.commit()
+        return len(snapshots)
+
+    def _entity_snapshots(self, entity_type: str, entity_id: int, every: int, min_events: int) -> List[dict]:
+        audit = AuditService(self.db)
+        last = self.db.scalars(
+            select(AuditSnapshot)
+            .filter(AuditSnapshot.entity_type == entity_type, AuditSnapshot.entity_id == entity_id)
+            .order_by(AuditSnapshot.audit_log_id.desc())
+            .limit(1)
+        ).first()
+        if last:
+            state = _snapshot_state(last)
+            events = audit.get_entity_events(entity_type, entity_id, after_id=last.audit_log_id, start_date=last.taken_at)
+        else:
+            events = audit.get_entity_events(entity_type, entity_id)
+            state = None
+            if events and events[0].action != "create":
+                # State before the first event: the current row with every event undone.
+                row = self.db.get(self._model(entity_type), entity_id)
+                state = _undo(_row_state(row) if row else None, events[::-1])
+
+        snapshots = []
+        since = 0
+        for position, event in enumerate(events, start=1):
+            state = _replay(state, [event])
+            since += 1
+            if since == every or (position == len(events) and since >= min_events):
+                snapshots.append({
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "audit_log_id": event.id,
+                    "taken_at": event.created_at,
+                    "state": orjson.dumps(state).decode() if state is not None else None
+                })
+                since = 0
+        return snapshots
@@ -0,0 +1,302 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.models.user import Department, Designation, Employee
+from app.core.audit import record_audit, row_values
+from app.schemas.user import EmployeeCreate
+from app.services.employee_service import EmployeeService
+from app.services.disbursement_service import IFSC_PATTERN
+from app.services.statutory_service import UAN_PATTERN
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from datetime import date, datetime
+import codecs
+import csv
+import re
+import zipfile
+
+IMPORT_FORMATS = ("csv", "xlsx")
+CHUNK_ROWS = 500
+MAX_REPORTED_ERRORS = 500
+
+PAN_PATTERN = re.compile(r"^[A-Z]{5}\d{4}[A-Z]$")
+
+# Header (normalised to snake_case) -> field; department and designation are given by name or code.
+IMPORT_COLUMNS = {field: field for field in EmployeeCreate.model_fields if field not in ("department_id", "designation_id")}
+IMPORT_COLUMNS.update({
+    "department": "department",
+    "department_name": "department",
+    "department_code": "department",
+    "designation": "designation",
+    "designation_name": "designation",
+    "designation_code": "designation",
+    "email_address": "email",
+    "mobile": "phone",
+    "pan": "pan_number",
+    "uan": "uan_number",
+    "ifsc": "ifsc_code",
+})
+UPPERCASE_FIELDS = ("pan_number", "ifsc_code")
+DATE_FIELDS = ("date_of_birth", "date_of_joining")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+
+Row = Tuple[int, Dict[str, object]]
+
+
+class RowError(NamedTuple):
+    row: int
+    email: Optional[str]
+    message: str
+
+
+class RowRange(NamedTuple):
+    first_row: int
+    last_row: int
+
+
+def _header_key(header) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(header or "").strip().lower()).strip("_")
+
+
+def _cell(value):
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store digit strings (phone, UAN, account numbers) as numbers.
+        return str(int(value))
+    if isinstance(value, (datetime, date)) or value is None:
+        return value
+    return str(value)
+
+
+def _parse_date(value):
+    if not isinstance(value, str):
+        return value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    return value  # left for EmployeeCreate to accept as ISO datetime or report
+
+
+def _map_header(headers: Iterable) -> List[Optional[str]]:
+    fields = [IMPORT_COLUMNS.get(_header_key(header)) for header in headers]
+    unknown = [str(header) for header, field in zip(headers, fields) if field is None and _header_key(header)]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    if "first_name" not in fields:
+        raise ValueError("The file must have a first_name column")
+    return fields
+
+
+def _rows(header: List[Optional[str]], values: Iterable[tuple], first_line: int) -> Iterator[Row]:
+    for line, row in enumerate(values, start=first_line):
+        record = {field: _cell(value) for field, value in zip(header, row) if field}
+        if any(value is not None for value in record.values()):
+            yield line, record
+
+
+def read_employee_rows(file: BinaryIO, file_format: str) -> Iterator[Row]:
+    """(line number, {field: value}) for each non-blank row of a CSV or XLSX upload, read lazily."""
+    if file_format == "csv":
+        reader = csv.reader(codecs.getreader("utf-8-sig")(file))
+        try:
+            header = _map_header(next(reader, []))
+            yield from _rows(header, reader, first_line=2)
+        except UnicodeDecodeError:
+            raise ValueError("CSV files must be UTF-8 encoded")
+    elif file_format == "xlsx":
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        # Read-only workbooks parse the sheet XML as rows are iterated.
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, KeyError, InvalidFileException):
+            raise ValueError("The file is not a valid XLSX workbook")
+        try:
+            values = workbook.active.iter_rows(values_only=True)
+            header = _map_header(next(values, ()))
+            yield from _rows(header, values, first_line=2)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+class EmployeeImport:
+    """Validates an employee file in chunks and inserts each chunk's valid rows in one batch.
+
+    Departments and designations are resolved from maps loaded once; emails are
+    checked against the file so far and, per chunk, against existing employees.
+    Each chunk is committed on its own with codes reserved as one block, so a
+    large file never holds a long transaction; the report lists the row ranges
+    committed and those rolled back because employees were created concurrently,
+    and the import carries on past a failed chunk. Every inserted employee gets
+    its own create audit event, as if added one by one. With `dry_run` nothing
+    is written and the report shows what an import would do. Only the first
+    `MAX_REPORTED_ERRORS` row errors are kept; `invalid_rows` is always complete.
+    """
+
+    def __init__(self, db: Session, user_id: Optional[int] = None, dry_run: bool = False):
+        self.db = db
+        self.user_id = user_id
+        self.dry_run = dry_run
+        self.total_rows = 0
+        self.valid_rows = 0
+        self.imported_rows = 0
+        self.invalid_rows = 0
+        self.failed_rows = 0
+        self.errors: List[RowError] = []
+        self.committed_ranges: List[RowRange] = []
+        self.failed_ranges: List[RowRange] = []
+        self.seen_emails = set()
+        self.departments: Dict[str, int] = {}
+        self.designations: Dict[Tuple[Optional[int], str], int] = {}
+
+    def run(self, rows: Iterable[Row]) -> dict:
+        self._load_lookups()
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= CHUNK_ROWS:
+                self._process(chunk)
+                chunk = []
+        if chunk:
+            self._process(chunk)
+        if not self.dry_run and self.imported_rows and self.user_id:
+            record_audit(self.db, self.user_id, "import", "employee", None, None, {
+                "total_rows": self.total_rows,
+                "imported_rows": self.imported_rows,
+                "invalid_rows": self.invalid_rows,
+                "failed_rows": self.failed_rows
+            })
+            self.db.commit()
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "total_rows": self.total_rows,
+            "valid_rows": self.valid_rows,
+            "imported_rows": self.imported_rows,
+            "invalid_rows": self.invalid_rows,
+            "failed_rows": self.failed_rows,
+            "committed_ranges": [rows._asdict() for rows in self.committed_ranges],
+            "failed_ranges": [rows._asdict() for rows in self.failed_ranges],
+            "errors": [error._asdict() for error in sorted(self.errors)],
+            "errors_truncated": self.invalid_rows > len(self.errors)
+        }
+
+    def _load_lookups(self):
+        for department in self.db.execute(select(Department.id, Department.name, Department.code)):
+            for key in (department.name, department.code):
+                if key:
+                    self.departments.setdefault(key.lower(), department.id)
+        for designation in self.db.execute(
+            select(Designation.id, Designation.name, Designation.code, Designation.department_id)
+        ):
+            for key in (designation.name, designation.code):
+                if key:
+                    self.designations.setdefault((designation.department_id, key.lower()), designation.id)
+                    self.designations.setdefault((None, key.lower()), designation.id)
+
+    def _reject(self, line: int, record: dict, problems: List[str]):
+        self.invalid_rows += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, record.get("email"), "; ".join(problems)))
+
+    def _validate(self, record: dict) -> Tuple[Optional[EmployeeCreate], List[str]]:
+        problems = []
+        # Blank cells take the schema defaults.
+        record = {field: value for field, value in record.items() if value is not None}
+        for field in UPPERCASE_FIELDS:
+            if field in record:
+                record[field] = record[field].upper()
+        for field in DATE_FIELDS:
+            if field in record:
+                record[field] = _parse_date(record[field])
+
+        department = record.pop("department", None)
+        if department:
+            record["department_id"] = self.departments.get(department.lower())
+            if record["department_id"] is None:
+                problems.append(f"Unknown department '{department}'")
+        designation = record.pop("designation", None)
+        if designation:
+            record["designation_id"] = self.designations.get(
+                (record.get("department_id"), designation.lower()),
+                self.designations.get((None, designation.lower()))
+            )
+            if record["designation_id"] is None:
+                problems.append(f"Unknown designation '{designation}'")
+
+        if record.get("pan_number") and not PAN_PATTERN.match(record["pan_number"]):
+            problems.append("PAN must be 5 letters, 4 digits and a letter")
+        if record.get("uan_number") and not UAN_PATTERN.match(record["uan_number"]):
+            problems.append("UAN must be 12 digits")
+        if record.get("ifsc_code") and not IFSC_PATTERN.match(record["ifsc_code"]):
+            problems.append("Invalid IFSC code")
+
+        try:
+            employee = EmployeeCreate(**record)
+        except ValidationError as e:
+            problems += [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            return None, problems
+        if employee.email:
+            email = employee.email.lower()
+            if email in self.seen_emails:
+                problems.append("Email appears more than once in the file")
+            self.seen_emails.add(email)
+        return employee, problems
+
+    def _process(self, chunk: List[Row]):
+        self.total_rows += len(chunk)
+        valid = []
+        for line, record in chunk:
+            employee, problems = self._validate(record)
+            if problems:
+                self._reject(line, record, problems)
+            else:
+                valid.append((line, record, employee))
+
+        emails = [employee.email.lower() for _, _, employee in valid if employee.email]
+        taken = {
+            email.lower() for email in self.db.scalars(
+                select(Employee.email).filter(func.lower(Employee.email).in_(emails))
+            )
+        } if emails else set()
+        accepted = []
+        for line, record, employee in valid:
+            if employee.email and employee.email.lower() in taken:
+                self._reject(line, record, ["An employee with this email already exists"])
+            else:
+                accepted.append(employee)
+
+        self.valid_rows += len(accepted)
+        if self.dry_run or not accepted:
+            return
+        rows = RowRange(chunk[0][0], chunk[-1][0])
+        codes = EmployeeService(self.db).reserve_employee_codes(len(accepted))
+        try:
+            created = self.db.scalars(insert(Employee).returning(Employee), [
+                {"employee_code": code, **employee.model_dump()} for code, employee in zip(codes, accepted)
+            ]).all()
+            if self.user_id:
+                for employee in created:
+                    record_audit(self.db, self.user_id, "create", "employee", employee.id, None, row_values(employee))
+            self.db.commit()
+        except IntegrityError:
+            # Earlier chunks stay committed; report this one and go on with the rest of the file.
+            self.db.rollback()
+            self.failed_rows += len(accepted)
+            self.failed_ranges.append(rows)
+            return
+        self.imported_rows += len(accepted)
+        last = self.committed_ranges[-1] if self.committed_ranges else None
+        if last and not (self.failed_ranges and self.failed_ranges[-1].first_row > last.last_row):
+            # No failed chunk since the last commit: report one range.
+            self.committed_ranges[-1] = RowRange(last.first_row, rows.last_row)
+        else:
+            self.committed_ranges.append(rows)
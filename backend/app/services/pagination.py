@@ -0,0 +1,84 @@
+from sqlalchemy import and_, or_, select, func
+from app.core.config import settings
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+import base64
+import binascii
+import json
+
+COUNT_MODES = ("exact", "estimate", "none")
+COUNT_MODE_PATTERN = "^(exact|estimate|none)$"
+
+
+class KeysetPage(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    has_more: bool
+    total: Optional[int] = None
+    total_is_exact: Optional[bool] = None
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    """Values of `keys` from the last row of the previous page; ValueError if the cursor is not one of ours."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for key, value in zip(keys, values):
+        python_type = key.type.python_type
+        try:
+            if python_type in (datetime, date) and isinstance(value, str):
+                value = python_type.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise TypeError
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def keyset_statement(stmt, keys: Sequence, cursor: Optional[str], limit: int, descending: bool = True):
+    """Page of `stmt` ordered by `keys` (descending unless told otherwise), starting after `cursor`.
+
+    `keys` must end with the primary key so the order is total. The filter is
+    spelled out as OR-ed prefixes rather than a row-value comparison so every
+    backend can walk an index on the same columns. Any ordering already on
+    `stmt` (such as search rank) is replaced, since pages must follow the keys.
+    One row beyond `limit` is fetched to tell whether another page follows.
+    """
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        stmt = stmt.filter(or_(*[
+            and_(*[keys[j] == values[j] for j in range(i)], keys[i] < values[i] if descending else keys[i] > values[i])
+            for i in range(len(keys))
+        ]))
+    return stmt.order_by(None).order_by(*[key.desc() if descending else key.asc() for key in keys]).limit(limit + 1)
+
+
+def total_statement(stmt, count: str):
+    """Count for a page header: exact, capped at PAGINATION_COUNT_CAP ("estimate"), or none."""
+    if count == "none":
+        return None
+    stmt = stmt.order_by(None)
+    if count == "estimate":
+        stmt = stmt.limit(settings.PAGINATION_COUNT_CAP + 1)
+    return select(func.count()).select_from(stmt.subquery())
+
+
+def keyset_page(rows: Sequence, keys: Sequence, limit: int, total: Optional[int] = None, count: str = "none") -> KeysetPage:
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    next_cursor = encode_cursor([getattr(rows[-1], key.key) for key in keys]) if has_more else None
+    if count == "none" or total is None:
+        return KeysetPage(rows, next_cursor, has_more)
+    if count == "estimate" and total > settings.PAGINATION_COUNT_CAP:
+        return KeysetPage(rows, next_cursor, has_more, settings.PAGINATION_COUNT_CAP, False)
+    return KeysetPage(rows, next_cursor, has_more, total, True)
@@ -1,13 +1,41 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
+from sqlalchemy.exc import IntegrityError
 from app.models.payroll import SalaryComponent, PayrollRecord, PayrollSettings, PayrollStatus
 from app.models.attendance import Attendance, AttendanceStatus
 from app.models.user import Employee
-from app.models.document import AuditLog
+from app.core.audit import record_audit
 from app.schemas.payroll import PayrollRecordCreate, PayrollSettingsBase
 from typing import Optional, List
 from datetime import datetime
-import json
+from app.services.pagination import KeysetPage, keyset_statement, keyset_page, total_statement
+
+
+PAYROLL_RECORD_KEYSET = (PayrollRecord.year, PayrollRecord.month, PayrollRecord.id)
+
+
+def payroll_record_list_statement(
+    employee_id: Optional[int] = None,
+    month: Optional[int] = None,
+    year: Optional[int] = None,
+    status: Optional[PayrollStatus] = None
+):
+    stmt = select(PayrollRecord)
+    
+    if employee_id:
+        stmt = stmt.filter(PayrollRecord.employee_id == employee_id)
+    
+    if month:
+        stmt = stmt.filter(PayrollRecord.month == month)
+    
+    if year:
+        stmt = stmt.filter(PayrollRecord.year == year)
+    
+    if status:
+        stmt = stmt.filter(PayrollRecord.status == status)
+    
+    return stmt
 
 
 class PayrollService:
@@ -15,21 +43,6 @@ class PayrollService:
         self.db = db
         self._settings = None
 
-    def _log_audit(self, user_id: int, action: str, entity_type: str, entity_id: int, old_value: dict = None, new_value: dict = None):
-        try:
-            audit_log = AuditLog(
-                user_id=user_id,
-                action=action,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                old_value=json.dumps(old_value) if old_value else None,
-                new_value=json.dumps(new_value) if new_value else None,
-            )
-            self.db.add(audit_log)
-            self.db.commit()
-        except Exception:
-            pass
-
     def _get_settings(self) -> PayrollSettings:
         if self._settings is None:
             self._settings = self.db.query(PayrollSettings).filter(PayrollSettings.is_active == True).first()
@@ -211,17 +224,15 @@ class PayrollService:
             employees = self.db.query(Employee).filter(Employee.id.in_(employee_ids)).all()
         
         payroll_records = []
+        processed = {
+            employee_id for (employee_id,) in self.db.query(PayrollRecord.employee_id).filter(
+                PayrollRecord.month == month,
+                PayrollRecord.year == year
+            )
+        }
         
         for employee in employees:
-            existing = self.db.query(PayrollRecord).filter(
-                and_(
-                    PayrollRecord.employee_id == employee.id,
-                    PayrollRecord.month == month,
-                    PayrollRecord.year == year
-                )
-            ).first()
-            
-            if existing:
+            if employee.id in processed:
                 continue
             
             payroll_data = self.calculate_payroll(employee.id, month, year)
@@ -232,7 +243,12 @@ class PayrollService:
             self.db.add(db_record)
             payroll_records.append(db_record)
         
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # (employee_id, year, month) is unique; another run got to some of these first.
+            self.db.rollback()
+            raise ValueError(f"Payroll for {month}/{year} is already being processed; retry once it finishes")
         
         for record in payroll_records:
             self.db.refresh(record)
@@ -251,22 +267,11 @@ class PayrollService:
         skip: int = 0,
         limit: int = 20
     ) -> tuple[List[PayrollRecord], int]:
-        query = self.db.query(PayrollRecord)
-        
-        if employee_id:
-            query = query.filter(PayrollRecord.employee_id == employee_id)
-        
-        if month:
-            query = query.filter(PayrollRecord.month == month)
-        
-        if year:
-            query = query.filter(PayrollRecord.year == year)
-        
-        if status:
-            query = query.filter(PayrollRecord.status == status)
-        
-        total = query.count()
-        records = query.order_by(PayrollRecord.year.desc(), PayrollRecord.month.desc()).offset(skip).limit(limit).all()
+        stmt = payroll_record_list_statement(employee_id, month, year, status)
+        total = self.db.scalar(select(func.count()).select_from(stmt.subquery()))
+        records = self.db.scalars(
+            stmt.order_by(PayrollRecord.year.desc(), PayrollRecord.month.desc()).offset(skip).limit(limit)
+        ).all()
         
         return records, total
 
@@ -296,11 +301,11 @@ class PayrollService:
         record.approved_by = approved_by
         record.approved_at = datetime.now()
         
+        record_audit(self.db, approved_by, "approve", "payroll", record_id, {"status": old_status}, {"status": "approved"})
+        
         self.db.commit()
         self.db.refresh(record)
         
-        self._log_audit(approved_by, "approve", "payroll", record_id, {"status": old_status}, {"status": "approved"})
-        
         return record
 
     def get_payroll_summary(self, month: int, year: int) -> dict:
@@ -344,3 +349,41 @@ class PayrollService:
         self.db.refresh(settings)
         
         return settings
+
+
+class AsyncPayrollService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_employee_payroll_records(
+        self,
+        employee_id: Optional[int] = None,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        status: Optional[PayrollStatus] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> tuple[List[PayrollRecord], int]:
+        stmt = payroll_record_list_statement(employee_id, month, year, status)
+        total = await self.db.scalar(select(func.count()).select_from(stmt.subquery()))
+        records = (await self.db.scalars(
+            stmt.order_by(PayrollRecord.year.desc(), PayrollRecord.month.desc()).offset(skip).limit(limit)
+        )).all()
+        
+        return records, total
+
+    async def get_employee_payroll_records_page(
+        self,
+        employee_id: Optional[int] = None,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        status: Optional[PayrollStatus] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        count: str = "estimate"
+    ) -> KeysetPage:
+        stmt = payroll_record_list_statement(employee_id, month, year, status)
+        records = (await self.db.scalars(keyset_statement(stmt, PAYROLL_RECORD_KEYSET, cursor, limit))).all()
+        total_stmt = total_statement(stmt, count)
+        total = await self.db.scalar(total_stmt) if total_stmt is not None else None
+        return keyset_page(records, PAYROLL_RECORD_KEYSET, limit, total, count)
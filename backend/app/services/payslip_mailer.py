@@ -0,0 +1,396 @@
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import settings
+from app.models.payroll import PayrollRecord, PayslipDelivery, PayslipDeliveryStatus
+from app.models.user import Employee
+from app.services.pdf_templates import get_template, PayslipTemplate
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from datetime import datetime
+import asyncio
+import random
+import threading
+
+import aiosmtplib
+
+PAGE_SIZE = 500
+RESULT_FLUSH_SIZE = 200
+
+
+class MailJob(NamedTuple):
+    record_id: int
+    recipient: str
+    message: EmailMessage
+
+
+class DeliveryResult(NamedTuple):
+    record_id: int
+    recipient: str
+    sent: bool
+    attempts: int
+    error: Optional[str] = None
+
+
+class _Connection:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    """A fixed number of persistent SMTP sessions, each reused for many messages.
+
+    A session is recycled after `messages_per_connection` messages and dropped
+    on any error, so the next caller reconnects instead of reusing a broken one.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = False,
+        use_tls: bool = False,
+        timeout: float = 30.0,
+        messages_per_connection: int = 200
+    ):
+        self.size = max(size, 1)
+        self.messages_per_connection = messages_per_connection
+        self._options = dict(
+            hostname=hostname, port=port, username=username, password=password,
+            start_tls=start_tls, use_tls=use_tls, timeout=timeout
+        )
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: List[_Connection] = []
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnectionPool":
+        return cls(
+            size=settings.PAYSLIP_MAIL_CONNECTIONS,
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            start_tls=settings.SMTP_START_TLS,
+            use_tls=settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT,
+            messages_per_connection=settings.PAYSLIP_MAIL_MESSAGES_PER_CONNECTION
+        )
+
+    async def _close(self, connection: _Connection):
+        try:
+            if connection.client.is_connected:
+                await connection.client.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            connection.client.close()
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            if connection is None or not connection.client.is_connected:
+                connection = _Connection(aiosmtplib.SMTP(**self._options))
+                await connection.client.connect()
+            try:
+                yield connection.client
+            except BaseException:
+                connection.client.close()
+                raise
+            connection.sent += 1
+            if connection.sent >= self.messages_per_connection:
+                await self._close(connection)
+            else:
+                self._idle.append(connection)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._close(connection)
+
+
+class RateLimiter:
+    """Spaces calls evenly at `rate` per second across all workers; 0 disables it."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _is_permanent(error: Exception) -> bool:
+    # 5xx replies will not succeed on retry; 4xx and connection errors may.
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+class PayslipDispatcher:
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        rate_per_second: float = 0,
+        max_retries: int = 3,
+        retry_backoff: float = 2.0
+    ):
+        self.pool = pool
+        self.limiter = RateLimiter(rate_per_second)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    @classmethod
+    def from_settings(cls) -> "PayslipDispatcher":
+        return cls(
+            SMTPConnectionPool.from_settings(),
+            rate_per_second=settings.PAYSLIP_MAIL_RATE_PER_SECOND,
+            max_retries=settings.PAYSLIP_MAIL_MAX_RETRIES,
+            retry_backoff=settings.PAYSLIP_MAIL_RETRY_BACKOFF
+        )
+
+    async def deliver(self, job: MailJob) -> DeliveryResult:
+        attempts = self.max_retries + 1
+        for attempt in range(1, attempts + 1):
+            await self.limiter.wait()
+            try:
+                async with self.pool.connection() as client:
+                    await client.send_message(job.message)
+                return DeliveryResult(job.record_id, job.recipient, True, attempt)
+            except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+                if _is_permanent(e) or attempt == attempts:
+                    return DeliveryResult(job.record_id, job.recipient, False, attempt, error)
+            # Exponential backoff with jitter so retries from all workers don't line up.
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    async def run(self, jobs: Iterable[MailJob], on_result: Callable[[DeliveryResult], None]):
+        """Send `jobs` with one worker per pooled connection.
+
+        The queue is bounded, so at most a few messages per worker are held in
+        memory while `jobs` is still being produced. `jobs` is advanced on one
+        separate thread, so rendering and queries behind it never stall the
+        SMTP workers on the event loop.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.pool.size * 4)
+        loop = asyncio.get_running_loop()
+        jobs = iter(jobs)
+        producer = ThreadPoolExecutor(max_workers=1)
+
+        async def worker():
+            while True:
+                job = await queue.get()
+                if job is None:
+                    break
+                try:
+                    result = await self.deliver(job)
+                except Exception as e:
+                    # Fail this job only: a worker that died would leave the producer blocked on a full queue.
+                    result = DeliveryResult(job.record_id, job.recipient, False, 1, f"{type(e).__name__}: {e}")
+                on_result(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.pool.size)]
+        try:
+            while (job := await loop.run_in_executor(producer, next, jobs, None)) is not None:
+                await queue.put(job)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            producer.shutdown(wait=True)
+            await self.pool.close()
+
+
+def build_payslip_message(record: PayrollRecord, employee: Employee, pdf: bytes) -> EmailMessage:
+    period = datetime(record.year, record.month, 1).strftime('%B %Y')
+
+    msg = EmailMessage()
+    msg['From'] = settings.SMTP_FROM
+    msg['To'] = employee.email
+    msg['Subject'] = f"Payslip for {period}"
+    msg.set_content(f"""Dear {employee.first_name},
+
+Please find attached your payslip for {period}.
+
+Net Salary: ₹{record.net_salary:,.2f}
+
+Login to PayrollEdge Platform to view detailed payslip.
+
+Best regards,
+HR Team
+PayrollEdge Platform""")
+    msg.add_attachment(
+        pdf, maintype="application", subtype="pdf",
+        filename=f"payslip_{employee.employee_code}_{record.month}_{record.year}.pdf"
+    )
+    return msg
+
+
+class PayslipMailService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def pending_records(self, month: int, year: int, record_ids: Optional[List[int]] = None):
+        """Approved or paid records with a recipient and no successful delivery yet.
+
+        Explicitly requested records are returned even if already sent, so they can be resent.
+        """
+        query = self.db.query(PayrollRecord).join(
+            Employee, Employee.id == PayrollRecord.employee_id
+        ).options(
+            joinedload(PayrollRecord.employee).joinedload(Employee.department),
+            joinedload(PayrollRecord.employee).joinedload(Employee.designation)
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            PayrollRecord.status.in_(['approved', 'paid']),
+            Employee.email.isnot(None),
+            Employee.email != ''
+        )
+        if record_ids:
+            query = query.filter(PayrollRecord.id.in_(record_ids))
+        else:
+            query = query.outerjoin(
+                PayslipDelivery, PayslipDelivery.payroll_record_id == PayrollRecord.id
+            ).filter(
+                (PayslipDelivery.id.is_(None)) | (PayslipDelivery.status != PayslipDeliveryStatus.SENT)
+            )
+        return query.order_by(PayrollRecord.id)
+
+    def jobs(self, month: int, year: int, record_ids: Optional[List[int]] = None) -> Iterator[MailJob]:
+        # Keyset pages rather than one open cursor, since results are committed
+        # on the same session while the stream is still being consumed.
+        template = get_template(PayslipTemplate)
+        last_id = 0
+        while True:
+            page = self.pending_records(month, year, record_ids).filter(
+                PayrollRecord.id > last_id
+            ).limit(PAGE_SIZE).all()
+            if not page:
+                break
+            for record in page:
+                employee = record.employee
+                pdf = template.render_payslip(record, employee)
+                yield MailJob(record.id, employee.email, build_payslip_message(record, employee, pdf))
+            last_id = page[-1].id
+
+    def save_results(self, results: List[DeliveryResult]):
+        if not results:
+            return
+        existing = {
+            delivery.payroll_record_id: delivery
+            for delivery in self.db.query(PayslipDelivery).filter(
+                PayslipDelivery.payroll_record_id.in_([r.record_id for r in results])
+            )
+        }
+        now = datetime.now()
+        for result in results:
+            delivery = existing.get(result.record_id)
+            if delivery is None:
+                delivery = PayslipDelivery(payroll_record_id=result.record_id, attempts=0)
+                self.db.add(delivery)
+            delivery.email = result.recipient
+            delivery.attempts = (delivery.attempts or 0) + result.attempts
+            delivery.status = PayslipDeliveryStatus.SENT if result.sent else PayslipDeliveryStatus.FAILED
+            delivery.last_error = result.error
+            if result.sent:
+                delivery.sent_at = now
+        self.db.commit()
+
+    def dispatch(
+        self,
+        month: int,
+        year: int,
+        record_ids: Optional[List[int]] = None,
+        dispatcher: Optional[PayslipDispatcher] = None
+    ) -> Dict[str, int]:
+        """Send every pending payslip for the period and persist each record's outcome."""
+        dispatcher = dispatcher or PayslipDispatcher.from_settings()
+        counts = {"sent": 0, "failed": 0}
+        buffered: List[DeliveryResult] = []
+        lock = threading.Lock()
+
+        def on_result(result: DeliveryResult):
+            counts["sent" if result.sent else "failed"] += 1
+            with lock:
+                buffered.append(result)
+
+        def flush():
+            with lock:
+                results = buffered[:]
+                buffered.clear()
+            self.save_results(results)
+
+        def jobs() -> Iterator[MailJob]:
+            # Results are saved from the producer thread, between jobs, so the
+            # session is only ever used by one thread at a time.
+            for job in self.jobs(month, year, record_ids):
+                if len(buffered) >= RESULT_FLUSH_SIZE:
+                    flush()
+                yield job
+
+        try:
+            asyncio.run(dispatcher.run(jobs(), on_result))
+        finally:
+            flush()
+        return counts
+
+    def delivery_summary(self, month: int, year: int, failures_limit: int = 100) -> dict:
+        from sqlalchemy import func
+
+        counts = dict(self.db.query(
+            PayslipDelivery.status, func.count(PayslipDelivery.id)
+        ).join(
+            PayrollRecord, PayrollRecord.id == PayslipDelivery.payroll_record_id
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year
+        ).group_by(PayslipDelivery.status).all())
+
+        failures = self.db.query(PayslipDelivery).join(
+            PayrollRecord, PayrollRecord.id == PayslipDelivery.payroll_record_id
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            PayslipDelivery.status == PayslipDeliveryStatus.FAILED
+        ).order_by(PayslipDelivery.payroll_record_id).limit(failures_limit).all()
+
+        return {
+            "month": month,
+            "year": year,
+            "sent": counts.get(PayslipDeliveryStatus.SENT, 0),
+            "failed": counts.get(PayslipDeliveryStatus.FAILED, 0),
+            "failures": [
+                {
+                    "record_id": d.payroll_record_id,
+                    "email": d.email,
+                    "attempts": d.attempts,
+                    "error": d.last_error
+                }
+                for d in failures
+            ]
+        }
+
+
+def run_payslip_dispatch(month: int, year: int):
+    """Background entry point; owns its session since the request's is closed by then."""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        PayslipMailService(db).dispatch(month, year)
+    finally:
+        db.close()
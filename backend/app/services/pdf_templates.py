@@ -0,0 +1,396 @@
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from io import BytesIO
+from datetime import datetime
+from typing import Optional, List, Dict
+import reportlab
+import threading
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 30
+CELL_PADDING = 6
+
+FINANCIAL_YEAR_MONTHS = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
+
+
+def _check_canvas_code():
+    """Refuse to start on a reportlab whose Canvas no longer keeps `_code`.
+
+    `CanvasTemplate` captures the page operators a canvas emits from its
+    private `_code` list, so requirements.txt pins reportlab exactly; this
+    turns a silent change in an upgrade into an import error.
+    """
+    scratch = canvas.Canvas(BytesIO(), pagesize=A4)
+    code = getattr(scratch, "_code", None)
+    if isinstance(code, list):
+        mark = len(code)
+        scratch.rect(0, 0, 1, 1)
+        if len(code) > mark and all(isinstance(op, str) for op in code[mark:]):
+            return
+    raise RuntimeError(
+        f"reportlab {reportlab.Version}: Canvas._code is not a list of PDF operators; "
+        "CanvasTemplate needs the version pinned in requirements.txt"
+    )
+
+
+_check_canvas_code()
+
+
+class Slot:
+    """Placeholder for a per-document value inside a template table."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class CanvasTemplate:
+    """Page layout measured once and replayed onto a fresh canvas for every document.
+
+    Subclasses describe the page in `build()` using the layout helpers. Static text,
+    rules and fills become drawing ops; `Slot` cells become fixed positions that
+    `render()` fills with per-document values.
+    """
+
+    def __init__(self):
+        self._ops: List[tuple] = []
+        self._slots: Dict[str, tuple] = {}
+        self._cursor = PAGE_HEIGHT - MARGIN
+        self.build()
+        self._compile()
+
+    def build(self):
+        raise NotImplementedError
+
+    def _space(self, height: float):
+        self._cursor -= height
+
+    def _text(self, text: str, font: str = "Helvetica", size: float = 10, leading: Optional[float] = None):
+        leading = leading or size * 1.2
+        for line in simpleSplit(text, font, size, PAGE_WIDTH - 2 * MARGIN):
+            self._cursor -= leading
+            self._ops.append(("text", font, size, MARGIN, self._cursor + (leading - size), line, "left"))
+
+    def _slot_line(self, name: str, font: str = "Helvetica", size: float = 10, leading: Optional[float] = None):
+        leading = leading or size * 1.2
+        self._cursor -= leading
+        self._slots[name] = (font, size, MARGIN, self._cursor + (leading - size), "left")
+
+    def _table(
+        self,
+        rows: list,
+        col_widths: List[float],
+        font: str = "Helvetica",
+        size: float = 9,
+        bold_font: str = "Helvetica-Bold",
+        bold_cols: tuple = (),
+        bold_rows: tuple = (),
+        right_cols: tuple = (),
+        grid: Optional[tuple] = None,
+        row_backgrounds: Optional[dict] = None,
+    ):
+        row_height = size * 1.2 + CELL_PADDING
+        table_width = sum(col_widths)
+        x0 = (PAGE_WIDTH - table_width) / 2
+        top = self._cursor
+        n_rows = len(rows)
+
+        for row_index, color in (row_backgrounds or {}).items():
+            row_index = row_index % n_rows
+            y = top - (row_index + 1) * row_height
+            self._ops.append(("fill", color, x0, y, table_width, row_height))
+
+        if grid:
+            width, color = grid
+            segments = []
+            bottom = top - n_rows * row_height
+            for i in range(n_rows + 1):
+                y = top - i * row_height
+                segments.append((x0, y, x0 + table_width, y))
+            x = x0
+            for w in col_widths + [0]:
+                segments.append((x, top, x, bottom))
+                x += w
+            self._ops.append(("lines", color, width, segments))
+
+        bold_rows = tuple(r % n_rows for r in bold_rows)
+        for r, row in enumerate(rows):
+            baseline = top - r * row_height - CELL_PADDING / 2 - size
+            x = x0
+            for c, cell in enumerate(row):
+                cell_font = bold_font if (c in bold_cols or r in bold_rows) else font
+                if c in right_cols:
+                    cx, align = x + col_widths[c] - CELL_PADDING, "right"
+                else:
+                    cx, align = x + CELL_PADDING, "left"
+                if isinstance(cell, Slot):
+                    self._slots[cell.name] = (cell_font, size, cx, baseline, align)
+                elif cell:
+                    self._ops.append(("text", cell_font, size, cx, baseline, cell, align))
+                x += col_widths[c]
+
+        self._cursor = top - n_rows * row_height
+
+    def _replay(self, c: canvas.Canvas):
+        for op in self._ops:
+            kind = op[0]
+            if kind == "text":
+                _, font, size, x, y, text, align = op
+                c.setFont(font, size)
+                if align == "right":
+                    c.drawRightString(x, y, text)
+                else:
+                    c.drawString(x, y, text)
+            elif kind == "fill":
+                _, color, x, y, w, h = op
+                c.setFillColor(color)
+                c.rect(x, y, w, h, stroke=0, fill=1)
+                c.setFillColor(colors.black)
+            elif kind == "lines":
+                _, color, width, segments = op
+                c.setStrokeColor(color)
+                c.setLineWidth(width)
+                c.lines(segments)
+
+    def _compile(self):
+        # Draw the static layer once on a scratch canvas and keep the emitted PDF
+        # operators; every document then gets them with a single addLiteral().
+        scratch = canvas.Canvas(BytesIO(), pagesize=A4)
+        mark = len(scratch._code)
+        self._replay(scratch)
+        self._static_code = "\n".join(scratch._code[mark:])
+        fonts = []
+        for op in self._ops:
+            if op[0] == "text" and op[1] not in fonts:
+                fonts.append(op[1])
+        for font, *_ in self._slots.values():
+            if font not in fonts:
+                fonts.append(font)
+        self._fonts = fonts
+
+    def render(self, values: Dict[str, str]) -> bytes:
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4)
+        # Register fonts in the scratch canvas' order so the compiled operators
+        # resolve to the same internal font names.
+        for font in self._fonts:
+            c.setFont(font, 10)
+        c.addLiteral(self._static_code)
+
+        text = c.beginText()
+        for name, value in values.items():
+            slot = self._slots.get(name)
+            if slot is None or value is None:
+                continue
+            font, size, x, y, align = slot
+            if align == "right":
+                x -= stringWidth(value, font, size)
+            text.setFont(font, size)
+            text.setTextOrigin(x, y)
+            text.textOut(value)
+        c.drawText(text)
+        c.showPage()
+        c.save()
+        return buffer.getvalue()
+
+
+def _money(value) -> str:
+    return f"{(value or 0):,.2f}"
+
+
+class PayslipTemplate(CanvasTemplate):
+    def build(self):
+        self._text("PayrollEdge Platform", font="Helvetica-Bold", size=16)
+        self._space(10)
+        self._slot_line("period_title")
+        self._space(10)
+
+        self._table(
+            [
+                ["Employee Code:", Slot("employee_code"), "Name:", Slot("employee_name")],
+                ["Department:", Slot("department"), "Designation:", Slot("designation")],
+                ["UAN Number:", Slot("uan_number"), "ESI Number:", Slot("esic_number")],
+            ],
+            [1.5 * inch, 2 * inch, 1.5 * inch, 2 * inch],
+            bold_cols=(0, 2),
+        )
+        self._space(15)
+
+        self._table(
+            [
+                ["Earnings", "Amount (₹)", "Deductions", "Amount (₹)"],
+                ["Basic Salary", Slot("basic_salary"), "PF (Employee)", Slot("pf_employee")],
+                ["HRA", Slot("hra"), "ESIC (Employee)", Slot("esic_employee")],
+                ["Conveyance", Slot("conveyance"), "Professional Tax", Slot("professional_tax")],
+                ["Special Allowance", Slot("special_allowance"), "TDS", Slot("tds")],
+                ["Overtime", Slot("overtime_amount"), "Other Deductions", Slot("other_deductions")],
+                ["Bonus", Slot("bonus"), "", ""],
+                ["Arrears", Slot("arrears"), "", ""],
+            ],
+            [2.5 * inch, 1.5 * inch, 2.5 * inch, 1.5 * inch],
+            bold_rows=(0,),
+            right_cols=(1, 3),
+            grid=(0.5, colors.grey),
+            row_backgrounds={0: colors.lightgrey},
+        )
+        self._space(15)
+
+        self._table(
+            [
+                ["Gross Earnings", Slot("gross_earnings")],
+                ["Total Deductions", Slot("total_deductions")],
+                ["Net Salary", Slot("net_salary")],
+            ],
+            [3 * inch, 2 * inch],
+            font="Helvetica-Bold",
+            size=10,
+            right_cols=(1,),
+            grid=(0.5, colors.black),
+            row_backgrounds={-1: colors.lightgrey},
+        )
+        self._space(20)
+
+        self._text("Attendance Details", font="Helvetica-Bold", size=12)
+        self._space(5)
+        self._table(
+            [
+                ["Working Days", Slot("working_days")],
+                ["Days Present", Slot("days_present")],
+                ["Days Absent", Slot("days_absent")],
+                ["Overtime Hours", Slot("overtime_hours")],
+            ],
+            [2 * inch, 1.5 * inch],
+            bold_cols=(0,),
+            grid=(0.5, colors.grey),
+        )
+        self._space(20)
+
+        self._text("Statutory Contributions", font="Helvetica-Bold", size=12)
+        self._space(5)
+        self._table(
+            [["PF (Employer)", Slot("pf_employer"), "ESIC (Employer)", Slot("esic_employer")]],
+            [2.5 * inch, 1.5 * inch, 2.5 * inch, 1.5 * inch],
+            right_cols=(1, 3),
+            grid=(0.5, colors.grey),
+        )
+        self._space(30)
+
+        self._slot_line("generated_on")
+
+    def render_payslip(self, record, employee, generated_at: Optional[datetime] = None) -> bytes:
+        generated_at = generated_at or datetime.now()
+        return self.render({
+            "period_title": f"Payslip for {datetime(record.year, record.month, 1).strftime('%B %Y')}",
+            "employee_code": employee.employee_code or '-',
+            "employee_name": f"{employee.first_name} {employee.last_name or ''}",
+            "department": employee.department.name if employee.department else '-',
+            "designation": employee.designation.name if employee.designation else '-',
+            "uan_number": employee.uan_number or '-',
+            "esic_number": employee.esic_number or '-',
+            "basic_salary": _money(record.basic_salary),
+            "hra": _money(record.hra),
+            "conveyance": _money(record.conveyance),
+            "special_allowance": _money(record.special_allowance),
+            "overtime_amount": _money(record.overtime_amount),
+            "bonus": _money(record.bonus),
+            "arrears": _money(record.arrears),
+            "pf_employee": _money(record.pf_employee),
+            "esic_employee": _money(record.esic_employee),
+            "professional_tax": _money(record.professional_tax),
+            "tds": _money(record.tds),
+            "other_deductions": _money(record.other_deductions),
+            "gross_earnings": f"₹{_money(record.gross_earnings)}",
+            "total_deductions": f"₹{_money(record.total_deductions)}",
+            "net_salary": f"₹{_money(record.net_salary)}",
+            "working_days": str(int(record.working_days or 0)),
+            "days_present": str(int(record.days_present or 0)),
+            "days_absent": str(int(record.days_absent or 0)),
+            "overtime_hours": f"{record.overtime_hours}",
+            "pf_employer": f"₹{_money(record.pf_employer)}",
+            "esic_employer": f"₹{_money(record.esic_employer)}",
+            "generated_on": f"Generated on: {generated_at.strftime('%d-%m-%Y %H:%M:%S')}",
+        })
+
+
+class Form16Template(CanvasTemplate):
+    def build(self):
+        self._text("FORM 16", font="Helvetica-Bold", size=18)
+        self._space(6)
+        self._text("Certificate under Section 203 of the Income-tax Act, 1961 for tax deducted at source")
+        self._space(20)
+
+        self._table(
+            [
+                ["Employer Name:", "PayrollEdge Platform"],
+                ["Employer Address:", "Jeedimetla, Hyderabad - 500055"],
+                ["Employee Name:", Slot("employee_name")],
+                ["Employee PAN:", Slot("pan_number")],
+                ["Employee Designation:", Slot("designation")],
+                ["Financial Year:", Slot("financial_year")],
+            ],
+            [2 * inch, 4 * inch],
+            size=10,
+            bold_cols=(0,),
+        )
+        self._space(20)
+
+        month_rows = [
+            [datetime(2000, month, 1).strftime('%b'), Slot(f"gross_{month}"), Slot(f"tds_{month}"), Slot(f"pf_{month}")]
+            for month in FINANCIAL_YEAR_MONTHS
+        ]
+        self._table(
+            [["Month", "Gross Salary (₹)", "TDS (₹)", "PF (₹)"]]
+            + month_rows
+            + [["Total", Slot("total_gross"), Slot("total_tds"), Slot("total_pf")]],
+            [2 * inch, 2 * inch, 2 * inch, 2 * inch],
+            bold_rows=(0, -1),
+            right_cols=(1, 2, 3),
+            grid=(0.5, colors.grey),
+            row_backgrounds={0: colors.lightgrey},
+        )
+        self._space(30)
+
+        self._text("This is a computer-generated certificate.")
+        self._slot_line("generated_on")
+
+    def render_form16(self, certificate, generated_at: Optional[datetime] = None) -> bytes:
+        """Render a certificate whose `monthly` maps month -> (gross, tds, pf)."""
+        generated_at = generated_at or datetime.now()
+        year = certificate.financial_year
+        values = {
+            "employee_name": certificate.employee_name,
+            "pan_number": certificate.pan_number or 'N/A',
+            "designation": certificate.designation or 'N/A',
+            "financial_year": f"{year}-{year + 1}",
+            "generated_on": f"Generated on: {generated_at.strftime('%d-%m-%Y %H:%M:%S')}",
+        }
+        total_gross = total_tds = total_pf = 0.0
+        for month, (gross, tds, pf) in certificate.monthly.items():
+            values[f"gross_{month}"] = _money(gross)
+            values[f"tds_{month}"] = _money(tds)
+            values[f"pf_{month}"] = _money(pf)
+            total_gross += gross or 0
+            total_tds += tds or 0
+            total_pf += pf or 0
+        values["total_gross"] = _money(total_gross)
+        values["total_tds"] = _money(total_tds)
+        values["total_pf"] = _money(total_pf)
+        return self.render(values)
+
+
+_templates: Dict[type, CanvasTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(template_class: type) -> CanvasTemplate:
+    template = _templates.get(template_class)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(template_class)
+            if template is None:
+                template = template_class()
+                _templates[template_class] = template
+    return template
@@ -0,0 +1,149 @@
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, case
+from app.models.payroll import PayrollRecord
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.user import Employee
+from typing import Optional, Iterator
+from datetime import datetime
+
+YIELD_PER = 1000
+
+
+def _month_range(month: int, year: int) -> tuple[datetime, datetime]:
+    start_date = datetime(year, month, 1)
+    if month == 12:
+        end_date = datetime(year + 1, 1, 1)
+    else:
+        end_date = datetime(year, month + 1, 1)
+    return start_date, end_date
+
+
+def _full_name(employee: Employee) -> str:
+    return f"{employee.first_name} {employee.last_name or ''}"
+
+
+class ReportService:
+    """Report data access. Every report runs a fixed number of queries regardless of row count."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_payslip_record(self, record_id: int) -> Optional[PayrollRecord]:
+        return self.db.query(PayrollRecord).options(
+            joinedload(PayrollRecord.employee).joinedload(Employee.department),
+            joinedload(PayrollRecord.employee).joinedload(Employee.designation)
+        ).filter(PayrollRecord.id == record_id).first()
+
+    def _records_with_employees(self, month: int, year: int, *criteria):
+        return self.db.query(PayrollRecord, Employee).join(
+            Employee, Employee.id == PayrollRecord.employee_id
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            *criteria
+        ).order_by(PayrollRecord.id)
+
+    def attendance_report_rows(self, month: int, year: int, department_id: Optional[int] = None) -> Iterator[dict]:
+        start_date, end_date = _month_range(month, year)
+
+        def count_status(status: AttendanceStatus):
+            return func.sum(case((Attendance.status == status, 1), else_=0))
+
+        totals = self.db.query(
+            Attendance.employee_id.label("employee_id"),
+            count_status(AttendanceStatus.PRESENT).label("present"),
+            count_status(AttendanceStatus.ABSENT).label("absent"),
+            count_status(AttendanceStatus.LATE).label("late"),
+            count_status(AttendanceStatus.HALF_DAY).label("half_day"),
+            count_status(AttendanceStatus.LEAVE).label("leaves"),
+            func.count(Attendance.id).label("total_days"),
+            func.sum(Attendance.overtime_hours).label("overtime_hours")
+        ).filter(
+            Attendance.date >= start_date,
+            Attendance.date < end_date
+        ).group_by(Attendance.employee_id).subquery()
+
+        query = self.db.query(Employee, totals).outerjoin(
+            totals, totals.c.employee_id == Employee.id
+        ).options(
+            joinedload(Employee.department)
+        ).filter(Employee.is_active == True)
+
+        if department_id:
+            query = query.filter(Employee.department_id == department_id)
+
+        for row in query.order_by(Employee.id).yield_per(YIELD_PER):
+            emp = row.Employee
+            yield {
+                "employee_code": emp.employee_code,
+                "employee_name": _full_name(emp),
+                "department": emp.department.name if emp.department else '-',
+                "present": row.present or 0,
+                "absent": row.absent or 0,
+                "late": row.late or 0,
+                "half_day": row.half_day or 0,
+                "leaves": row.leaves or 0,
+                "total_days": row.total_days or 0,
+                "overtime_hours": row.overtime_hours or 0
+            }
+
+    def payroll_register_rows(self, month: int, year: int) -> Iterator[dict]:
+        query = self._records_with_employees(month, year).options(joinedload(Employee.department))
+
+        for record, employee in query.yield_per(YIELD_PER):
+            yield {
+                "employee_code": employee.employee_code,
+                "employee_name": _full_name(employee),
+                "department": employee.department.name if employee.department else '-',
+                "basic_salary": record.basic_salary,
+                "gross_earnings": record.gross_earnings,
+                "pf_employee": record.pf_employee,
+                "pf_employer": record.pf_employer,
+                "esic_employee": record.esic_employee,
+                "esic_employer": record.esic_employer,
+                "professional_tax": record.professional_tax,
+                "tds": record.tds,
+                "total_deductions": record.total_deductions,
+                "net_salary": record.net_salary,
+                "status": record.status
+            }
+
+    def pf_rows(self, month: int, year: int) -> Iterator[dict]:
+        query = self._records_with_employees(
+            month, year, Employee.uan_number.isnot(None), Employee.uan_number != ''
+        )
+        for record, employee in query.yield_per(YIELD_PER):
+            yield {
+                "uan": employee.uan_number,
+                "name": _full_name(employee),
+                "wages": record.basic_salary,
+                "epf": record.pf_employee,
+                "eps": record.pf_employer,
+                "refund": 0
+            }
+
+    def esic_rows(self, month: int, year: int) -> Iterator[dict]:
+        query = self._records_with_employees(
+            month, year, Employee.esic_number.isnot(None), Employee.esic_number != ''
+        )
+        for record, employee in query.yield_per(YIELD_PER):
+            yield {
+                "ip_number": employee.esic_number,
+                "name": _full_name(employee),
+                "wages": record.gross_earnings,
+                "employee_contribution": record.esic_employee,
+                "employer_contribution": record.esic_employer
+            }
+
+    def payslip_recipient_counts(self, month: int, year: int) -> tuple[int, int]:
+        total, with_email = self.db.query(
+            func.count(PayrollRecord.id),
+            func.count(case((Employee.email != '', Employee.email)))
+        ).join(
+            Employee, Employee.id == PayrollRecord.employee_id, isouter=True
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            PayrollRecord.status.in_(['approved', 'paid'])
+        ).one()
+        return total, with_email
@@ -0,0 +1,159 @@
+from sqlalchemy import column, func, literal, select, table, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import engine
+from app.models.search import EMPLOYEE_SEARCH_TABLE, EMPLOYEE_SEARCH_VOCAB
+from app.models.user import Employee
+from typing import List, NamedTuple, Optional
+import re
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+MAX_QUERY_WORDS = 8
+MAX_NEAR_TERMS = 8
+
+
+class SearchQuery(NamedTuple):
+    term: str
+    # Backend query built from `term`; None searches with ILIKE
+    match: Optional[str] = None
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein distance (adjacent transpositions), or `limit + 1` once it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+    return current[-1]
+
+
+class EmployeeSearch:
+    """ILIKE over name, email, code and phone: the fallback for backends without an index."""
+
+    def prepare(self, db: Session, term: str) -> SearchQuery:
+        return SearchQuery(term)
+
+    def hits(self, query: SearchQuery):
+        """Subquery of (employee_id, score) for every match of `query`; None when not ranked.
+
+        Not capped: the caller's filters and count must see every match, and
+        only the page it selects is limited.
+        """
+        return None
+
+    def filter(self, stmt, query: SearchQuery):
+        """Restrict an `Employee` select to `query`, ordered by rank where the backend has one."""
+        hits = self.hits(query) if query.match else None
+        if hits is None:
+            pattern = f"%{query.term}%"
+            return stmt.filter(
+                Employee.first_name.ilike(pattern)
+                | Employee.last_name.ilike(pattern)
+                | Employee.email.ilike(pattern)
+                | Employee.employee_code.ilike(pattern)
+                | Employee.phone.ilike(pattern)
+            )
+        return stmt.join(hits, hits.c.employee_id == Employee.id).order_by(hits.c.score.desc())
+
+
+class SqliteEmployeeSearch(EmployeeSearch):
+    """FTS5 index ranked by bm25, name weighted highest.
+
+    Every word is a prefix query, so partial input matches as the user types;
+    all words must match.
+    A word of SEARCH_FUZZY_MIN_LENGTH or more that is not the prefix of any
+    indexed term is widened to the indexed words within one edit (two for
+    words of seven or more letters) that share its first letter. Codes and
+    numbers are matched by prefix only.
+    """
+
+    def prepare(self, db: Session, term: str) -> SearchQuery:
+        words = WORD_PATTERN.findall(term.lower())[:MAX_QUERY_WORDS]
+        if not words:
+            return SearchQuery(term)
+        return SearchQuery(term, " AND ".join(self._expand(db, word) for word in words))
+
+    def _expand(self, db: Session, word: str) -> str:
+        # The exact word is OR-ed in beside the prefix so that whole-word hits score higher.
+        terms = [f'"{word}"', f'"{word}"*']
+        if len(word) >= settings.SEARCH_FUZZY_MIN_LENGTH and word.isalpha() and not self._has_prefix(db, word):
+            terms += [f'"{term}"' for term in self._near_terms(db, word)]
+        return f"({' OR '.join(terms)})"
+
+    def _has_prefix(self, db: Session, word: str) -> bool:
+        return db.execute(
+            text(f"SELECT 1 FROM {EMPLOYEE_SEARCH_VOCAB} WHERE term >= :low AND term < :high LIMIT 1"),
+            {"low": word, "high": word + "\U0010ffff"}
+        ).first() is not None
+
+    def _near_terms(self, db: Session, word: str) -> List[str]:
+        limit = 1 if len(word) < 7 else 2
+        rows = db.execute(
+            text(
+                f"SELECT term, doc FROM {EMPLOYEE_SEARCH_VOCAB} "
+                "WHERE term >= :low AND term < :high AND length(term) >= :min_length "
+                "AND term NOT GLOB '*[0-9]*'"
+            ),
+            {"low": word[0], "high": word[0] + "\U0010ffff", "min_length": len(word) - limit}
+        )
+        scored = []
+        for term, doc in rows:
+            # Compare against the term's leading letters too, so a typo in a half-typed word still matches.
+            distance = min(
+                edit_distance(word, candidate, limit)
+                for candidate in {term, term[:len(word)], term[:len(word) + 1]}
+            )
+            if distance <= limit:
+                scored.append((distance, -doc, term))
+        return [term for _, _, term in sorted(scored)[:MAX_NEAR_TERMS]]
+
+    def hits(self, query: SearchQuery):
+        # `rank` is configured as weighted bm25, lower is better.
+        return text(
+            f"SELECT rowid AS employee_id, -rank AS score FROM {EMPLOYEE_SEARCH_TABLE} "
+            f"WHERE {EMPLOYEE_SEARCH_TABLE} MATCH :match"
+        ).bindparams(match=query.match).columns(
+            column("employee_id"), column("score")
+        ).subquery("search_hits")
+
+
+class PostgresEmployeeSearch(EmployeeSearch):
+    """pg_trgm word similarity over one document per employee.
+
+    Trigram matching finds prefixes and misspellings alike; `<%` is served by
+    the GIN index and hits are ranked by how closely the best-matching part of
+    the document resembles the query.
+    """
+
+    document = table(EMPLOYEE_SEARCH_TABLE, column("employee_id"), column("document"))
+
+    def prepare(self, db: Session, term: str) -> SearchQuery:
+        match = " ".join(WORD_PATTERN.findall(term.lower())[:MAX_QUERY_WORDS])
+        return SearchQuery(term, match or None)
+
+    def hits(self, query: SearchQuery):
+        score = func.word_similarity(query.match, self.document.c.document)
+        return select(self.document.c.employee_id, score.label("score")).where(
+            literal(query.match).op("<%")(self.document.c.document)
+        ).subquery("search_hits")
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SqliteEmployeeSearch,
+    "postgresql": PostgresEmployeeSearch,
+}
+
+
+def employee_search_for(dialect_name: str) -> EmployeeSearch:
+    return SEARCH_BACKENDS.get(dialect_name, EmployeeSearch)()
+
+
+employee_search = employee_search_for(engine.dialect.name)
@@ -0,0 +1,46 @@
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.system import CodeSequence
+from typing import Callable, Optional
+
+
+def _insert_if_missing(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert(CodeSequence).on_conflict_do_nothing(index_elements=["name"])
+    if dialect_name == "sqlite":
+        return sqlite.insert(CodeSequence).on_conflict_do_nothing(index_elements=["name"])
+    return insert(CodeSequence)
+
+
+class SequenceService:
+    """Named counters in `code_sequences`, each advanced by one atomic UPDATE per reservation.
+
+    Reservations run in the caller's transaction: the counter row stays locked
+    until it commits, so concurrent reservations queue instead of colliding,
+    and values reserved by a transaction that rolls back are handed out again.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reserve(self, name: str, count: int = 1, first_value: Callable[[], int] = lambda: 1) -> range:
+        """Reserve `count` consecutive values of counter `name`, creating it at `first_value()` if new."""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        end = self._advance(name, count)
+        if end is None:
+            self.db.execute(_insert_if_missing(self.db.get_bind().dialect.name).values(
+                name=name, next_value=first_value()
+            ))
+            end = self._advance(name, count)
+        return range(end - count, end)
+
+    def _advance(self, name: str, count: int) -> Optional[int]:
+        return self.db.execute(
+            update(CodeSequence)
+            .where(CodeSequence.name == name)
+            .values(next_value=CodeSequence.next_value + count)
+            .returning(CodeSequence.next_value),
+            execution_options={"synchronize_session": False}
+        ).scalar_one_or_none()
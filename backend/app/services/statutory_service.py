@@ -0,0 +1,224 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
+from app.models.payroll import PayrollRecord, PayrollSettings
+from app.models.user import Employee
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+import re
+
+YIELD_PER = 2000
+CHUNK_LINES = 1000
+MAX_REPORTED_ISSUES = 500
+
+ECR_SEPARATOR = "#~#"
+EPS_RATE = 8.33
+DEFAULT_EPF_WAGE_LIMIT = 15000.0
+
+UAN_PATTERN = re.compile(r"^\d{12}$")
+ESIC_IP_PATTERN = re.compile(r"^\d{10}$")
+
+ECR_COLUMNS = [
+    ("uan", "UAN"),
+    ("member_name", "Member Name"),
+    ("gross_wages", "Gross Wages"),
+    ("epf_wages", "EPF Wages"),
+    ("eps_wages", "EPS Wages"),
+    ("edli_wages", "EDLI Wages"),
+    ("epf_contribution", "EPF Contribution Remitted"),
+    ("eps_contribution", "EPS Contribution Remitted"),
+    ("epf_eps_difference", "EPF EPS Difference Remitted"),
+    ("ncp_days", "NCP Days"),
+    ("refund_of_advances", "Refund of Advances"),
+]
+
+ESIC_MC_COLUMNS = [
+    ("ip_number", "IP Number"),
+    ("ip_name", "IP Name"),
+    ("days", "No of Days for which wages paid/payable during the month"),
+    ("wages", "Total Monthly Wages"),
+    ("reason_code", "Reason Code for Zero workings days"),
+    ("last_working_day", "Last Working Day"),
+]
+
+RETURN_TYPES = ("ecr", "esic")
+
+
+class RowIssue(NamedTuple):
+    record_id: int
+    employee_code: str
+    message: str
+
+
+class ReturnValidation:
+    """Tally of rows accepted into or dropped from a return file.
+
+    Only the first `MAX_REPORTED_ISSUES` problems are kept so validating a large
+    establishment stays in bounded memory; `invalid_rows` is always the full count.
+    """
+
+    def __init__(self):
+        self.valid_rows = 0
+        self.invalid_rows = 0
+        self.issues: List[RowIssue] = []
+
+    def accept(self, row, problems: List[str]) -> bool:
+        if not problems:
+            self.valid_rows += 1
+            return True
+        self.invalid_rows += 1
+        if len(self.issues) < MAX_REPORTED_ISSUES:
+            self.issues.append(RowIssue(row.record_id, row.employee_code, "; ".join(problems)))
+        return False
+
+    def summary(self) -> dict:
+        return {
+            "valid_rows": self.valid_rows,
+            "invalid_rows": self.invalid_rows,
+            "issues": [issue._asdict() for issue in self.issues],
+            "issues_truncated": self.invalid_rows > len(self.issues)
+        }
+
+
+def _rupees(value) -> int:
+    # Returns are filed in whole rupees.
+    return int(round(value or 0))
+
+
+def validate_ecr_row(row: dict) -> List[str]:
+    problems = []
+    if not UAN_PATTERN.match(row["uan"]):
+        problems.append("UAN must be 12 digits")
+    if not row["member_name"]:
+        problems.append("Member name is required")
+    amounts = [key for key, _ in ECR_COLUMNS[2:]]
+    if any(row[key] < 0 for key in amounts):
+        problems.append("Amounts cannot be negative")
+    if row["epf_wages"] > row["gross_wages"]:
+        problems.append("EPF wages exceed gross wages")
+    if row["eps_wages"] > row["epf_wages"]:
+        problems.append("EPS wages exceed EPF wages")
+    if row["ncp_days"] > 31:
+        problems.append("NCP days cannot exceed 31")
+    return problems
+
+
+def validate_esic_row(row: dict) -> List[str]:
+    problems = []
+    if not ESIC_IP_PATTERN.match(row["ip_number"]):
+        problems.append("IP number must be 10 digits")
+    if not row["ip_name"]:
+        problems.append("IP name is required")
+    if row["days"] < 0 or row["days"] > 31:
+        problems.append("Days must be between 0 and 31")
+    if row["wages"] < 0:
+        problems.append("Wages cannot be negative")
+    if row["days"] == 0 and row["wages"] > 0:
+        problems.append("Wages reported for zero working days")
+    return problems
+
+
+def iter_ecr(rows: Iterable[dict], chunk_lines: int = CHUNK_LINES) -> Iterator[str]:
+    """EPFO ECR 2.0 text: one member per line, fields joined by `#~#`, no header."""
+    lines = []
+    for row in rows:
+        lines.append(ECR_SEPARATOR.join(str(row[key]) for key, _ in ECR_COLUMNS))
+        if len(lines) >= chunk_lines:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+class StatutoryReturnService:
+    """Builds EPF ECR and ESIC monthly contribution rows straight from payroll.
+
+    Rows are read as plain column tuples from one joined query, so the identity
+    map never holds the month's records.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _epf_wage_limit(self) -> float:
+        limit = self.db.query(PayrollSettings.epf_wage_limit).filter(
+            PayrollSettings.is_active == True
+        ).scalar()
+        return limit or DEFAULT_EPF_WAGE_LIMIT
+
+    def _contribution_rows(self, month: int, year: int, *criteria):
+        return self.db.query(
+            PayrollRecord.id.label("record_id"),
+            Employee.employee_code,
+            Employee.first_name,
+            Employee.last_name,
+            Employee.uan_number,
+            Employee.esic_number,
+            PayrollRecord.basic_salary,
+            PayrollRecord.gross_earnings,
+            PayrollRecord.pf_employee,
+            PayrollRecord.pf_employer,
+            PayrollRecord.esic_employee,
+            PayrollRecord.working_days,
+            PayrollRecord.days_absent
+        ).join(
+            Employee, Employee.id == PayrollRecord.employee_id
+        ).filter(
+            PayrollRecord.month == month,
+            PayrollRecord.year == year,
+            PayrollRecord.status.in_(['approved', 'paid']),
+            *criteria
+        ).order_by(PayrollRecord.id).yield_per(YIELD_PER)
+
+    def ecr_rows(self, month: int, year: int, validation: Optional[ReturnValidation] = None) -> Iterator[dict]:
+        """Members with a PF deduction; rows failing validation are left out of the file."""
+        validation = validation or ReturnValidation()
+        wage_limit = self._epf_wage_limit()
+
+        for row in self._contribution_rows(
+            month, year,
+            or_(PayrollRecord.pf_employee > 0, and_(Employee.uan_number.isnot(None), Employee.uan_number != ''))
+        ):
+            epf_wages = _rupees(min(row.basic_salary or 0, wage_limit))
+            eps_wages = min(epf_wages, _rupees(wage_limit))
+            eps_contribution = _rupees(eps_wages * EPS_RATE / 100)
+            ecr = {
+                "uan": (row.uan_number or '').strip(),
+                "member_name": f"{row.first_name} {row.last_name or ''}".strip().upper(),
+                "gross_wages": _rupees(row.gross_earnings),
+                "epf_wages": epf_wages,
+                "eps_wages": eps_wages,
+                "edli_wages": eps_wages,
+                "epf_contribution": _rupees(row.pf_employee),
+                "eps_contribution": eps_contribution,
+                "epf_eps_difference": max(_rupees(row.pf_employer) - eps_contribution, 0),
+                "ncp_days": _rupees(row.days_absent),
+                "refund_of_advances": 0
+            }
+            if validation.accept(row, validate_ecr_row(ecr)):
+                yield ecr
+
+    def esic_mc_rows(self, month: int, year: int, validation: Optional[ReturnValidation] = None) -> Iterator[dict]:
+        """Insured persons with an ESIC deduction; rows failing validation are left out of the file."""
+        validation = validation or ReturnValidation()
+
+        for row in self._contribution_rows(
+            month, year,
+            or_(PayrollRecord.esic_employee > 0, and_(Employee.esic_number.isnot(None), Employee.esic_number != ''))
+        ):
+            days = _rupees((row.working_days or 0) - (row.days_absent or 0))
+            esic = {
+                "ip_number": (row.esic_number or '').strip(),
+                "ip_name": f"{row.first_name} {row.last_name or ''}".strip(),
+                "days": days,
+                "wages": _rupees(row.gross_earnings),
+                "reason_code": 0 if days else 1,
+                "last_working_day": ''
+            }
+            if validation.accept(row, validate_esic_row(esic)):
+                yield esic
+
+    def validate(self, return_type: str, month: int, year: int) -> dict:
+        validation = ReturnValidation()
+        rows = self.ecr_rows if return_type == "ecr" else self.esic_mc_rows
+        for _ in rows(month, year, validation):
+            pass
+        return {"return_type": return_type, "month": month, "year": year, **validation.summary()}
@@ -0,0 +1,376 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import event, func, and_, or_, inspect, select
+from app.models.payroll import PayrollRecord
+from app.models.system import CodeSequence
+from app.models.user import Employee, Department
+from app.services.export_service import iter_csv
+from app.services.sequence_service import SequenceService
+from typing import Optional, List, Dict, NamedTuple
+from collections import OrderedDict
+from datetime import datetime
+from itertools import chain
+from xml.sax.saxutils import escape
+import threading
+
+AMOUNT_FIELDS = [
+    "gross_earnings", "pf_employee", "pf_employer", "esic_employee", "esic_employer",
+    "professional_tax", "tds", "net_salary", "other_deductions",
+]
+
+JOURNAL = "journal"
+PAYMENT = "payment"
+
+VOUCHER_STATUSES = {
+    JOURNAL: ("approved", "paid"),
+    PAYMENT: ("paid",),
+}
+
+VOUCHER_FORMATS = ("json", "csv", "tally", "iif")
+
+VOUCHER_COLUMNS = [
+    ("date", "Date"),
+    ("voucher_type", "Voucher Type"),
+    ("voucher_no", "Voucher No"),
+    ("account", "Account"),
+    ("debit", "Debit"),
+    ("credit", "Credit"),
+    ("narration", "Narration"),
+]
+
+CACHE_SIZE = 128
+
+# Counter in code_sequences advanced by every commit that changes what vouchers are built from
+VOUCHER_DATA_SEQUENCE = "voucher_data"
+VOUCHER_DATA_CHANGED_KEY = "voucher_data_changed"
+VOUCHER_SOURCES = (PayrollRecord, Employee, Department)
+
+
+class Posting(NamedTuple):
+    date: str
+    voucher_type: str
+    voucher_no: str
+    account: str
+    debit: float
+    credit: float
+    narration: str
+    cost_centre: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        entry = {
+            "date": self.date,
+            "voucher_type": self.voucher_type,
+            "voucher_no": self.voucher_no,
+            "account": self.account,
+            "debit": round(self.debit, 2),
+            "credit": round(self.credit, 2),
+            "narration": self.narration,
+        }
+        if self.cost_centre is not None:
+            entry["cost_centre"] = self.cost_centre
+        return entry
+
+
+def _journal_postings(totals: dict, month: int, year: int, cost_centre: Optional[str]) -> List[Posting]:
+    date = f"{year}-{month:02d}-01"
+    voucher_no = f"SLR/{month:02d}/{year}"
+    period = datetime(year, month, 1).strftime('%B %Y')
+
+    def post(account, debit, credit, narration):
+        return Posting(date, "Payment", voucher_no, account, debit, credit, narration, cost_centre)
+
+    postings = [
+        post("Salary Expense - Gross", totals["gross_earnings"], 0, f"Salary expense for {period}"),
+        post("PF Expense - Employer", totals["pf_employer"], 0, f"PF employer contribution for {period}"),
+        post("ESI Expense - Employer", totals["esic_employer"], 0, f"ESI employer contribution for {period}"),
+        post("Bank/Cash", 0, totals["net_salary"], f"Net salary payment for {period}"),
+    ]
+    credits = [
+        ("PF Payable - Employee", "pf_employee", f"PF deduction from employees for {period}"),
+        ("PF Payable - Employer", "pf_employer", f"PF employer contribution for {period}"),
+        ("ESI Payable - Employee", "esic_employee", f"ESI deduction from employees for {period}"),
+        ("ESI Payable - Employer", "esic_employer", f"ESI employer contribution for {period}"),
+        ("Professional Tax Payable", "professional_tax", f"Professional Tax for {period}"),
+        ("TDS Payable", "tds", f"TDS deducted for {period}"),
+    ]
+    for account, field, narration in credits:
+        if totals[field] > 0:
+            postings.append(post(account, 0, totals[field], narration))
+    return postings
+
+
+def _payment_postings(totals: dict, month: int, year: int, cost_centre: Optional[str]) -> List[Posting]:
+    date = f"{year}-{month:02d}-01"
+    voucher_no = f"PMT/{month:02d}/{year}"
+    period = datetime(year, month, 1).strftime('%B %Y')
+
+    def post(account, debit, credit, narration):
+        return Posting(date, "Payment", voucher_no, account, debit, credit, narration, cost_centre)
+
+    debits = [
+        ("Salary Payable - Net", "net_salary", f"Net salary payment for {period}"),
+        ("PF Payable - Employee", "pf_employee", "PF remittance for employees"),
+        ("PF Payable - Employer", "pf_employer", "PF employer contribution remittance"),
+        ("ESI Payable - Employee", "esic_employee", "ESI remittance for employees"),
+        ("ESI Payable - Employer", "esic_employer", "ESI employer contribution remittance"),
+        ("Professional Tax Payable", "professional_tax", "Professional Tax payment"),
+        ("TDS Payable", "tds", "TDS remittance"),
+    ]
+    postings = []
+    total_payment = 0.0
+    for account, field, narration in debits:
+        if totals[field] > 0:
+            postings.append(post(account, totals[field], 0, narration))
+            total_payment += totals[field]
+    postings.append(post("Bank", 0, total_payment, f"Total payment via bank for {period}"))
+    return postings
+
+
+POSTING_BUILDERS = {
+    JOURNAL: _journal_postings,
+    PAYMENT: _payment_postings,
+}
+
+
+class VoucherSet:
+    """Ledger postings for one voucher kind over one or more months."""
+
+    def __init__(self, kind: str, periods: List[tuple], postings: List[Posting], record_count: int):
+        self.kind = kind
+        self.periods = periods
+        self.postings = postings
+        self.record_count = record_count
+
+    @property
+    def total_debit(self) -> float:
+        return sum(p.debit for p in self.postings)
+
+    @property
+    def total_credit(self) -> float:
+        return sum(p.credit for p in self.postings)
+
+    def totals(self) -> dict:
+        return {
+            "total_debit": round(self.total_debit, 2),
+            "total_credit": round(self.total_credit, 2),
+            "balanced": abs(self.total_debit - self.total_credit) < 0.01
+        }
+
+    def to_json(self) -> dict:
+        return {
+            "kind": self.kind,
+            "periods": [{"month": month, "year": year} for year, month in self.periods],
+            "entries": [p.as_dict() for p in self.postings],
+            "totals": self.totals()
+        }
+
+    def iter_csv(self):
+        rows = (
+            {**p.as_dict(), "debit": f"{p.debit:.2f}", "credit": f"{p.credit:.2f}"}
+            for p in self.postings
+        )
+        columns = VOUCHER_COLUMNS + ([("cost_centre", "Cost Centre")] if self._has_cost_centres() else [])
+        return iter_csv(columns, rows)
+
+    def to_tally_xml(self) -> str:
+        parts = [
+            "<ENVELOPE><HEADER><TALLYREQUEST>Import Data</TALLYREQUEST></HEADER>",
+            "<BODY><IMPORTDATA><REQUESTDESC><REPORTNAME>Vouchers</REPORTNAME></REQUESTDESC><REQUESTDATA>",
+        ]
+        for voucher_no, postings in self._by_voucher().items():
+            first = postings[0]
+            parts.append(
+                f'<TALLYMESSAGE xmlns:UDF="TallyUDF"><VOUCHER VCHTYPE="{escape(first.voucher_type)}" ACTION="Create">'
+                f"<DATE>{first.date.replace('-', '')}</DATE>"
+                f"<VOUCHERTYPENAME>{escape(first.voucher_type)}</VOUCHERTYPENAME>"
+                f"<VOUCHERNUMBER>{escape(voucher_no)}</VOUCHERNUMBER>"
+                f"<NARRATION>{escape(first.narration)}</NARRATION>"
+            )
+            for p in postings:
+                # Tally signs debits negative and marks them as deemed positive.
+                amount = -p.debit if p.debit else p.credit
+                parts.append(
+                    "<ALLLEDGERENTRIES.LIST>"
+                    f"<LEDGERNAME>{escape(p.account)}</LEDGERNAME>"
+                    f"<ISDEEMEDPOSITIVE>{'Yes' if p.debit else 'No'}</ISDEEMEDPOSITIVE>"
+                    f"<AMOUNT>{amount:.2f}</AMOUNT>"
+                )
+                if p.cost_centre is not None:
+                    parts.append(
+                        "<CATEGORYALLOCATIONS.LIST><CATEGORY>Primary Cost Category</CATEGORY>"
+                        f"<COSTCENTREALLOCATIONS.LIST><NAME>{escape(p.cost_centre)}</NAME>"
+                        f"<AMOUNT>{amount:.2f}</AMOUNT></COSTCENTREALLOCATIONS.LIST>"
+                        "</CATEGORYALLOCATIONS.LIST>"
+                    )
+                parts.append("</ALLLEDGERENTRIES.LIST>")
+            parts.append("</VOUCHER></TALLYMESSAGE>")
+        parts.append("</REQUESTDATA></IMPORTDATA></BODY></ENVELOPE>")
+        return "".join(parts)
+
+    def to_iif(self) -> str:
+        def field(value) -> str:
+            return str(value).replace("\t", " ").replace("\n", " ")
+
+        lines = [
+            "!TRNS\tTRNSTYPE\tDATE\tACCNT\tCLASS\tAMOUNT\tDOCNUM\tMEMO",
+            "!SPL\tTRNSTYPE\tDATE\tACCNT\tCLASS\tAMOUNT\tDOCNUM\tMEMO",
+            "!ENDTRNS",
+        ]
+        for voucher_no, postings in self._by_voucher().items():
+            for i, p in enumerate(postings):
+                date = datetime.strptime(p.date, "%Y-%m-%d").strftime("%m/%d/%Y")
+                amount = p.debit - p.credit
+                lines.append("\t".join([
+                    "TRNS" if i == 0 else "SPL", "GENERAL JOURNAL", date, field(p.account),
+                    field(p.cost_centre or ""), f"{amount:.2f}", field(voucher_no), field(p.narration)
+                ]))
+            lines.append("ENDTRNS")
+        return "\r\n".join(lines) + "\r\n"
+
+    def _has_cost_centres(self) -> bool:
+        return any(p.cost_centre is not None for p in self.postings)
+
+    def _by_voucher(self) -> Dict[str, List[Posting]]:
+        vouchers: Dict[str, List[Posting]] = OrderedDict()
+        for p in self.postings:
+            vouchers.setdefault(p.voucher_no, []).append(p)
+        return vouchers
+
+
+class _VoucherCache:
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self._entries: "OrderedDict[tuple, VoucherSet]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+
+    def get(self, key: tuple) -> Optional[VoucherSet]:
+        with self._lock:
+            voucher_set = self._entries.get(key)
+            if voucher_set is not None:
+                self._entries.move_to_end(key)
+            return voucher_set
+
+    def put(self, key: tuple, voucher_set: VoucherSet):
+        with self._lock:
+            self._entries[key] = voucher_set
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+voucher_cache = _VoucherCache()
+
+
+def _changes_voucher_data(session: Session, obj) -> bool:
+    if isinstance(obj, (PayrollRecord, Department)):
+        return obj not in session.dirty or session.is_modified(obj)
+    # Employees only matter through the department their records are split by.
+    return isinstance(obj, Employee) and (
+        obj not in session.dirty or inspect(obj).attrs.department_id.history.has_changes()
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _note_voucher_data_changes(session: Session, flush_context, instances):
+    if any(_changes_voucher_data(session, obj) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[VOUCHER_DATA_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_voucher_data_changes(state):
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ in VOUCHER_SOURCES:
+        state.session.info[VOUCHER_DATA_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _advance_voucher_data_version(session: Session):
+    # Pending objects are flushed by the commit after this hook; flush them now so they count.
+    session.flush()
+    if session.info.pop(VOUCHER_DATA_CHANGED_KEY, None):
+        SequenceService(session).reserve(VOUCHER_DATA_SEQUENCE)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_voucher_data_changes(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(VOUCHER_DATA_CHANGED_KEY, None)
+
+
+class VoucherService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _period_filter(self, from_period: tuple, to_period: tuple):
+        (from_year, from_month), (to_year, to_month) = from_period, to_period
+        if from_period == to_period:
+            return and_(PayrollRecord.year == from_year, PayrollRecord.month == from_month)
+        return and_(
+            PayrollRecord.year.between(from_year, to_year),
+            or_(PayrollRecord.year > from_year, PayrollRecord.month >= from_month),
+            or_(PayrollRecord.year < to_year, PayrollRecord.month <= to_month)
+        )
+
+    def _data_version(self) -> Optional[int]:
+        """Advanced by every commit touching payroll records, employees' departments or department names.
+
+        One primary-key read, so a cache hit costs no aggregate over the period.
+        """
+        return self.db.scalar(select(CodeSequence.next_value).where(CodeSequence.name == VOUCHER_DATA_SEQUENCE))
+
+    def build(
+        self,
+        kind: str,
+        month: int,
+        year: int,
+        to_month: Optional[int] = None,
+        to_year: Optional[int] = None,
+        split_by_department: bool = False
+    ) -> VoucherSet:
+        from_period = (year, month)
+        to_period = (to_year or year, to_month or month)
+        statuses = VOUCHER_STATUSES[kind]
+        criteria = [self._period_filter(from_period, to_period), PayrollRecord.status.in_(statuses)]
+
+        cache_key = (kind, from_period, to_period, statuses, split_by_department, self._data_version())
+        voucher_set = voucher_cache.get(cache_key)
+        if voucher_set is not None:
+            return voucher_set
+
+        group_columns = [PayrollRecord.year, PayrollRecord.month]
+        query_columns = list(group_columns)
+        if split_by_department:
+            group_columns.append(Department.name)
+            query_columns.append(func.coalesce(Department.name, "Unassigned"))
+        query_columns += [func.coalesce(func.sum(getattr(PayrollRecord, f)), 0.0) for f in AMOUNT_FIELDS]
+        query_columns.append(func.count(PayrollRecord.id))
+
+        query = self.db.query(*query_columns).filter(*criteria)
+        if split_by_department:
+            query = query.join(Employee, Employee.id == PayrollRecord.employee_id).outerjoin(
+                Department, Department.id == Employee.department_id
+            )
+        rows = query.group_by(*group_columns).order_by(*group_columns).all()
+
+        builder = POSTING_BUILDERS[kind]
+        postings: List[Posting] = []
+        periods: List[tuple] = []
+        record_count = 0
+        if not rows and from_period == to_period and not split_by_department:
+            postings = builder(dict.fromkeys(AMOUNT_FIELDS, 0.0), month, year, None)
+        for row in rows:
+            row_year, row_month = row[0], row[1]
+            offset = 3 if split_by_department else 2
+            cost_centre = row[2] if split_by_department else None
+            totals = dict(zip(AMOUNT_FIELDS, row[offset:offset + len(AMOUNT_FIELDS)]))
+            record_count += row[-1]
+            if (row_year, row_month) not in periods:
+                periods.append((row_year, row_month))
+            postings.extend(builder(totals, row_month, row_year, cost_centre))
+
+        voucher_set = VoucherSet(kind, periods, postings, record_count)
+        voucher_cache.put(cache_key, voucher_set)
+        return voucher_set
@@ -0,0 +1,91 @@
+"""p50/p99 latency of the employee list served sync (threadpool) vs async (AsyncSession).
+
+Uses a scratch SQLite file unless DATABASE_URL is set, e.g. to a local Postgres.
+Run from the backend directory:
+    python -m benchmarks.bench_async_reads [requests] [concurrency]
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_async_reads.db")
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from app.core.database import Base, engine, get_db, get_async_db
+from app.core.security import UserPrincipal
+from app.models.user import Department, Employee, UserRole
+from app.services.employee_service import EmployeeService, AsyncEmployeeService
+
+EMPLOYEES = 5000
+
+
+def seed():
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(delete(Employee))
+        conn.execute(delete(Department))
+        conn.execute(insert(Department), [{"id": i + 1, "name": f"Department {i}", "code": f"D{i}"} for i in range(10)])
+        conn.execute(insert(Employee), [
+            {
+                "employee_code": f"EMP{i:06d}", "first_name": f"Employee{i}", "email": f"e{i}@example.com",
+                "department_id": i % 10 + 1, "is_active": True,
+            }
+            for i in range(EMPLOYEES)
+        ])
+
+
+app = FastAPI()
+principal = UserPrincipal(1, UserRole.ADMIN, True, True, None)
+
+
+@app.get("/sync/employees")
+def sync_employees(search: str = None, db: Session = Depends(get_db)):
+    items, total = EmployeeService(db).get_employees(skip=100, limit=20, search=search)
+    return {"items": items, "total": total}
+
+
+@app.get("/async/employees")
+async def async_employees(search: str = None, db=Depends(get_async_db)):
+    items, total = await AsyncEmployeeService(db).get_employees(skip=100, limit=20, search=search)
+    return {"items": items, "total": total}
+
+
+async def load(path: str, requests: int, concurrency: int) -> list:
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def call(i: int):
+            async with limit:
+                started = time.perf_counter()
+                response = await client.get(path, params={"search": f"Employee{i % 50}"})
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(call(i) for i in range(requests)))
+    return latencies
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    seed()
+    print(f"{requests} requests, {concurrency} concurrent, {EMPLOYEES} employees, {engine.url.get_backend_name()}")
+    for label, path in (("sync def + Session", "/sync/employees"), ("async def + AsyncSession", "/async/employees")):
+        started = time.perf_counter()
+        latencies = sorted(asyncio.run(load(path, requests, concurrency)))
+        elapsed = time.perf_counter() - started
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{label:<26} {requests / elapsed:7.1f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms"
+        )
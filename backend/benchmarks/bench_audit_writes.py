@@ -0,0 +1,79 @@
+"""Commits and time per audited mutation: audit row in its own commit vs with the change.
+
+Updates MUTATIONS employees on a scratch SQLite file two ways and counts the
+transactions the engine commits:
+
+- separate: the previous pattern, commit the change and then add the audit
+  row and commit again;
+- with the change: `EmployeeService.update_employee`, whose audit event is
+  written by the change's own commit.
+
+Run from the backend directory:
+    python -m benchmarks.bench_audit_writes [mutations]
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_audit_writes.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+from sqlalchemy import event, func, insert, select
+import json
+import sys
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.document import AuditLog
+from app.models.user import Employee
+from app.schemas.user import EmployeeUpdate
+from app.services.employee_service import EmployeeService
+
+
+def seed(employees: int):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {"employee_code": f"EMP2024{i:05d}", "first_name": f"Worker{i}", "last_name": "Plant"}
+            for i in range(employees)
+        ])
+
+
+def update_then_audit(db, employee_id: int, last_name: str):
+    employee = db.get(Employee, employee_id)
+    old_values = {"last_name": employee.last_name}
+    employee.last_name = last_name
+    db.commit()
+    db.add(AuditLog(
+        user_id=None, action="update", entity_type="employee", entity_id=employee_id,
+        old_value=json.dumps(old_values), new_value=json.dumps({"last_name": last_name})
+    ))
+    db.commit()
+
+
+def run(label: str, mutate, mutations: int):
+    commits = []
+    listener = lambda conn: commits.append(1)
+    event.listen(engine, "commit", listener)
+    db = SessionLocal()
+    started = time.perf_counter()
+    for i in range(mutations):
+        mutate(db, i + 1, f"{label}{i}")
+    elapsed = time.perf_counter() - started
+    audited = db.scalar(select(func.count()).select_from(AuditLog).filter(AuditLog.new_value.like(f'%"{label}%')))
+    db.close()
+    event.remove(engine, "commit", listener)
+    print(f"{label:<12} {len(commits) / mutations:>6.2f} commits/mutation  "
+          f"{elapsed / mutations * 1000:>6.2f} ms/mutation  {audited} audit rows")
+
+
+if __name__ == "__main__":
+    mutations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seed(mutations)
+    run("separate", update_then_audit, mutations)
+    run("with-change", lambda db, employee_id, last_name: EmployeeService(db).update_employee(
+        employee_id, EmployeeUpdate(last_name=last_name), user_id=1
+    ), mutations)
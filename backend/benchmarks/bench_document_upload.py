@@ -0,0 +1,70 @@
+"""Memory and throughput of document uploads and ranged downloads through DocumentStore.
+
+Streams a SIZE_MB file into a scratch store in 256 KiB pieces, as an upload
+request body arrives, both in one piece (`save`) and as resumable 8 MiB chunks
+(`write_upload` + `commit_upload`), then reads it back whole and as a Range.
+Peak Python memory stays around the I/O chunk size whatever the file size.
+
+Run from the backend directory:
+    python -m benchmarks.bench_document_upload [size_mb]
+"""
+import os
+import shutil
+import tempfile
+
+STORE_DIR = os.path.join(tempfile.gettempdir(), "bench_document_upload")
+
+import asyncio
+import hashlib
+import sys
+import time
+import tracemalloc
+
+from app.services.document_store import DocumentStore
+
+PIECE = 256 * 1024
+CHUNK = 8 * 1024 * 1024
+
+
+async def body(size: int, start: int = 0):
+    block = hashlib.sha256(b"scan").digest() * (PIECE // 32)
+    for offset in range(start, size, PIECE):
+        yield block[:min(PIECE, size - offset)]
+
+
+async def measure(label: str, size: int, step):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = await step()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<22} {size / elapsed / 2**20:>8.0f} MiB/s  peak {peak / 2**20:>6.2f} MiB")
+    return result
+
+
+async def main(size: int):
+    shutil.rmtree(STORE_DIR, ignore_errors=True)
+    store = DocumentStore(STORE_DIR)
+
+    sha256, _ = await measure("single request", size, lambda: store.save(body(size), size))
+
+    async def chunked():
+        for offset in range(0, size, CHUNK):
+            await store.write_upload("bench", offset, body(min(offset + CHUNK, size), offset), size)
+        return await store.commit_upload("bench")
+    assert (await measure("resumable chunks", size, chunked))[0] == sha256
+
+    async def drain(first=0, last=None):
+        total = 0
+        async for chunk in store.read(sha256, first, last):
+            total += len(chunk)
+        return total
+    assert await measure("download", size, drain) == size
+    assert await measure("download last half", size // 2, lambda: drain(size // 2, size - 1)) == size - size // 2
+    shutil.rmtree(STORE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    asyncio.run(main(size_mb * 2**20))
@@ -0,0 +1,91 @@
+"""Onboarding a batch of hires: one POST-equivalent per employee vs the bulk import.
+
+Creates HIRES employees into a scratch SQLite file through
+`EmployeeService.create_employee` (a commit and an audit commit each, as the
+single-employee endpoint does), then imports the same number from a generated
+CSV with `EmployeeImport` into a fresh file.
+
+Run from the backend directory:
+    python -m benchmarks.bench_employee_import [hires]
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_employee_import.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+import csv
+import io
+import sys
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.user import Department, Designation, User, UserRole
+from app.schemas.user import EmployeeCreate
+from app.services.employee_service import EmployeeService
+from app.services.import_service import EmployeeImport, read_employee_rows
+
+
+def reset() -> int:
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    department = Department(name="Plant 2", code="PL2")
+    db.add(department)
+    db.flush()
+    db.add(Designation(name="Operator", department_id=department.id))
+    user = User(email="hr@example.com", username="hr", hashed_password="x", role=UserRole.HR)
+    db.add(user)
+    db.commit()
+    ids = department.id, user.id
+    db.close()
+    return ids
+
+
+def hire(i: int) -> dict:
+    return {
+        "first_name": f"Worker{i}", "last_name": "Plant", "email": f"worker{i}@example.com",
+        "phone": f"98{i:08d}", "pan_number": f"ABCDE{i % 10000:04d}F", "uan_number": f"{100000000000 + i}",
+        "ifsc_code": "HDFC0001234", "date_of_joining": "2024-04-01T00:00:00"
+    }
+
+
+def one_by_one(hires: int) -> float:
+    department_id, user_id = reset()
+    db = SessionLocal()
+    started = time.perf_counter()
+    service = EmployeeService(db)
+    for i in range(hires):
+        service.create_employee(EmployeeCreate(department_id=department_id, **hire(i)), user_id)
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed
+
+
+def bulk(hires: int) -> float:
+    _, user_id = reset()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(hire(0)) + ["department", "designation"])
+    writer.writeheader()
+    for i in range(hires):
+        writer.writerow({**hire(i), "department": "PL2", "designation": "Operator"})
+    data = io.BytesIO(buffer.getvalue().encode())
+    db = SessionLocal()
+    started = time.perf_counter()
+    report = EmployeeImport(db, user_id).run(read_employee_rows(data, "csv"))
+    elapsed = time.perf_counter() - started
+    db.close()
+    assert report["imported_rows"] == hires, report
+    return elapsed
+
+
+if __name__ == "__main__":
+    hires = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    single = one_by_one(hires)
+    print(f"create_employee x {hires}: {single:.2f}s ({hires / single:.0f} employees/s)")
+    imported = bulk(hires)
+    print(f"bulk import of {hires}:    {imported:.2f}s ({hires / imported:.0f} employees/s)")
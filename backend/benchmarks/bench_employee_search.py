@@ -0,0 +1,92 @@
+"""Employee search latency: ILIKE scan vs the FTS5 index.
+
+Seeds EMPLOYEES employees with generated names into a scratch SQLite file (the
+index triggers fill `employee_search` as they go), then runs one list page plus
+its count for each query both ways: the previous ILIKE filter and the indexed
+search, including prefix, multi-word and misspelled input.
+
+Run from the backend directory:
+    python -m benchmarks.bench_employee_search [employees]
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_employee_search.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+from sqlalchemy import insert, select, func
+import random
+import statistics
+import sys
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.user import Department, Employee
+from app.services.employee_service import employee_list_statement
+from app.services.search_service import EmployeeSearch, SearchQuery, employee_search
+
+PAGE_SIZE = 20
+REPEAT = 5
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Arjun", "Deepa", "Divya", "Ganesh", "Harish", "Ishaan", "Kavya", "Lakshmi",
+    "Manoj", "Meera", "Naveen", "Pooja", "Priyanka", "Rahul", "Ramesh", "Sampath", "Sneha", "Vikram"
+]
+LAST_NAMES = ["Sharma", "Kumar", "Reddy", "Iyer", "Nair", "Kore", "Patel", "Rao", "Menon", "Gupta"]
+DEPARTMENTS = ["Engineering", "Finance", "Human Resources", "Operations", "Sales"]
+QUERIES = ["sampath", "samp", "sampath kore", "smapath", "priyanak reddy", "EMP2024012345", "98450", "zzzz"]
+
+
+def seed(employees: int):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Department), [{"name": name, "code": name[:3].upper()} for name in DEPARTMENTS])
+        for start in range(0, employees, 10000):
+            rows = []
+            for i in range(start, min(start + 10000, employees)):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                rows.append({
+                    "employee_code": f"EMP2024{i:06d}",
+                    "first_name": first,
+                    "last_name": last,
+                    "email": f"{first}.{last}{i}@example.com".lower(),
+                    "phone": f"+91 9{rng.randrange(10 ** 9):09d}",
+                    "department_id": rng.randrange(len(DEPARTMENTS)) + 1
+                })
+            conn.execute(insert(Employee), rows)
+
+
+def search_page(db, query: SearchQuery, search) -> int:
+    stmt = employee_list_statement(None, is_active=True)
+    stmt = search.filter(stmt, query)
+    total = db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+    db.scalars(stmt.order_by(Employee.id.desc()).limit(PAGE_SIZE)).all()
+    return total
+
+
+def timed(call):
+    samples, result = [], None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, result
+
+
+if __name__ == "__main__":
+    employees = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    started = time.perf_counter()
+    seed(employees)
+    print(f"seeded {employees} employees (index maintained by triggers) in {time.perf_counter() - started:.1f}s")
+    db = SessionLocal()
+    ilike = EmployeeSearch()
+    print(f"{'query':<18} {'ILIKE':>10} {'hits':>7}   {f'{type(employee_search).__name__}':>24} {'hits':>7}")
+    for term in QUERIES:
+        ilike_ms, ilike_hits = timed(lambda: search_page(db, ilike.prepare(db, term), ilike))
+        index_ms, index_hits = timed(lambda: search_page(db, employee_search.prepare(db, term), employee_search))
+        print(f"{term:<18} {ilike_ms:>7.1f} ms {ilike_hits:>7}   {index_ms:>21.1f} ms {index_hits:>7}")
+    db.close()
@@ -0,0 +1,84 @@
+"""As-of reads of one employee's record: replay from creation vs from snapshots.
+
+Writes CHANGES audited updates to one employee on a scratch SQLite file, one
+hour apart, then times `HistoryService.state_at` at random points in that
+history before and after `take_snapshots`, and checks both give the same state.
+
+Run from the backend directory:
+    python -m benchmarks.bench_entity_history [changes]
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_entity_history.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+import orjson
+import random
+import statistics
+import sys
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.document import AuditLog
+from app.models.user import Employee
+from app.services.history_service import HistoryService
+
+START = datetime(2024, 1, 1)
+READS = 50
+
+
+def seed(changes: int):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    Base.metadata.create_all(engine)
+    events = [{
+        "action": "create", "entity_type": "employee", "entity_id": 1, "created_at": START,
+        "new_value": orjson.dumps({"first_name": "Asha", "last_name": "Rao", "basic_salary": 30000}).decode()
+    }]
+    for i in range(1, changes + 1):
+        events.append({
+            "action": "update", "entity_type": "employee", "entity_id": 1,
+            "created_at": START + timedelta(hours=i),
+            "old_value": orjson.dumps({"basic_salary": 30000 + i - 1}).decode(),
+            "new_value": orjson.dumps({"basic_salary": 30000 + i}).decode()
+        })
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{
+            "employee_code": "EMP20240001", "first_name": "Asha", "last_name": "Rao", "basic_salary": 30000 + changes
+        }])
+        conn.execute(insert(AuditLog), events)
+
+
+def run(label: str, points: list) -> list:
+    db = SessionLocal()
+    service = HistoryService(db)
+    timings, states, replayed = [], [], []
+    for at in points:
+        started = time.perf_counter()
+        result = service.state_at("employee", 1, at)
+        timings.append((time.perf_counter() - started) * 1000)
+        states.append(result.state)
+        replayed.append(result.replayed)
+    db.close()
+    print(f"{label:<18} median {statistics.median(timings):>7.2f} ms  max {max(timings):>7.2f} ms  "
+          f"events replayed: median {statistics.median(replayed):>6.0f}, max {max(replayed)}")
+    return states
+
+
+if __name__ == "__main__":
+    changes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    seed(changes)
+    random.seed(7)
+    points = [START + timedelta(hours=random.uniform(0, changes)) for _ in range(READS)]
+    from_creation = run("from creation", points)
+    db = SessionLocal()
+    snapshots = HistoryService(db).take_snapshots()
+    db.close()
+    print(f"{snapshots} snapshots taken")
+    from_snapshots = run("from snapshots", points)
+    assert from_creation == from_snapshots, "snapshot replay disagrees with full replay"
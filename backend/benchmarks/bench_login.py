@@ -0,0 +1,109 @@
+"""Login throughput and latency with bcrypt running in the bounded hashing pool.
+
+Also times a sync endpoint (`GET /health`) during the storm: logins wait for
+hashing on the event loop, so the request threadpool stays free for others.
+
+Run from the backend directory:
+    python -m benchmarks.bench_login [logins] [concurrency]
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_login.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "10")
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from main import app
+from app.core import security
+from app.core.config import settings
+from app.core.database import SessionLocal, init_db
+from app.models.user import User
+
+USERS = 50
+PASSWORD = "correct horse battery staple"
+
+
+def setup_database():
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    init_db()
+    hashed = security.get_password_hash(PASSWORD)
+    db = SessionLocal()
+    db.add_all([
+        User(email=f"user{i}@example.com", username=f"user{i}", hashed_password=hashed, is_active=True)
+        for i in range(USERS)
+    ])
+    db.commit()
+    db.close()
+
+
+async def storm(logins: int, concurrency: int) -> tuple[float, list, list]:
+    latencies, others = [], []
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i: int):
+            async with limit:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/auth/login", json={"username": f"user{i % USERS}", "password": PASSWORD}
+                )
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        async def other_requests(done: asyncio.Event):
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                others.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        done = asyncio.Event()
+        probe = asyncio.create_task(other_requests(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+        return elapsed, latencies, others
+
+
+def p95(samples: list) -> float:
+    samples = sorted(samples)
+    return samples[max(int(len(samples) * 0.95) - 1, 0)]
+
+
+def report(label: str, elapsed: float, latencies: list, others: list):
+    print(
+        f"{label:<28} {len(latencies) / elapsed:7.1f} logins/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95(latencies) * 1000:7.1f} ms  "
+        f"/health p95 {p95(others) * 1000:7.1f} ms"
+    )
+
+
+async def main(logins: int, concurrency: int):
+    # One event loop for both runs: the async engine's connections belong to it.
+    report(f"pool of {settings.PASSWORD_HASH_WORKERS} workers", *await storm(logins, concurrency))
+
+    # Roughly the old behaviour: every login hashes at once.
+    security._hash_pool = ThreadPoolExecutor(max_workers=concurrency)
+    report(f"unbounded ({concurrency} threads)", *await storm(logins, concurrency))
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    setup_database()
+    print(f"bcrypt cost {settings.PASSWORD_HASH_ROUNDS}, {logins} logins, {concurrency} concurrent, {os.cpu_count()} CPUs")
+    asyncio.run(main(logins, concurrency))
@@ -0,0 +1,69 @@
+"""Offset vs keyset page latency at increasing depth, on the audit log.
+
+Seeds ROWS audit entries into a scratch SQLite file, then fetches one page at
+several depths both ways: offset pages with an exact count (the compatibility
+mode) and keyset pages with the capped count. The keyset cursor for each depth
+is taken from the row just before it, as a client walking the list would hold.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pagination [rows]
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_pagination.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+from datetime import datetime
+from sqlalchemy import insert
+import statistics
+import sys
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.document import AuditLog
+from app.services.document_service import AuditService
+from app.services.pagination import encode_cursor
+
+PAGE_SIZE = 50
+REPEAT = 5
+
+
+def seed(rows: int):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        for start in range(0, rows, 10000):
+            conn.execute(insert(AuditLog), [
+                {"action": "update", "entity_type": "payroll_record", "entity_id": i, "created_at": now}
+                for i in range(start, min(start + 10000, rows))
+            ])
+
+
+def timed(call) -> float:
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    seed(rows)
+    db = SessionLocal()
+    service = AuditService(db)
+    print(f"{rows} audit rows, page size {PAGE_SIZE}, median of {REPEAT}")
+    print(f"{'depth':>8}  {'offset + exact count':>22}  {'keyset + capped count':>22}")
+    for depth in (0, rows // 10, rows // 2, rows - PAGE_SIZE):
+        # Ids are 1..rows and the list is newest first, so the row before `depth` has id rows - depth + 1.
+        cursor = encode_cursor([rows - depth + 1]) if depth else None
+        offset_ms = timed(lambda: service.get_audit_logs(skip=depth, limit=PAGE_SIZE))
+        keyset_ms = timed(lambda: service.get_audit_logs_page(cursor=cursor, limit=PAGE_SIZE))
+        print(f"{depth:>8}  {offset_ms:>19.1f} ms  {keyset_ms:>19.1f} ms")
+    db.close()
@@ -0,0 +1,71 @@
+"""Throughput of the payslip dispatcher against a local aiosmtpd server.
+
+Needs `pip install aiosmtpd`. Run from the backend directory:
+    python -m benchmarks.bench_payslip_mailer [messages]
+"""
+from aiosmtpd.controller import Controller
+from datetime import datetime
+import asyncio
+import sys
+import time
+
+from app.services.pdf_templates import get_template, PayslipTemplate
+from app.services.payslip_mailer import MailJob, PayslipDispatcher, SMTPConnectionPool, build_payslip_message
+from benchmarks.bench_pdf_templates import sample_record, sample_employee
+
+PORT = 8025
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def jobs(count: int):
+    record, employee = sample_record(0), sample_employee(0)
+    employee.email = "employee@example.com"
+    pdf = get_template(PayslipTemplate).render_payslip(record, employee, datetime(2024, 5, 1))
+    message = build_payslip_message(record, employee, pdf)
+    for i in range(count):
+        yield MailJob(i, employee.email, message)
+
+
+def run(count: int, connections: int, messages_per_connection: int) -> float:
+    pool = SMTPConnectionPool(
+        size=connections, hostname="127.0.0.1", port=PORT, messages_per_connection=messages_per_connection
+    )
+    dispatcher = PayslipDispatcher(pool, rate_per_second=0, max_retries=0)
+    failed = []
+
+    def on_result(result):
+        if not result.sent:
+            failed.append(result)
+
+    started = time.perf_counter()
+    asyncio.run(dispatcher.run(jobs(count), on_result))
+    elapsed = time.perf_counter() - started
+    assert not failed, failed[0]
+    return elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=PORT)
+    controller.start()
+    try:
+        cases = [
+            ("connection per message", min(count, 1000), 4, 1),
+            ("pooled, 4 connections", count, 4, 200),
+            ("pooled, 8 connections", count, 8, 500),
+        ]
+        for label, messages, connections, per_connection in cases:
+            elapsed = run(messages, connections, per_connection)
+            print(f"{label:<24} {messages:>6} messages in {elapsed:6.2f}s  {messages / elapsed:7.0f} msg/s")
+    finally:
+        controller.stop()
+    print(f"server received {handler.received} messages")
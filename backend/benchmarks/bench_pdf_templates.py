@@ -0,0 +1,144 @@
+"""Payslip rendering throughput: platypus SimpleDocTemplate vs the canvas template.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_templates [documents]
+"""
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.units import inch
+from types import SimpleNamespace
+from io import BytesIO
+from datetime import datetime
+import sys
+import time
+
+from app.services.pdf_templates import get_template, PayslipTemplate
+
+
+def platypus_payslip(record, employee) -> bytes:
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=16, spaceAfter=10)
+    heading_style = ParagraphStyle('Heading', parent=styles['Heading2'], fontSize=12, spaceBefore=10, spaceAfter=5)
+
+    elements = [
+        Paragraph("PayrollEdge Platform", title_style),
+        Paragraph(f"Payslip for {datetime(record.year, record.month, 1).strftime('%B %Y')}", styles['Normal']),
+        Spacer(1, 10),
+    ]
+
+    emp_table = Table([
+        ['Employee Code:', employee.employee_code, 'Name:', f"{employee.first_name} {employee.last_name}"],
+        ['Department:', employee.department.name, 'Designation:', employee.designation.name],
+        ['UAN Number:', employee.uan_number, 'ESI Number:', employee.esic_number],
+    ], colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
+    emp_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+    ]))
+    elements += [emp_table, Spacer(1, 15)]
+
+    earnings_table = Table([
+        ['Earnings', 'Amount (₹)', 'Deductions', 'Amount (₹)'],
+        ['Basic Salary', f"{record.basic_salary:,.2f}", 'PF (Employee)', f"{record.pf_employee:,.2f}"],
+        ['HRA', f"{record.hra:,.2f}", 'ESIC (Employee)', f"{record.esic_employee:,.2f}"],
+        ['Conveyance', f"{record.conveyance:,.2f}", 'Professional Tax', f"{record.professional_tax:,.2f}"],
+        ['Special Allowance', f"{record.special_allowance:,.2f}", 'TDS', f"{record.tds:,.2f}"],
+        ['Overtime', f"{record.overtime_amount:,.2f}", 'Other Deductions', f"{record.other_deductions:,.2f}"],
+        ['Bonus', f"{record.bonus:,.2f}", '', ''],
+        ['Arrears', f"{record.arrears:,.2f}", '', ''],
+    ], colWidths=[2.5*inch, 1.5*inch, 2.5*inch, 1.5*inch])
+    earnings_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+    ]))
+    elements += [earnings_table, Spacer(1, 15)]
+
+    totals_table = Table([
+        ['Gross Earnings', f"₹{record.gross_earnings:,.2f}"],
+        ['Total Deductions', f"₹{record.total_deductions:,.2f}"],
+        ['Net Salary', f"₹{record.net_salary:,.2f}"],
+    ], colWidths=[3*inch, 2*inch])
+    totals_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ]))
+    elements += [totals_table, Spacer(1, 20), Paragraph("<b>Attendance Details</b>", heading_style)]
+
+    att_table = Table([
+        ['Working Days', str(int(record.working_days))],
+        ['Days Present', str(int(record.days_present))],
+        ['Days Absent', str(int(record.days_absent))],
+        ['Overtime Hours', f"{record.overtime_hours}"],
+    ], colWidths=[2*inch, 1.5*inch])
+    att_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    elements += [att_table, Spacer(1, 20), Paragraph("<b>Statutory Contributions</b>", heading_style)]
+
+    stat_table = Table([
+        ['PF (Employer)', f"₹{record.pf_employer:,.2f}", 'ESIC (Employer)', f"₹{record.esic_employer:,.2f}"],
+    ], colWidths=[2.5*inch, 1.5*inch, 2.5*inch, 1.5*inch])
+    stat_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+    ]))
+    elements += [stat_table, Spacer(1, 30)]
+    elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", styles['Normal']))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def sample_record(i: int):
+    basic = 20000 + i % 5000
+    return SimpleNamespace(
+        month=4, year=2024, basic_salary=basic, hra=basic * 0.1, conveyance=1600,
+        special_allowance=basic * 0.3, overtime_amount=0, bonus=0, arrears=0,
+        pf_employee=1800, pf_employer=1800, esic_employee=0, esic_employer=0,
+        professional_tax=200, tds=0, other_deductions=0,
+        gross_earnings=basic * 1.4 + 1600, total_deductions=2000, net_salary=basic * 1.4 - 400,
+        working_days=26, days_present=25, days_absent=1, overtime_hours=0.0,
+    )
+
+
+def sample_employee(i: int):
+    return SimpleNamespace(
+        employee_code=f"EMP2024{i:04d}", first_name="Employee", last_name=str(i),
+        department=SimpleNamespace(name="Production"), designation=SimpleNamespace(name="Operator"),
+        uan_number=f"1000{i:08d}", esic_number=f"2000{i:06d}",
+    )
+
+
+def run(label: str, render, count: int):
+    start = time.perf_counter()
+    for i in range(count):
+        render(sample_record(i), sample_employee(i))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {count:>6} docs  {elapsed:8.2f}s  {count / elapsed:10.1f} docs/s")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    template = get_template(PayslipTemplate)
+    run("SimpleDocTemplate", platypus_payslip, count)
+    run("PayslipTemplate", template.render_payslip, count)
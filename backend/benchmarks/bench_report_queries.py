@@ -0,0 +1,86 @@
+"""Query counts for the report data paths; each must stay constant as rows grow.
+
+Run from the backend directory:
+    python -m benchmarks.bench_report_queries
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from datetime import datetime
+
+from app.core.database import Base
+from app.models import (
+    Department, Designation, Employee, Attendance, AttendanceStatus, PayrollRecord, PayrollStatus
+)
+from app.services.report_service import ReportService
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def measure(self, fn) -> int:
+        start = self.count
+        fn()
+        return self.count - start
+
+
+def seeded_session(employees: int) -> tuple[Session, QueryCounter]:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = Session(bind=engine)
+
+    departments = [Department(name=f"Department {i}", code=f"D{i}") for i in range(5)]
+    db.add_all(departments)
+    db.flush()
+    designation = Designation(name="Operator", department_id=departments[0].id)
+    db.add(designation)
+    db.flush()
+
+    for i in range(employees):
+        employee = Employee(
+            employee_code=f"EMP2024{i:04d}", first_name=f"Employee{i}", email=f"employee{i}@example.com",
+            department_id=departments[i % 5].id, designation_id=designation.id,
+            uan_number=f"1000{i:08d}", esic_number=f"2000{i:06d}",
+        )
+        db.add(employee)
+        db.flush()
+        db.add(PayrollRecord(
+            employee_id=employee.id, month=4, year=2024, basic_salary=20000, gross_earnings=30000,
+            net_salary=27000, status=PayrollStatus.APPROVED,
+        ))
+        for day in range(1, 6):
+            db.add(Attendance(employee_id=employee.id, date=datetime(2024, 4, day), status=AttendanceStatus.PRESENT))
+    db.commit()
+    db.expunge_all()
+    return db, QueryCounter(engine)
+
+
+REPORTS = {
+    "attendance_report": lambda s: list(s.attendance_report_rows(4, 2024)),
+    "payroll_register": lambda s: list(s.payroll_register_rows(4, 2024)),
+    "pf_report": lambda s: list(s.pf_rows(4, 2024)),
+    "esic_report": lambda s: list(s.esic_rows(4, 2024)),
+    "payslip_recipients": lambda s: s.payslip_recipient_counts(4, 2024),
+    "payslip": lambda s: s.get_payslip_record(1).employee.department.name,
+}
+
+
+if __name__ == "__main__":
+    sizes = (10, 500)
+    counts = {}
+    for size in sizes:
+        db, counter = seeded_session(size)
+        service = ReportService(db)
+        for name, run in REPORTS.items():
+            db.expunge_all()
+            counts.setdefault(name, []).append(counter.measure(lambda: run(service)))
+        db.close()
+
+    for name, measured in counts.items():
+        print(f"{name:<20} " + "  ".join(f"{size} rows: {n} queries" for size, n in zip(sizes, measured)))
+        assert len(set(measured)) == 1, f"{name} query count grows with row count: {measured}"
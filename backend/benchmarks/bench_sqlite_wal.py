@@ -0,0 +1,135 @@
+"""Read throughput and latency while a payroll run is writing, per SQLite profile.
+
+A writer thread inserts payroll records in transactions of WRITE_BATCH rows while
+reader threads page through the employee list. The baseline is SQLite's default
+rollback journal with synchronous=FULL; the tuned profile is `sqlite_pragmas()`.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sqlite_wal [seconds] [readers]
+"""
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app.core.database import Base, engine_options, set_sqlite_pragmas, sqlite_pragmas
+from app.models.payroll import PayrollRecord, PayrollStatus
+from app.models.user import Department, Employee
+from app.services.employee_service import EmployeeService
+
+EMPLOYEES = 5000
+WRITE_BATCH = 200
+
+PROFILES = (
+    ("rollback journal, synchronous=FULL", {"busy_timeout": 5000, "journal_mode": "DELETE", "synchronous": "FULL"}),
+    ("WAL profile (settings)", sqlite_pragmas()),
+)
+
+
+def make_engine(path: str, pragmas: dict):
+    url = f"sqlite:///{path}"
+    bench_engine = create_engine(url, connect_args={"check_same_thread": False}, **engine_options(url))
+    set_sqlite_pragmas(bench_engine, pragmas)
+    return bench_engine
+
+
+def seed(bench_engine):
+    Base.metadata.create_all(bench_engine)
+    with bench_engine.begin() as conn:
+        conn.execute(delete(PayrollRecord))
+        conn.execute(delete(Employee))
+        conn.execute(delete(Department))
+        conn.execute(insert(Department), [{"id": i + 1, "name": f"Department {i}", "code": f"D{i}"} for i in range(10)])
+        conn.execute(insert(Employee), [
+            {
+                "employee_code": f"EMP{i:06d}", "first_name": f"Employee{i}", "email": f"e{i}@example.com",
+                "department_id": i % 10 + 1, "is_active": True,
+            }
+            for i in range(EMPLOYEES)
+        ])
+
+
+def writer(bench_engine, stop: threading.Event, stats: dict):
+    month = 0
+    while not stop.is_set():
+        month += 1
+        offset = 0
+        while offset < EMPLOYEES and not stop.is_set():
+            rows = [
+                {
+                    "employee_id": employee_id, "month": month % 12 + 1, "year": 2000 + month // 12,
+                    "basic_salary": 20000, "gross_earnings": 30000, "net_salary": 27850, "status": PayrollStatus.DRAFT,
+                }
+                for employee_id in range(offset + 1, min(offset + WRITE_BATCH, EMPLOYEES) + 1)
+            ]
+            try:
+                with bench_engine.begin() as conn:
+                    conn.execute(insert(PayrollRecord), rows)
+                stats["written"] += len(rows)
+            except OperationalError:
+                stats["write_errors"] += 1
+            offset += WRITE_BATCH
+
+
+def reader(Session, stop: threading.Event, latencies: list, stats: dict, index: int):
+    i = index
+    while not stop.is_set():
+        i += 1
+        started = time.perf_counter()
+        db = Session()
+        try:
+            EmployeeService(db).get_employees(skip=(i * 20) % EMPLOYEES, limit=20)
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            stats["read_errors"] += 1
+        finally:
+            db.close()
+
+
+def run(label: str, pragmas: dict, seconds: float, readers: int):
+    path = os.path.join(tempfile.gettempdir(), "bench_sqlite_wal.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    bench_engine = make_engine(path, pragmas)
+    seed(bench_engine)
+    Session = sessionmaker(bind=bench_engine, autoflush=False)
+
+    stop = threading.Event()
+    latencies: list = []
+    stats = {"written": 0, "write_errors": 0, "read_errors": 0}
+    threads = [threading.Thread(target=writer, args=(bench_engine, stop, stats))]
+    threads += [
+        threading.Thread(target=reader, args=(Session, stop, latencies, stats, i * 1000))
+        for i in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    bench_engine.dispose()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    print(
+        f"{label:<36} reads {len(latencies) / seconds:7.1f}/s  "
+        f"p50 {statistics.median(latencies or [0]) * 1000:6.1f} ms  p99 {p99 * 1000:7.1f} ms  "
+        f"writes {stats['written'] / seconds:8.0f} rows/s  "
+        f"errors r/w {stats['read_errors']}/{stats['write_errors']}"
+    )
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{seconds:.0f}s per profile, {readers} readers, 1 writer ({WRITE_BATCH} rows per transaction)")
+    for label, pragmas in PROFILES:
+        run(label, pragmas, seconds, readers)
@@ -0,0 +1,62 @@
+"""Peak memory of the ECR and ESIC MC writers; it should stay flat as members grow.
+
+Run from the backend directory:
+    python -m benchmarks.bench_statutory_returns
+"""
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+import time
+import tracemalloc
+
+from app.core.database import Base
+from app.models import Employee, PayrollRecord, PayrollStatus
+from app.services.export_service import iter_csv
+from app.services.statutory_service import StatutoryReturnService, iter_ecr, ESIC_MC_COLUMNS
+
+
+def seeded_session(members: int) -> Session:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {
+                "id": i + 1, "employee_code": f"EMP{i:07d}", "first_name": f"Member{i}", "email": f"m{i}@example.com",
+                "uan_number": f"{100000000000 + i}", "esic_number": f"{2000000000 + i}", "is_active": True,
+            }
+            for i in range(members)
+        ])
+        conn.execute(insert(PayrollRecord), [
+            {
+                "employee_id": i + 1, "month": 4, "year": 2024, "basic_salary": 14000, "gross_earnings": 20000,
+                "pf_employee": 1680, "pf_employer": 1680, "esic_employee": 150, "esic_employer": 650,
+                "working_days": 26, "days_absent": 1, "status": PayrollStatus.APPROVED,
+            }
+            for i in range(members)
+        ])
+    return Session(bind=engine)
+
+
+def measure(db: Session, write) -> tuple[int, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in write(StatutoryReturnService(db)))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+WRITERS = {
+    "epf_ecr": lambda s: iter_ecr(s.ecr_rows(4, 2024)),
+    "esic_mc": lambda s: iter_csv(ESIC_MC_COLUMNS, s.esic_mc_rows(4, 2024)),
+}
+
+
+if __name__ == "__main__":
+    for members in (5000, 50000):
+        db = seeded_session(members)
+        for name, write in WRITERS.items():
+            size, elapsed, peak = measure(db, write)
+            print(f"{name:<8} {members:>6} members: {size / 1024:8.0f} KiB in {elapsed:5.2f}s, peak {peak / 1024 / 1024:5.1f} MiB")
+        db.close()
@@ -0,0 +1,177 @@
+"""Regression check: the hot service queries must be planned on their indexes.
+
+Builds a scratch SQLite database through init_db (create_all plus migrations),
+runs each hot service call, captures the SQL it issues and checks the EXPLAIN
+QUERY PLAN of every statement: the expected index must be used and the table
+must never be scanned in full. Exits non-zero on any regression, so it can run
+in CI after schema or query changes.
+
+Run from the backend directory:
+    python -m benchmarks.explain_hot_queries
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "explain_hot_queries.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event
+import sys
+
+from app.core.database import SessionLocal, engine, init_db
+from app.schemas.leave import LeaveRequestStatus, LeaveType
+from app.services.attendance_service import AttendanceService, LeaveService
+from app.services.document_expiry import DocumentExpiryService
+from app.services.document_service import AuditService
+from app.services.employee_service import EmployeeService
+from app.services.import_service import EmployeeImport
+from app.services.payroll_service import PayrollService
+
+# (label, service call, table, index that must appear in the plan, ORDER BY must use the index)
+HOT_QUERIES = [
+    (
+        "attendance for an employee's month",
+        lambda db: AttendanceService(db).get_employee_attendance_for_month(1, 4, 2024),
+        "attendances", "uq_attendances_employee_id_date", False
+    ),
+    (
+        "attendance list by employee and dates",
+        lambda db: AttendanceService(db).get_attendances(
+            employee_id=1, start_date=datetime(2024, 4, 1), end_date=datetime(2024, 4, 30)
+        ),
+        "attendances", "uq_attendances_employee_id_date", False
+    ),
+    (
+        "payroll records for a period and status",
+        lambda db: PayrollService(db).get_employee_payroll_records(month=4, year=2024, status="approved"),
+        "payroll_records", "ix_payroll_records_year_month_status", False
+    ),
+    (
+        "payroll records already processed for a period",
+        lambda db: PayrollService(db).process_payroll(4, 2024, employee_ids=[]),
+        "payroll_records", "ix_payroll_records_year_month_status", False
+    ),
+    (
+        "employee payroll history",
+        lambda db: PayrollService(db).get_employee_payroll_records(employee_id=1, year=2024),
+        "payroll_records", "uq_payroll_records_employee_id_year_month", False
+    ),
+    (
+        "active salary components",
+        lambda db: PayrollService(db).get_employee_salary_components(1),
+        "salary_components", "ix_salary_components_employee_id_is_active", False
+    ),
+    (
+        "leave requests by employee and status",
+        lambda db: LeaveService(db).get_leave_requests(employee_id=1, status=LeaveRequestStatus.PENDING),
+        "leave_requests", "ix_leave_requests_employee_id_status", False
+    ),
+    (
+        "leave balance lookup",
+        lambda db: LeaveService(db).get_leave_balance(1, LeaveType.CASUAL, 2024),
+        "leave_balances", "ix_leave_balances_employee_id_year_leave_type", False
+    ),
+    (
+        "audit log by entity type, newest first",
+        lambda db: AuditService(db).get_audit_logs(entity_type="payroll_record"),
+        "audit_logs", "ix_audit_logs_entity_type_created_at", True
+    ),
+    (
+        "audit log for one entity",
+        lambda db: AuditService(db).get_audit_logs(entity_type="employee", entity_id=1),
+        "audit_logs", "ix_audit_logs_entity_type_entity_id", False
+    ),
+    (
+        "audit log for a date range, newest first",
+        lambda db: AuditService(db).get_audit_logs(start_date=datetime(2024, 4, 1), end_date=datetime(2024, 4, 30)),
+        "audit_logs", "ix_audit_logs_created_at", True
+    ),
+    (
+        "document expiry counts per department",
+        lambda db: DocumentExpiryService(db).scan(),
+        "documents", "ix_documents_expiry_date_employee_id_status", False
+    ),
+    (
+        "documents expiring soonest first",
+        lambda db: DocumentExpiryService(db).get_documents_page("expiring", count="none"),
+        "documents", "ix_documents_expiry_date_employee_id_status", True
+    ),
+    (
+        "active employees in a department",
+        lambda db: EmployeeService(db).get_employees(department_id=1, is_active=True),
+        "employees", "ix_employees_department_id_is_active", False
+    ),
+    (
+        "import emails already on file, any case",
+        lambda db: EmployeeImport(db, dry_run=True).run([(2, {"first_name": "Asha", "email": "Asha.Rao@Example.com"})]),
+        "employees", "ix_employees_email_lower", False
+    ),
+    (
+        "employee search hits joined back to employees",
+        lambda db: EmployeeService(db).get_employees(search="kumar"),
+        "employees", "INTEGER PRIMARY KEY", False
+    ),
+]
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(statement: str, parameters) -> list:
+    with engine.connect() as conn:
+        cursor = conn.connection.driver_connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+
+
+def check(label, call, table, index, ordered_by_index) -> list:
+    db = SessionLocal()
+    try:
+        with captured_statements() as statements:
+            call(db)
+    finally:
+        db.close()
+
+    problems = []
+    used = False
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        if not any(f" {table} " in f" {line} " for line in plan):
+            continue
+        used = used or any(index in line for line in plan)
+        problems += [f"full scan: {line}" for line in plan if line == f"SCAN {table}"]
+        if ordered_by_index:
+            problems += [f"sorts without the index: {line}" for line in plan if "TEMP B-TREE FOR ORDER BY" in line]
+    if not used:
+        problems.append(f"{index} not used")
+    return problems
+
+
+if __name__ == "__main__":
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    init_db()
+
+    failures = 0
+    for label, call, table, index, ordered_by_index in HOT_QUERIES:
+        problems = check(label, call, table, index, ordered_by_index)
+        failures += bool(problems)
+        print(f"{'FAIL' if problems else 'ok':<5} {label:<48} {index}")
+        for problem in problems:
+            print(f"      {problem}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,34 @@
+"""Keep a SQLite copy of the primary fresh, to try read-replica routing locally.
+
+Copies the primary into the replica file with SQLite's online backup API every
+`interval` seconds. Point DATABASE_REPLICA_URLS at the copy and stop this script
+to watch the replica go stale and reads fall back to the primary.
+
+Run from the backend directory:
+    python -m benchmarks.sqlite_replica_sync [primary.db] [replica.db] [interval]
+"""
+import sqlite3
+import sys
+import time
+
+
+def sync(primary_path: str, replica_path: str):
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    primary_path = sys.argv[1] if len(sys.argv) > 1 else "payrolledge.db"
+    replica_path = sys.argv[2] if len(sys.argv) > 2 else "payrolledge_replica.db"
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    print(f"Copying {primary_path} -> {replica_path} every {interval:g}s (Ctrl+C to stop)")
+    while True:
+        started = time.perf_counter()
+        sync(primary_path, replica_path)
+        print(f"synced in {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+        time.sleep(interval)
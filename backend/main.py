@@ -2,9 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from datetime import datetime
+import asyncio
 
 from app.core.config import settings
 from app.core.database import init_db
+from app.services.audit_partitions import run_scheduled_rollovers
+from app.services.document_expiry import run_scheduled_scans
 from app.api import (
     auth_router,
     employee_router,
@@ -27,7 +30,14 @@ from app.api import (
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    tasks = []
+    if settings.DOCUMENT_EXPIRY_SCAN_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_scheduled_scans()))
+    if settings.AUDIT_ROLLOVER_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_scheduled_rollovers()))
     yield
+    for task in tasks:
+        task.cancel()
 
 
 app = FastAPI(
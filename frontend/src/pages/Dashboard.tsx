@@ -1,7 +1,31 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { Users, Calendar, DollarSign, Clock } from 'lucide-react';
-import { employeeApi, payrollApi } from '../services/api';
+import { Users, Calendar, DollarSign, Clock, FileWarning } from 'lucide-react';
+import { documentApi, employeeApi, payrollApi } from '../services/api';
+
+interface ExpiringDocument {
+  id: number;
+  employee_name: string;
+  document_name: string;
+  expiry_date: string;
+}
+
+interface DepartmentExpiry {
+  department_id: number | null;
+  department_name: string | null;
+  expired_count: number;
+  expiring_count: number;
+  expired: ExpiringDocument[];
+  expiring: ExpiringDocument[];
+}
+
+interface ExpirySummary {
+  scanned_at: string | null;
+  within_days: number | null;
+  total_expired: number;
+  total_expiring: number;
+  departments: DepartmentExpiry[];
+}
 
 export default function Dashboard() {
   const [stats, setStats] = useState({
@@ -11,6 +35,7 @@ export default function Dashboard() {
     presentToday: 0
   });
   const [loading, setLoading] = useState(true);
+  const [expiry, setExpiry] = useState<ExpirySummary | null>(null);
 
   useEffect(() => {
     const fetchStats = async () => {
@@ -22,6 +47,9 @@ export default function Dashboard() {
         const currentMonth = new Date().getMonth() + 1;
         const currentYear = new Date().getFullYear();
         const payrollRes = await payrollApi.getSummary(currentMonth, currentYear).catch(() => ({ data: {} }));
+        // Published by the scheduled expiry scan; hidden for roles without access
+        const expiryRes = await documentApi.expirySummary().catch(() => null);
+        setExpiry(expiryRes ? expiryRes.data : null);
 
         setStats({
           totalEmployees: empRes.data.total || 0,
@@ -98,6 +126,55 @@ export default function Dashboard() {
           </div>
         </div>
 
+        {expiry && (
+          <div className="bg-white rounded-lg shadow p-6">
+            <div className="flex items-center justify-between mb-4">
+              <h2 className="text-lg font-semibold text-gray-900 flex items-center">
+                <FileWarning className="h-5 w-5 mr-2 text-orange-500" />
+                Document Expiry
+              </h2>
+              {expiry.scanned_at && (
+                <span className="text-xs text-gray-500">
+                  Scanned {new Date(expiry.scanned_at).toLocaleString()}
+                </span>
+              )}
+            </div>
+            {expiry.departments.length === 0 ? (
+              <p className="text-gray-500 text-sm">No expired or expiring documents</p>
+            ) : (
+              <>
+                <p className="text-sm text-gray-600 mb-3">
+                  <span className="font-semibold text-red-600">{expiry.total_expired}</span> expired,{' '}
+                  <span className="font-semibold text-orange-600">{expiry.total_expiring}</span> expiring within{' '}
+                  {expiry.within_days} days
+                </p>
+                <div className="space-y-3">
+                  {expiry.departments.map((dept) => (
+                    <div key={dept.department_id ?? 'none'} className="p-3 border border-gray-200 rounded-lg">
+                      <div className="flex items-center justify-between">
+                        <p className="font-medium text-gray-900">{dept.department_name || 'No department'}</p>
+                        <p className="text-sm">
+                          <span className="text-red-600">{dept.expired_count} expired</span>
+                          {' · '}
+                          <span className="text-orange-600">{dept.expiring_count} expiring</span>
+                        </p>
+                      </div>
+                      <ul className="mt-2 text-sm text-gray-500 space-y-1">
+                        {[...dept.expired, ...dept.expiring].slice(0, 3).map((doc) => (
+                          <li key={doc.id} className="flex justify-between">
+                            <span>{doc.employee_name} — {doc.document_name}</span>
+                            <span>{new Date(doc.expiry_date).toLocaleDateString()}</span>
+                          </li>
+                        ))}
+                      </ul>
+                    </div>
+                  ))}
+                </div>
+              </>
+            )}
+          </div>
+        )}
+
         <div className="bg-white rounded-lg shadow p-6">
           <h2 className="text-lg font-semibold text-gray-900 mb-4">Recent Activity</h2>
           <p className="text-gray-500 text-sm">No recent activity to display</p>
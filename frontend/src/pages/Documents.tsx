@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { Plus, Check, X, Eye, Pencil, Trash2 } from 'lucide-react';
+import { Plus, Check, X, Eye, Pencil, Trash2, FileText } from 'lucide-react';
 import api, { employeeApi, getErrorMessage } from '../services/api';
 import { Employee } from '../types';
 import toast from 'react-hot-toast';
@@ -10,6 +10,8 @@ interface Document {
   document_type: string;
   document_name: string;
   file_url?: string;
+  content_sha256?: string;
+  preview_status?: string;
   document_number?: string;
   issue_date?: string;
   expiry_date?: string;
@@ -34,6 +36,42 @@ const documentTypes = [
   { value: 'other', label: 'Other' },
 ];
 
+// Preview URLs carry the content hash, so the browser caches them for good and
+// a queue it has seen before renders without refetching any thumbnail.
+function DocumentThumbnail({ doc }: { doc: Document }) {
+  const [src, setSrc] = useState<string | null>(null);
+
+  useEffect(() => {
+    if (doc.preview_status !== 'ready' || !doc.content_sha256) return;
+    let objectUrl: string | null = null;
+    let cancelled = false;
+    api
+      .get(`/documents/${doc.id}/preview/thumb`, {
+        params: { v: doc.content_sha256.slice(0, 16) },
+        responseType: 'blob',
+      })
+      .then((response) => {
+        if (cancelled) return;
+        objectUrl = URL.createObjectURL(response.data);
+        setSrc(objectUrl);
+      })
+      .catch(() => setSrc(null));
+    return () => {
+      cancelled = true;
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [doc.id, doc.content_sha256, doc.preview_status]);
+
+  if (!src) {
+    return (
+      <div className="h-12 w-12 flex items-center justify-center rounded bg-gray-100 text-gray-400">
+        <FileText className="h-5 w-5" />
+      </div>
+    );
+  }
+  return <img src={src} alt={doc.document_name} loading="lazy" className="h-12 w-12 rounded object-cover" />;
+}
+
 export default function Documents() {
   const [documents, setDocuments] = useState<Document[]>([]);
   const [employees, setEmployees] = useState<Employee[]>([]);
@@ -221,6 +259,7 @@ export default function Documents() {
         <table className="min-w-full divide-y divide-gray-200">
           <thead className="bg-gray-50">
             <tr>
+              <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Preview</th>
               <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Employee</th>
               <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Document Type</th>
               <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase">Document No.</th>
@@ -232,17 +271,20 @@ export default function Documents() {
           <tbody className="bg-white divide-y divide-gray-200">
             {loading ? (
               <tr>
-                <td colSpan={6} className="px-6 py-4 text-center">Loading...</td>
+                <td colSpan={7} className="px-6 py-4 text-center">Loading...</td>
               </tr>
             ) : documents.length === 0 ? (
               <tr>
-                <td colSpan={6} className="px-6 py-4 text-center">
+                <td colSpan={7} className="px-6 py-4 text-center">
                   {filterEmployee ? 'No documents found for this employee' : 'Select an employee to view documents'}
                 </td>
               </tr>
             ) : (
               documents.map((doc) => (
                 <tr key={doc.id} className="hover:bg-gray-50">
+                  <td className="px-6 py-2">
+                    <DocumentThumbnail doc={doc} />
+                  </td>
                   <td className="px-6 py-4 text-sm font-medium">
                     {getEmployeeName(doc.employee_id)}
                   </td>
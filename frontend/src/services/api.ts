@@ -172,4 +172,12 @@ export const reportsApi = {
     api.get('/reports/payment-entries-csv', { params: { month, year } }, { responseType: 'blob' }),
 };
 
+export const documentApi = {
+  expirySummary: () => api.get('/documents/expiry/summary'),
+  scanExpiry: (withinDays?: number) =>
+    api.post('/documents/expiry/scan', null, { params: { within_days: withinDays } }),
+  listExpiry: (kind: 'expired' | 'expiring', params?: { within_days?: number; department_id?: number; cursor?: string; page_size?: number }) =>
+    api.get(`/documents/expiry/${kind}`, { params }),
+};
+
 export default api;